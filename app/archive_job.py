@@ -0,0 +1,38 @@
+"""
+Arquiva notícias/vídeos inativos, com janela encerrada ou mais velhos que a retenção.
+
+Uso (ex.: cron diário):
+    python app/archive_job.py                 # retenção da aba settings (archive_retention_days)
+    python app/archive_job.py --days 90       # sobrescreve a retenção
+    python app/archive_job.py --dry-run       # só lista o que sairia
+
+Mantém as abas lidas pela TV proporcionais ao conteúdo no ar; os itens continuam
+restauráveis pelo Admin (expander "🗄️ Arquivo").
+"""
+import argparse
+
+from utils.archive import ARCHIVE_TABS, archive_stale, retention_days, split_stale
+from utils.schedule import local_now
+from utils.store import TableStore
+
+def main():
+    ap = argparse.ArgumentParser(description="Arquivamento das abas quentes da Lukma TV.")
+    ap.add_argument("--days", type=int, default=None, help="retenção em dias (0 = só inativos/encerrados)")
+    ap.add_argument("--dry-run", action="store_true", help="não grava nada")
+    args = ap.parse_args()
+
+    store = TableStore()
+    snaps = store.refresh(list(ARCHIVE_TABS) + ["settings"], force=True)
+    days = args.days if args.days is not None else retention_days(snaps["settings"].df)
+    now = local_now()
+    for ws_name in ARCHIVE_TABS:
+        if args.dry_run:
+            _, stale = split_stale(snaps[ws_name].df, now, days)
+            for r in stale.to_dict("records"):
+                print(f"[{ws_name}] {r.get('id')}: {r.get('title')} ({r['motivo']})")
+            continue
+        n = archive_stale(store, ws_name, snaps[ws_name].version, now, days)
+        print(f"[{ws_name}] {n} linha(s) arquivada(s) em {ARCHIVE_TABS[ws_name]}")
+
+if __name__ == "__main__":
+    main()
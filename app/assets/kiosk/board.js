@@ -0,0 +1,75 @@
+// Lukma TV — board estático (gerado por app/export_kiosk.py).
+// Os fragmentos HTML já vêm renderizados pelos componentes de utils/ui.py;
+// aqui só fazemos a rotação, os relógios e a troca de versão dos dados.
+(function () {
+  var POLL_MS = 30000;
+  var state = { manifest: null, data: null, i: { news: 0, birthdays: 0, videos: 0 }, timers: [] };
+
+  function el(id) { return document.getElementById(id); }
+
+  // Só o manifest precisa furar cache; os dados têm nome versionado (imutáveis).
+  function getJSON(url, cb, bust) {
+    var xhr = new XMLHttpRequest();
+    xhr.open("GET", bust ? url + "?t=" + Date.now() : url);
+    xhr.onload = function () { if (xhr.status === 200) { try { cb(JSON.parse(xhr.responseText)); } catch (e) {} } };
+    xhr.send();
+  }
+
+  function show(slot, list, key) {
+    if (!list || !list.length) return;
+    var item = list[state.i[key] % list.length];
+    el(slot).innerHTML = typeof item === "string" ? item : item.html;
+  }
+
+  function tickClocks() {
+    var zones = (state.data && state.data.zones) || [];
+    var nodes = document.querySelectorAll("[data-clock]");
+    for (var k = 0; k < nodes.length; k++) {
+      var tz = zones[+nodes[k].getAttribute("data-clock")];
+      if (!tz) continue;
+      try {
+        nodes[k].textContent = new Intl.DateTimeFormat("pt-BR", {
+          timeZone: tz, hour: "2-digit", minute: "2-digit", second: "2-digit", hour12: false
+        }).format(new Date());
+      } catch (e) {}
+    }
+  }
+
+  function nextVideo() {
+    var vids = state.data.videos || [];
+    show("slot-d", vids, "videos");
+    var cur = vids.length ? vids[state.i.videos % vids.length] : null;
+    state.i.videos++;
+    state.timers.push(setTimeout(nextVideo, (cur && cur.ms) || 30000));
+  }
+
+  function apply(data) {
+    state.timers.forEach(clearTimeout);
+    state.timers = [];
+    state.data = data;
+    el("slot-e").innerHTML = data.line_e;
+    el("slot-f").innerHTML = data.ticker;
+    var rotate = function () {
+      show("slot-a", data.news, "news");
+      show("slot-c", data.birthdays, "birthdays");
+      state.i.news++; state.i.birthdays++;
+      state.timers.push(setTimeout(rotate, data.rotation_ms || 10000));
+    };
+    rotate();
+    nextVideo();
+    tickClocks();
+  }
+
+  function poll() {
+    getJSON("manifest.json", function (m) {
+      var prev = state.manifest;
+      state.manifest = m;
+      if (prev && (prev.css !== m.css || prev.js !== m.js)) { window.location.reload(); return; }
+      if (!prev || prev.data !== m.data) { getJSON(m.data, apply); }
+    }, true);
+  }
+
+  setInterval(tickClocks, 1000);
+  setInterval(poll, POLL_MS);
+  poll();
+})();
@@ -0,0 +1,41 @@
+"""
+Exporta o board da TV como bundle estático (HTML + CSS + JS + JSON com nomes versionados).
+
+Uso:
+    python app/export_kiosk.py --out dist/kiosk            # exporta uma vez
+    python app/export_kiosk.py --out dist/kiosk --watch 60 # reexporta quando o conteúdo mudar
+    python app/export_kiosk.py --out dist/kiosk-sp --site sp # conteúdo global + o do site `sp`
+
+Sirva `dist/kiosk` com qualquer servidor estático; as telas só baixam `manifest.json`
+(sem cache) e os arquivos versionados (cacheáveis para sempre).
+"""
+import argparse
+import time
+from typing import Optional
+
+from utils.export import export_bundle
+from utils.feed import load_sources
+
+def export_once(out_dir: str, site: Optional[str] = None) -> bool:
+    manifest = export_bundle(out_dir, *load_sources(site))
+    if manifest:
+        print(f"Bundle atualizado: conteúdo {manifest['content_version']} -> {manifest['data']}")
+    return manifest is not None
+
+def main():
+    ap = argparse.ArgumentParser(description="Export estático do board da Lukma TV.")
+    ap.add_argument("--out", default="dist/kiosk", help="pasta de saída do bundle")
+    ap.add_argument("--watch", type=float, default=0, help="segundos entre verificações (0 = uma vez)")
+    ap.add_argument("--site", default=None, help="slug de `[sites.<slug>]` no secrets (padrão: só o global)")
+    args = ap.parse_args()
+
+    export_once(args.out, args.site)
+    while args.watch > 0:
+        time.sleep(args.watch)
+        try:
+            export_once(args.out, args.site)
+        except Exception as e:
+            print(f"Falha ao exportar (mantendo bundle anterior): {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Feed JSON somente leitura para telas leves (quiosques).
+
+Uso:
+    python app/feed_server.py --host 0.0.0.0 --port 8600 [--ttl 15]
+
+Endpoints:
+    GET /feed.json             -> conteúdo ativo + versão; responde 304 se If-None-Match bater
+    GET /feed.json?site=<slug> -> o mesmo, com o conteúdo do site mesclado ao global (cache próprio)
+    GET /static/theme.<h>.css  -> tema da TV com cache longo (nome muda quando o CSS muda)
+    GET /healthz               -> "ok"
+    GET /metrics               -> métricas do processo em formato Prometheus (com --metrics)
+
+Cada tela faz só um GET condicional barato em vez de abrir uma sessão Streamlit.
+"""
+import argparse
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from utils.config import runtime_config
+from utils.feed import etag_matches, feed_body, feed_etag, load_feed
+from utils.metrics import REGISTRY, count, enable, enabled, timer
+from utils.sites import site_sources
+from utils.ui import STATIC_DIR, theme_asset_name
+
+HASHED_ASSET = re.compile(r"^/static/(theme\.[0-9a-f]{12}\.css)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+class FeedCache:
+    """
+    Guarda o último feed montado por `ttl` segundos (um único rebuild por vez).
+    Sem `ttl` fixo, vale `feed_ttl_seconds` da aba settings (recarregada a quente).
+    """
+
+    def __init__(self, ttl: Optional[float] = None, site: Optional[str] = None):
+        self._ttl = ttl
+        self.site = site
+        self._lock = threading.Lock()
+        self._built_at = 0.0
+        self._etag = None
+        self._body = b""
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl if self._ttl is not None else runtime_config().feed_ttl_seconds
+
+    def get(self):
+        with self._lock:
+            if self._etag is None or time.monotonic() - self._built_at >= self.ttl:
+                try:
+                    with timer("feed_build_seconds"):
+                        feed = load_feed(self.site)
+                    self._etag, self._body = feed_etag(feed), feed_body(feed)
+                except Exception:
+                    # Sem dados novos: mantém o último feed bom (se houver)
+                    if self._etag is None:
+                        raise
+                self._built_at = time.monotonic()
+            return self._etag, self._body
+
+class FeedHandler(BaseHTTPRequestHandler):
+    cache: FeedCache = None
+    site_caches: Dict[str, FeedCache] = {}
+    site_lock = threading.Lock()
+    server_version = "LukmaFeed/1.0"
+
+    def _cache_for(self, query: str) -> Optional[FeedCache]:
+        """Cache do site pedido (?site=); None para site desconhecido."""
+        site = (parse_qs(query).get("site") or [""])[0].strip().lower()
+        if not site:
+            return self.cache
+        if site not in site_sources():
+            return None
+        with self.site_lock:
+            if site not in self.site_caches:
+                self.site_caches[site] = FeedCache(self.cache._ttl, site)
+            return self.site_caches[site]
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def _handle(self, send_body: bool):
+        path, _, query = self.path.partition("?")
+        if path == "/healthz":
+            return self._send(200, b"ok", "text/plain; charset=utf-8", send_body=send_body)
+        if path == "/metrics":
+            body = REGISTRY.prometheus() if enabled() else "# métricas desligadas (--metrics ou LUKMA_METRICS=1)\n"
+            return self._send(200, body.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8",
+                              {"Cache-Control": "no-store"}, send_body=send_body)
+        m = HASHED_ASSET.match(path)
+        if m:
+            return self._send_asset(m.group(1), send_body)
+        if path != "/feed.json":
+            return self._send(404, b"not found", "text/plain; charset=utf-8", send_body=send_body)
+        cache = self._cache_for(query)
+        if cache is None:
+            return self._send(404, b"site desconhecido", "text/plain; charset=utf-8", send_body=send_body)
+        try:
+            etag, body = cache.get()
+        except Exception:
+            count("feed_requests_total", status="503")
+            return self._send(503, b"feed indisponivel", "text/plain; charset=utf-8", send_body=send_body)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            count("feed_requests_total", status="304")
+            return self._send(304, b"", None, headers, send_body=False)
+        count("feed_requests_total", status="200")
+        return self._send(200, body, "application/json; charset=utf-8", headers, send_body=send_body)
+
+    def _send_asset(self, name: str, send_body: bool):
+        theme_asset_name()  # garante que o arquivo da versão atual exista
+        path = STATIC_DIR / name
+        if not path.is_file():
+            return self._send(404, b"not found", "text/plain; charset=utf-8", send_body=send_body)
+        etag = f'"{name}"'
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE}
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            return self._send(304, b"", None, headers, send_body=False)
+        return self._send(200, path.read_bytes(), "text/css; charset=utf-8", headers, send_body=send_body)
+
+    def _send(self, status: int, body: bytes, ctype, headers=None, send_body=True):
+        self.send_response(status)
+        if ctype:
+            self.send_header("Content-Type", ctype)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Length", str(len(body) if status != 304 else 0))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # polling de dezenas de telas: sem log por requisição
+
+def main():
+    ap = argparse.ArgumentParser(description="Feed JSON da Lukma TV (ETag/304).")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8600)
+    ap.add_argument("--ttl", type=float, default=None,
+                    help="segundos entre reconstruções do feed (padrão: feed_ttl_seconds da aba settings)")
+    ap.add_argument("--metrics", action="store_true", help="coleta métricas e expõe em /metrics")
+    args = ap.parse_args()
+    if args.metrics:
+        enable(True)
+
+    FeedHandler.cache = FeedCache(args.ttl)
+    httpd = ThreadingHTTPServer((args.host, args.port), FeedHandler)
+    print(f"Feed em http://{args.host}:{args.port}/feed.json")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,14 @@
 import streamlit as st
-import gspread
-from google.oauth2.service_account import Credentials
 
-DEFAULTS = {
-    "users": [
-        "username","name","email","password_hash","is_admin",
-        "can_news","can_weather","can_birthdays","can_videos",
-        "can_worldclocks","can_currencies","active"
-    ],
-    "news": ["id","title","description","image_url","active","created_at"],
-    "birthdays": ["id","name","sector","birthday","photo_url","active"],
-    "videos": ["id","title","url","duration_seconds","active"],
-    "weather_units": ["id","alias","city","state","latitude","longitude","active"],
-    "worldclocks": ["id","label","timezone"],
-    "settings": ["key","value"],
-}
+from utils.sheets import DEFAULT_COLUMNS, spreadsheet
 
 st.set_page_config(page_title="Init Headers", layout="centered")
 st.header("⚙️ Inicializar cabeçalhos nas abas do Google Sheets")
 
 try:
-    creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"],
-        scopes=[
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ],
-    )
-    gc = gspread.authorize(creds)
-    sh = gc.open_by_key(st.secrets["gsheets"]["spreadsheet_id"])
+    sh = spreadsheet()  # mesmo cliente/planilha da TV e do Admin (autoriza uma vez por processo)
 
-    for ws_name, headers in DEFAULTS.items():
+    for ws_name, headers in DEFAULT_COLUMNS.items():
         try:
             ws = sh.worksheet(ws_name)
         except Exception:
@@ -1,17 +1,11 @@
 import streamlit as st
-import gspread
-from google.oauth2.service_account import Credentials
+
+from utils.sheets import open_fresh
 
 st.set_page_config(page_title="Teste GSheets", layout="wide")
 
 try:
-    creds = Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"],
-        scopes=["https://www.googleapis.com/auth/spreadsheets",
-                "https://www.googleapis.com/auth/drive"]
-    )
-    gc = gspread.authorize(creds)
-    sh = gc.open_by_key(st.secrets["gsheets"]["spreadsheet_id"])
+    sh = open_fresh()  # cliente novo: testa o secrets atual, não a conexão em cache do processo
     abas = [ws.title for ws in sh.worksheets()]
     st.success(f"Consegui abrir a planilha. Abas: {abas}")
 except Exception as e:
@@ -2,16 +2,27 @@ import secrets
 import hashlib
 import time
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Tuple
 
 import pandas as pd
 import streamlit as st
-import requests
 
-from utils.sheets import read_tables, replace_df, upsert_row  # usamos replace_df p/ salvar "em lote"
+from utils.paging import PAGE_SIZES, TablePatch, filter_frame, page_bounds
+from utils.store import ConflictError, DuplicateKeyError, table_store
+from utils.auth import live_permissions
+from utils.archive import ARCHIVE_TABS, archive_index, archive_stale, restore_rows, retention_days, split_stale
+from utils.birthdays import BirthdayIndex
+from utils.config import describe as describe_config, parse_config
+from utils.data import TV_TZ, geocode_many
+from utils.importer import IMPORT_REQUIRED, apply_plan, build_plan, geocode_plan, iter_upload
+from utils.metrics import REGISTRY, enable as enable_metrics, enabled as metrics_enabled
+from utils.profiler import profile_rerun
+from utils.schedule import ScheduleIndex, local_now
+from utils.sheets import DEFAULT_COLUMNS
 
 # --------------------------------- Config ---------------------------------
 st.set_page_config(page_title="Painel Admin • Lukma TV", page_icon="⚙️", layout="wide")
+profile_rerun("admin")  # inclui os saves: cada clique em "Salvar" é um rerun
 
 # --------------------------------- Helpers de Auth ---------------------------------
 # Guardamos hash = sha256(salt + senha)
@@ -43,25 +54,77 @@ def _ensure_users_schema(df: pd.DataFrame) -> pd.DataFrame:
     df["username"] = df["username"].astype(str)
     return df[cols]
 
-def _current_user_perms(user_row: pd.Series) -> Dict[str, bool]:
-    return {
-        "is_admin": bool(user_row.get("is_admin", False)),
-        "can_news": bool(user_row.get("can_news", False)),
-        "can_weather": bool(user_row.get("can_weather", False)),
-        "can_birthdays": bool(user_row.get("can_birthdays", False)),
-        "can_videos": bool(user_row.get("can_videos", False)),
-        "can_worldclocks": bool(user_row.get("can_worldclocks", False)),
-        "can_currencies": bool(user_row.get("can_currencies", False)),
-    }
-
-# --------------------------------- Carregamento inicial (uma leitura em lote) ---------------------------------
+# --------------------------------- Carregamento (store compartilhado e versionado) ---------------------------------
+# Todas as sessões do processo leem o mesmo store; cada sessão fixa a versão que está
+# editando ("admin_base") até salvar ou recarregar, e a gravação usa essa versão como base.
 TABLES = ["users","news","birthdays","videos","weather_units","worldclocks","settings"]
-if "cached_tables" not in st.session_state:
-    st.session_state["cached_tables"] = read_tables(TABLES)
-tables = st.session_state["cached_tables"]
+store = table_store()
+store.refresh(TABLES)
+_base = st.session_state.setdefault("admin_base", {})
+
+# editor de cada aba: as edições pendentes apontam posições/rótulos do snapshot fixado
+EDITORS = {"news": "news_editor", "birthdays": "birth_editor", "videos": "videos_editor",
+           "weather_units": "weather_editor", "worldclocks": "clocks_editor",
+           "settings": "settings_editor", "users": "users_editor_view"}
+
+def _drop_edits(name: str):
+    """Descarta o que a sessão editou na aba (patch, delta do editor e plano de importação)."""
+    key = EDITORS[name]
+    st.session_state.pop(f"{key}_patch", None)
+    st.session_state[f"{key}_gen"] = st.session_state.get(f"{key}_gen", 0) + 1  # editor paginado novo
+    st.session_state.pop(key, None)  # editores simples (settings, usuários)
+    st.session_state.pop(f"{name}_import_plan", None)
+
+def _has_edits(name: str) -> bool:
+    key = EDITORS[name]
+    patch = st.session_state.get(f"{key}_patch")
+    delta = st.session_state.get(key) or {}
+    return bool((patch is not None and not patch.is_empty())
+                or any(delta.get(k) for k in ("edited_rows", "added_rows", "deleted_rows"))
+                or st.session_state.get(f"{name}_import_plan"))
+
+def _snapshot(name: str):
+    pinned = _base.get(name)
+    snap = store.snapshot(name, pinned)
+    if pinned and snap.version != pinned:
+        # a versão fixada saiu do histórico: aplicar as edições na aba atual trocaria as linhas
+        if _has_edits(name):
+            st.warning(f"A aba `{name}` mudou muito desde que você começou a editar e a versão que você "
+                       "editava expirou. As alterações não salvas foram descartadas e os dados foram "
+                       "recarregados: refaça a edição.")
+        _drop_edits(name)
+    _base[name] = snap.version
+    return snap
+
+tables = {name: _snapshot(name).df for name in TABLES}
+
+def _store_save(ws_name: str, df: pd.DataFrame):
+    """Grava via store (controle otimista); ConflictError sobe para quem chamou."""
+    snap = store.save(ws_name, df.fillna(""), _base.get(ws_name))
+    _base[ws_name] = snap.version
+    tables[ws_name] = snap.df
+
+def _conflict_msg(e: ConflictError):
+    if isinstance(e, DuplicateKeyError):
+        st.error(f"A aba `{e.ws_name}` tem linhas com a mesma chave ({', '.join(e.keys[:10])}). "
+                 "Suas alterações não foram gravadas: deixe cada chave em uma linha só e salve de novo.")
+        return
+    st.error(
+        f"Outra pessoa alterou as mesmas linhas da aba `{e.ws_name}` ({', '.join(e.keys[:10])}). "
+        "Suas alterações não foram gravadas: clique em **🔄 Recarregar dados** e refaça a edição."
+    )
 
-# Normaliza USERS
-users_df = _ensure_users_schema(tables.get("users", pd.DataFrame()))
+# USERS normalizado e índice de permissões: compilados uma vez por versão da aba (somente leitura;
+# quem edita faz .copy())
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _users_frame(version: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return _ensure_users_schema(_df.copy(deep=False))
+
+users_df = _users_frame(_base["users"], tables["users"])  # versão fixada: só a grade de usuários
+# login e permissões: sempre a versão vigente (usuário desativado perde o acesso já no próximo rerun)
+live_users = store.refresh(["users"])["users"]
+login_df = _users_frame(live_users.version, live_users.df)
+perm_index = live_permissions(store)
 
 # --------------------------------- Login / Logout ---------------------------------
 def _set_logged_user(u: pd.Series):
@@ -81,9 +144,8 @@ def _logout():
     for k in ["auth_user"]:
         if k in st.session_state:
             del st.session_state[k]
+    st.session_state.pop("admin_base", None)
     st.success("Sessão encerrada.")
-    st.cache_data.clear()
-    st.cache_resource.clear()
     time.sleep(0.5)
     st.rerun()
 
@@ -95,10 +157,10 @@ def _login_form():
     col1, col2 = st.columns([1,1])
     with col1:
         if st.button("Entrar", type="primary"):
-            if users_df.empty:
+            if login_df.empty:
                 st.error("Não há usuários cadastrados. Peça ao administrador para criar um usuário.")
                 return
-            urow = users_df[users_df["username"].astype(str) == str(username)].head(1)
+            urow = login_df[login_df["username"].astype(str) == str(username)].head(1)
             if urow.empty:
                 st.error("Usuário ou senha inválidos.")
                 return
@@ -125,7 +187,7 @@ def _login_form():
 # Se não logado → mostra login
 if "auth_user" not in st.session_state:
     # Caso especial: se não existir nenhum usuário, exibe wizard de criação do primeiro admin
-    if users_df.empty:
+    if login_df.empty:
         st.title("👤 Criar Administrador (primeiro acesso)")
         st.info("Nenhum usuário encontrado. Crie o **primeiro administrador**.")
         u = st.text_input("Usuário (login)")
@@ -148,11 +210,12 @@ if "auth_user" not in st.session_state:
                     "active": True
                 }])
                 try:
-                    replace_df("users", new_users)
-                    st.session_state["cached_tables"]["users"] = new_users
+                    _store_save("users", new_users)
                     st.success("Administrador criado! Faça login para continuar.")
                     time.sleep(0.4)
                     st.rerun()
+                except ConflictError as e:
+                    _conflict_msg(e)
                 except Exception as e:
                     st.error("Falha ao criar administrador.")
                     st.exception(e)
@@ -162,10 +225,43 @@ if "auth_user" not in st.session_state:
 
 # Logado
 auth = st.session_state["auth_user"]
-perms = _current_user_perms(pd.Series(auth))
+if len(perm_index):  # aba users indisponível (vazia): mantém as permissões do login
+    if not perm_index.has(auth["username"], "active"):
+        _logout()
+    auth.update({k: v for k, v in perm_index.perms(auth["username"]).items() if k != "active"})
+perms = auth
 st.sidebar.success(f"Logado como: **{auth['username']}**")
 if st.sidebar.button("Sair", use_container_width=True):
     _logout()
+if st.sidebar.button("🔄 Recarregar dados", use_container_width=True):
+    st.session_state.pop("admin_base", None)
+    for name in TABLES:
+        _drop_edits(name)  # edições pendentes valem só para a versão que estava fixada
+    store.refresh(TABLES, force=True)
+    st.rerun()
+
+# --------------------------------- Fila de gravação (write-behind) ---------------------------------
+def _clock(ts: float) -> str:
+    return pd.Timestamp(ts, unit="s", tz="UTC").tz_convert(TV_TZ).strftime("%H:%M:%S")
+
+@st.fragment(run_every=5)
+def _sync_status():
+    depth, last = store.journal.depth(), store.journal.status()
+    if depth:
+        st.info(f"📮 {depth} gravação(ões) na fila para a planilha.")
+    if last is None:
+        st.caption("Nenhuma gravação enviada à planilha ainda.")
+    elif last["state"] == "ok":
+        st.caption(f"✅ Última sincronização: `{last['ws_name']}` às {_clock(last['at'])}.")
+    elif last["state"] == "retrying":
+        st.warning(f"⏳ Falha ao gravar `{last['ws_name']}` ({last['attempts']}ª tentativa); "
+                   f"nova tentativa às {_clock(last['retry_at'])}. A edição está guardada.")
+    else:
+        st.error(f"⚠️ {last['error']}. A edição rejeitada pode ser baixada em **📈 Diagnóstico**.")
+
+if store.journal is not None:
+    with st.sidebar:
+        _sync_status()
 
 st.title("⚙️ Painel de Administração — Lukma TV")
 
@@ -187,13 +283,16 @@ def _save_table(ws_name: str, edited_df: pd.DataFrame, enforce_cols=None):
                 if c not in edited_df.columns:
                     edited_df[c] = ""
             edited_df = edited_df[enforce_cols]
-        replace_df(ws_name, edited_df.fillna(""))
-        # atualiza cache local
-        st.session_state["cached_tables"][ws_name] = edited_df
-        st.success("Alterações salvas com sucesso.")
+        _store_save(ws_name, edited_df)
+        st.success("Alterações salvas com sucesso." if store.journal is None else
+                   "Alterações salvas. A planilha é atualizada em segundo plano.")
+        return True
+    except ConflictError as e:
+        _conflict_msg(e)
     except Exception as e:
         st.error(f"Falha ao salvar a aba `{ws_name}`.")
         st.exception(e)
+    return False
 
 def _data_editor(df: pd.DataFrame, key: str, height: int = 340):
     cfg = {
@@ -205,6 +304,54 @@ def _data_editor(df: pd.DataFrame, key: str, height: int = 340):
         column_config=cfg
     )
 
+# Editor paginado: filtra/pagina no servidor e só envia a janela visível ao navegador.
+# As edições viram patches por linha (edited/added/deleted do data_editor) guardados na sessão.
+def _patch(key: str) -> TablePatch:
+    return st.session_state.setdefault(f"{key}_patch", TablePatch())
+
+def _reset_patch(key: str):
+    st.session_state[f"{key}_patch"] = TablePatch()
+    st.session_state[f"{key}_gen"] = st.session_state.get(f"{key}_gen", 0) + 1  # editor novo, sem delta antigo
+
+def _patched(key: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Snapshot + todas as edições pendentes (o que vai ser gravado)."""
+    patch = _patch(key)
+    patch.commit()
+    return patch.apply(df).reset_index(drop=True)
+
+def _paged_editor(df: pd.DataFrame, key: str, height: int = 420):
+    patch = _patch(key)
+    q = st.session_state.get(f"{key}_q", "")
+    status = st.session_state.get(f"{key}_status", "Todos")
+    size = st.session_state.get(f"{key}_size", PAGE_SIZES[1])
+
+    def _view():
+        return filter_frame(patch.apply(df), q, status)
+
+    patch.enter(f"{q}|{status}|{size}|{st.session_state.get(f'{key}_page', 1)}")
+    filtered = _view()
+    page, start, end = page_bounds(len(filtered), st.session_state.get(f"{key}_page", 1), size)
+    st.session_state[f"{key}_page"] = page
+    if patch.enter(f"{q}|{status}|{size}|{page}"):  # página ajustada (ex.: filtro encolheu a lista)
+        filtered = _view()
+
+    c1, c2, c3, c4 = st.columns([3,1,1,1])
+    c1.text_input("🔎 Buscar", key=f"{key}_q")
+    if "active" in df.columns:
+        c2.selectbox("Status", ["Todos","Ativos","Inativos"], key=f"{key}_status")
+    c3.selectbox("Linhas/página", PAGE_SIZES, index=1, key=f"{key}_size")
+    pages = max(1, -(-len(filtered) // size))
+    c4.number_input(f"Página (de {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+    window = filtered.iloc[start:end]
+    wkey = f"{key}_{st.session_state.get(f'{key}_gen', 0)}_{abs(hash(patch.view_key))}"
+    _data_editor(window.reset_index(drop=True), key=wkey, height=height)  # posições; rótulos ficam no patch
+    patch.set_current(list(window.index), st.session_state.get(wkey))
+
+    n_edit, n_add, n_del = patch.summary()
+    st.caption(f"{len(filtered)} linhas no filtro ({len(df)} na planilha) • pendentes: "
+               f"{n_edit} alteradas, {n_add} novas, {n_del} removidas")
+
 # --------------------------------- Abas / Permissões ---------------------------------
 tabs = []
 tab_labels = []
@@ -218,6 +365,7 @@ if perms["can_currencies"]:    tab_labels.append("💱 Moedas (Settings)")
 
 if perms["is_admin"]:
     tab_labels.append("👥 Usuários (Admin)")
+    tab_labels.append("📈 Diagnóstico")
 
 if not tab_labels:
     st.warning("Seu usuário não possui permissões para editar nenhum conteúdo. Contate o administrador.")
@@ -227,35 +375,157 @@ tabs = st.tabs(tab_labels)
 
 # Para ler os dados atuais do cache
 def _get_table(name: str, ensure_cols=None) -> pd.DataFrame:
-    df = st.session_state["cached_tables"].get(name, pd.DataFrame())
+    df = tables.get(name, pd.DataFrame()).copy(deep=False)  # rasa: dados só são copiados se a sessão editar (CoW)
     if ensure_cols:
         for c in ensure_cols:
             if c not in df.columns:
                 df[c] = ""
         df = df[ensure_cols]
-    return df.copy()
+    return df
+
+def _warn_schedule(df: pd.DataFrame):
+    bad = ScheduleIndex(df).invalid
+    if bad:
+        st.warning("Janela de publicação inválida (item fora da TV): " + ", ".join(bad[:20]) + (" ..." if len(bad) > 20 else ""))
+
+# Importação em lote (CSV/XLSX): valida, deduplica pela chave natural, mostra o diff e grava tudo de uma vez.
+def _importer(ws_name: str, editor_key: str, df: pd.DataFrame):
+    with st.expander("📥 Importar CSV/XLSX"):
+        st.caption("Cabeçalho com as colunas da aba (" + ", ".join(DEFAULT_COLUMNS[ws_name]) + "). "
+                   "Obrigatórias: **" + ", ".join(IMPORT_REQUIRED[ws_name]) + "**. "
+                   "Linhas que já existem (mesma chave) são atualizadas; repetidas são ignoradas.")
+        gen = st.session_state.get(f"{ws_name}_import_gen", 0)
+        up = st.file_uploader("Arquivo", type=["csv", "xlsx"], key=f"{ws_name}_import_{gen}")
+        if up is None:
+            return
+        base_version = _base.get(ws_name)
+        sig = (up.file_id, base_version)
+        cached = st.session_state.get(f"{ws_name}_import_plan")
+        if not cached or cached[0] != sig:
+            try:
+                plan = build_plan(ws_name, iter_upload(up.getvalue(), up.name), df)
+            except Exception as e:
+                st.error("Não foi possível ler o arquivo.")
+                st.exception(e)
+                return
+            st.session_state[f"{ws_name}_import_plan"] = (sig, plan)
+        plan = st.session_state[f"{ws_name}_import_plan"][1]
+
+        if plan.fatal:
+            st.error(plan.errors[0][1])
+            return
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Novas", len(plan.added))
+        m2.metric("Atualizadas", len(plan.updated))
+        m3.metric("Sem mudança / repetidas", plan.unchanged + plan.duplicates)
+        m4.metric("Com erro", len(plan.errors))
+        if plan.ignored_columns:
+            st.caption("Colunas ignoradas: " + ", ".join(plan.ignored_columns))
+        if plan.added:
+            st.markdown("**Novas linhas**")
+            st.dataframe(pd.DataFrame(plan.added), use_container_width=True, height=220)
+        if plan.changes:
+            st.markdown("**Alterações em linhas existentes**")
+            st.dataframe(pd.DataFrame(plan.changes), use_container_width=True, height=220)
+        if plan.errors:
+            st.markdown("**Linhas rejeitadas**")
+            st.dataframe(pd.DataFrame(plan.errors, columns=["linha", "motivo"]), use_container_width=True, height=180)
+
+        if not _patch(editor_key).is_empty():
+            st.warning("Há edições pendentes no editor desta aba. Salve-as antes de importar.")
+            return
+        if plan.pending and st.button(f"✅ Importar {plan.pending} linhas", type="primary", key=f"{ws_name}_import_go"):
+            if ws_name == "weather_units":
+                with st.spinner("Geocodificando unidades novas..."):
+                    sem_coord = geocode_plan(plan)
+                if sem_coord:
+                    st.warning(f"{sem_coord} unidade(s) sem latitude/longitude (cidade não encontrada).")
+            if _save_table(ws_name, apply_plan(df, plan), DEFAULT_COLUMNS[ws_name]):
+                _reset_patch(editor_key)
+                st.session_state.pop(f"{ws_name}_import_plan", None)
+                st.session_state[f"{ws_name}_import_gen"] = gen + 1
+                st.rerun()
+
+# Arquivo: tira da aba quente o que não vai mais ao ar (a TV só lê o conteúdo vivo) e permite restaurar.
+def _archive_panel(ws_name: str, editor_key: str, df: pd.DataFrame):
+    arch_name = ARCHIVE_TABS[ws_name]
+    with st.expander("🗄️ Arquivo"):
+        days = retention_days(tables.get("settings"))
+        now = local_now()
+        _, stale = split_stale(df, now, days)
+        st.caption(f"Saem da aba: inativos, janela encerrada e itens com mais de {days} dias "
+                   "(ajuste em settings: `archive_retention_days`). Rode `python app/archive_job.py` no cron para automatizar.")
+        if not stale.empty:
+            st.dataframe(stale[["id", "title", "motivo"]], use_container_width=True, height=180)
+            if not _patch(editor_key).is_empty():
+                st.warning("Há edições pendentes no editor desta aba. Salve-as antes de arquivar.")
+            elif st.button(f"🗄️ Arquivar {len(stale)} itens", key=f"{ws_name}_archive_go"):
+                try:
+                    n = archive_stale(store, ws_name, _base.get(ws_name), now, days)
+                    _base.pop(ws_name, None)
+                    _reset_patch(editor_key)
+                    st.success(f"{n} itens arquivados em `{arch_name}`.")
+                    st.rerun()
+                except ConflictError as e:
+                    _conflict_msg(e)
+                except Exception as e:
+                    st.error("Falha ao arquivar.")
+                    st.exception(e)
+        else:
+            st.caption("Nada para arquivar agora.")
+
+        arch = _snapshot(arch_name)
+        index = archive_index(arch_name, arch.version, arch.df)
+        q = st.text_input(f"Buscar no arquivo ({len(index)} itens)", key=f"{ws_name}_archive_q")
+        found = index.search(q)
+        if not found:
+            return
+        labels = {f"{r.get('id')} — {r.get('title')} (arquivado {r.get('archived_at')})": str(r.get("id")) for r in found}
+        sel = st.multiselect("Restaurar", list(labels), key=f"{ws_name}_archive_sel")
+        if sel and st.button(f"♻️ Restaurar {len(sel)} itens", key=f"{ws_name}_restore_go"):
+            if not _patch(editor_key).is_empty():
+                st.warning("Há edições pendentes no editor desta aba. Salve-as antes de restaurar.")
+                return
+            try:
+                n = restore_rows(store, ws_name, [labels[k] for k in sel], _base.get(ws_name), arch.version, now)
+                for name in (ws_name, arch_name):
+                    _base.pop(name, None)
+                _reset_patch(editor_key)
+                st.success(f"{n} itens restaurados (ativos).")
+                st.rerun()
+            except ConflictError as e:
+                _conflict_msg(e)
+            except Exception as e:
+                st.error("Falha ao restaurar.")
+                st.exception(e)
 
 # --------------------------------- Tab: Notícias ---------------------------------
 idx = 0
 if perms["can_news"]:
     with tabs[idx]:
         st.subheader("📰 Notícias da empresa")
-        df = _get_table("news", ["id","title","description","image_url","active","created_at"])
+        df = _get_table("news", ["id","title","description","image_url","active","created_at","publish_from","publish_until","priority"])
         if df.empty:
-            df = pd.DataFrame(columns=["id","title","description","image_url","active","created_at"])
+            df = pd.DataFrame(columns=["id","title","description","image_url","active","created_at","publish_from","publish_until","priority"])
         # id e created_at helpers
         colA, colB = st.columns([1,1])
         with colA:
             if st.button("➕ Adicionar notícia"):
                 new = {"id": str(int(time.time())), "title":"", "description":"", "image_url":"",
-                       "active": True, "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-                df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
+                       "active": True, "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                       "publish_from":"", "publish_until":"", "priority":"1"}
+                _patch("news_editor").add_row(new)
         with colB:
-            st.caption("Use o editor abaixo para alterar títulos, descrições e imagens. Marque/desmarque **active**.")
-        edited = _data_editor(df, key="news_editor", height=420)
+            st.caption("Use o editor abaixo para alterar títulos, descrições e imagens. Marque/desmarque **active**. "
+                       "Agende com **publish_from**/**publish_until** (YYYY-MM-DD HH:MM) e pese com **priority** (1–10).")
+        _warn_schedule(df)
+        _paged_editor(df, key="news_editor", height=420)
+        _importer("news", "news_editor", df)
+        _archive_panel("news", "news_editor", df)
         if st.button("💾 Salvar notícias", type="primary"):
-            edited = _bool_cols(edited, ["active"])
-            _save_table("news", edited, ["id","title","description","image_url","active","created_at"])
+            edited = _bool_cols(_patched("news_editor", df), ["active"])
+            if _save_table("news", edited, ["id","title","description","image_url","active","created_at","publish_from","publish_until","priority"]):
+                _reset_patch("news_editor")
     idx += 1
 
 # --------------------------------- Tab: Aniversariantes ---------------------------------
@@ -269,52 +539,48 @@ if perms["can_birthdays"]:
         with colA:
             if st.button("➕ Adicionar aniversariante"):
                 new = {"id": str(int(time.time())), "name":"", "sector":"", "birthday":"", "photo_url":"", "active": True}
-                df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
+                _patch("birth_editor").add_row(new)
         with colB:
             st.caption("Formato de **birthday** recomendado: YYYY-MM-DD (ex.: 2025-09-30).")
-        edited = _data_editor(df, key="birth_editor", height=420)
+        bad_dates = BirthdayIndex(df).invalid
+        if bad_dates:
+            st.warning("Datas inválidas (não aparecem na TV): " + ", ".join(bad_dates[:20]) + (" ..." if len(bad_dates) > 20 else ""))
+        _paged_editor(df, key="birth_editor", height=420)
+        _importer("birthdays", "birth_editor", df)
         if st.button("💾 Salvar aniversariantes", type="primary"):
-            edited = _bool_cols(edited, ["active"])
-            _save_table("birthdays", edited, ["id","name","sector","birthday","photo_url","active"])
+            edited = _bool_cols(_patched("birth_editor", df), ["active"])
+            if _save_table("birthdays", edited, ["id","name","sector","birthday","photo_url","active"]):
+                _reset_patch("birth_editor")
     idx += 1
 
 # --------------------------------- Tab: Vídeos ---------------------------------
 if perms["can_videos"]:
     with tabs[idx]:
         st.subheader("🎬 Vídeos institucionais")
-        df = _get_table("videos", ["id","title","url","duration_seconds","active"])
+        df = _get_table("videos", ["id","title","url","duration_seconds","active","publish_from","publish_until","priority"])
         if df.empty:
-            df = pd.DataFrame(columns=["id","title","url","duration_seconds","active"])
+            df = pd.DataFrame(columns=["id","title","url","duration_seconds","active","publish_from","publish_until","priority"])
         colA, colB = st.columns([1,1])
         with colA:
             if st.button("➕ Adicionar vídeo"):
-                new = {"id": str(int(time.time())), "title":"", "url":"", "duration_seconds":"30", "active": True}
-                df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
+                new = {"id": str(int(time.time())), "title":"", "url":"", "duration_seconds":"30", "active": True,
+                       "publish_from":"", "publish_until":"", "priority":"1"}
+                _patch("videos_editor").add_row(new)
         with colB:
-            st.caption("Suporta **YouTube** (autoplay) e arquivos **.mp4/.webm/.ogg**.")
-        edited = _data_editor(df, key="videos_editor", height=420)
+            st.caption("Suporta **YouTube** (autoplay) e arquivos **.mp4/.webm/.ogg**. Agendamento igual ao das notícias.")
+        _warn_schedule(df)
+        _paged_editor(df, key="videos_editor", height=420)
+        _archive_panel("videos", "videos_editor", df)
         if st.button("💾 Salvar vídeos", type="primary"):
-            edited = _bool_cols(edited, ["active"])
+            edited = _bool_cols(_patched("videos_editor", df), ["active"])
             # normaliza duração
             if "duration_seconds" in edited.columns:
                 edited["duration_seconds"] = edited["duration_seconds"].apply(lambda x: str(x).strip() if pd.notna(x) else "30")
-            _save_table("videos", edited, ["id","title","url","duration_seconds","active"])
+            if _save_table("videos", edited, ["id","title","url","duration_seconds","active","publish_from","publish_until","priority"]):
+                _reset_patch("videos_editor")
     idx += 1
 
 # --------------------------------- Tab: Unidades (Clima) ---------------------------------
-def _geocode_city(city: str):
-    try:
-        g = requests.get(
-            "https://geocoding-api.open-meteo.com/v1/search",
-            params={"name": city, "count": 1, "language": "pt"},
-            timeout=10
-        ).json()
-        if g.get("results"):
-            return g["results"][0]["latitude"], g["results"][0]["longitude"]
-    except Exception:
-        pass
-    return None, None
-
 if perms["can_weather"]:
     with tabs[idx]:
         st.subheader("🌦️ Unidades (Previsão do tempo)")
@@ -326,22 +592,27 @@ if perms["can_weather"]:
             if st.button("➕ Adicionar unidade"):
                 new = {"id": str(int(time.time())), "alias":"", "city":"", "state":"",
                        "latitude":"", "longitude":"", "active": True}
-                df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
+                _patch("weather_editor").add_row(new)
         with colB:
             st.caption("Preencha **city** e use **Geocodificar vazios** para obter latitude/longitude.")
         with colC:
             if st.button("📍 Geocodificar vazios"):
-                for i, row in df.iterrows():
-                    if (not str(row.get("latitude","")).strip() or not str(row.get("longitude","")).strip()) and str(row.get("city","")).strip():
-                        lat, lon = _geocode_city(str(row["city"]))
-                        if lat and lon:
-                            df.at[i, "latitude"] = lat
-                            df.at[i, "longitude"] = lon
+                patch = _patch("weather_editor")
+                cur = patch.apply(df)
+                todo = cur[(cur["latitude"].astype(str).str.strip() == "") | (cur["longitude"].astype(str).str.strip() == "")]
+                todo = todo[todo["city"].astype(str).str.strip() != ""]
+                found = geocode_many(todo["city"].astype(str))  # cidades distintas, em paralelo
+                for i, city in todo["city"].astype(str).items():
+                    lat, lon = found.get(city.strip(), (None, None))
+                    if lat and lon:
+                        patch.edit_row(i, {"latitude": lat, "longitude": lon})
                 st.success("Geocodificação concluída (onde possível).")
-        edited = _data_editor(df, key="weather_editor", height=420)
+        _paged_editor(df, key="weather_editor", height=420)
+        _importer("weather_units", "weather_editor", df)
         if st.button("💾 Salvar unidades", type="primary"):
-            edited = _bool_cols(edited, ["active"])
-            _save_table("weather_units", edited, ["id","alias","city","state","latitude","longitude","active"])
+            edited = _bool_cols(_patched("weather_editor", df), ["active"])
+            if _save_table("weather_units", edited, ["id","alias","city","state","latitude","longitude","active"]):
+                _reset_patch("weather_editor")
     idx += 1
 
 # --------------------------------- Tab: Relógios ---------------------------------
@@ -355,24 +626,33 @@ if perms["can_worldclocks"]:
         with colA:
             if st.button("➕ Adicionar relógio"):
                 new = {"id": str(int(time.time())), "label":"", "timezone":"America/Sao_Paulo"}
-                df = pd.concat([df, pd.DataFrame([new])], ignore_index=True)
+                _patch("clocks_editor").add_row(new)
         with colB:
             st.caption("Ex.: America/Sao_Paulo, America/New_York, Asia/Hong_Kong")
-        edited = _data_editor(df, key="clocks_editor", height=420)
+        _paged_editor(df, key="clocks_editor", height=420)
         if st.button("💾 Salvar relógios", type="primary"):
-            _save_table("worldclocks", edited, ["id","label","timezone"])
+            if _save_table("worldclocks", _patched("clocks_editor", df), ["id","label","timezone"]):
+                _reset_patch("clocks_editor")
     idx += 1
 
 # --------------------------------- Tab: Moedas (Settings) ---------------------------------
 if perms["can_currencies"]:
     with tabs[idx]:
         st.subheader("💱 Moedas (Settings)")
-        st.caption("Guarde chaves e configurações simples. Ex.: `currency_refresh_minutes = 5`")
+        st.caption("Guarde chaves e configurações simples. Ex.: `currency_refresh_minutes = 5`, "
+                   "`sheets_ttl_seconds = 180`, `news_rotation_seconds = 10`. "
+                   "Tema da TV: `theme_avatar_size = 160px`, `theme_ticker_h = 80px`, `theme_gap = 12px`...")
         df = _get_table("settings", ["key","value"])
         if df.empty:
             df = pd.DataFrame(columns=["key","value"])
         edited = _data_editor(df, key="settings_editor", height=320)
-        if st.button("💾 Salvar settings", type="primary"):
+        problems = parse_config(edited).errors
+        for msg in problems:
+            st.error(msg)
+        with st.expander("⚙️ Configuração de operação (valores vigentes)"):
+            st.caption("Chaves reconhecidas na aba settings; mudanças valem na hora nos processos deste servidor e em até 1 minuto nos demais, sem redeploy.")
+            st.dataframe(describe_config(), use_container_width=True, hide_index=True)
+        if st.button("💾 Salvar settings", type="primary", disabled=bool(problems)):
             _save_table("settings", edited, ["key","value"])
     idx += 1
 
@@ -381,7 +661,7 @@ if perms["is_admin"]:
     with tabs[idx]:
         st.subheader("👥 Usuários (somente administrador)")
 
-        df = users_df.copy()  # já normalizado
+        df = users_df.copy(deep=False)  # já normalizado; CoW protege o frame compartilhado
         # Editor principal (oculta hash/salt, mostra toggles)
         show_cols = [
             "username","name","email","is_admin","can_news","can_weather",
@@ -417,11 +697,12 @@ if perms["is_admin"]:
                     df2 = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
                     try:
                         # Salva tabela completa de users (incluindo hash/salt)
-                        replace_df("users", df2.fillna(""))
-                        st.session_state["cached_tables"]["users"] = df2
+                        _store_save("users", df2)
                         st.success("Usuário criado.")
                         time.sleep(0.4)
                         st.rerun()
+                    except ConflictError as e:
+                        _conflict_msg(e)
                     except Exception as e:
                         st.error("Falha ao criar usuário.")
                         st.exception(e)
@@ -439,9 +720,10 @@ if perms["is_admin"]:
                     df.loc[df["username"] == sel_user, "password_salt"] = salt
                     df.loc[df["username"] == sel_user, "password_hash"] = pwh
                     try:
-                        replace_df("users", df.fillna(""))
-                        st.session_state["cached_tables"]["users"] = df
+                        _store_save("users", df)
                         st.success("Senha alterada.")
+                    except ConflictError as e:
+                        _conflict_msg(e)
                     except Exception as e:
                         st.error("Falha ao redefinir senha.")
                         st.exception(e)
@@ -456,9 +738,10 @@ if perms["is_admin"]:
                 else:
                     df.loc[df["username"] == sel_user2, "active"] = bool(active_toggle)
                     try:
-                        replace_df("users", df.fillna(""))
-                        st.session_state["cached_tables"]["users"] = df
+                        _store_save("users", df)
                         st.success("Status atualizado.")
+                    except ConflictError as e:
+                        _conflict_msg(e)
                     except Exception as e:
                         st.error("Falha ao atualizar status.")
                         st.exception(e)
@@ -473,9 +756,50 @@ if perms["is_admin"]:
                 else:
                     df[c] = edited_view[c].astype(str).str.lower().isin(["true","1","yes","y","sim"])
             try:
-                replace_df("users", df.fillna(""))
-                st.session_state["cached_tables"]["users"] = df
+                _store_save("users", df)
                 st.success("Permissões salvas.")
+            except ConflictError as e:
+                _conflict_msg(e)
             except Exception as e:
                 st.error("Falha ao salvar permissões.")
                 st.exception(e)
+    idx += 1
+
+# --------------------------------- Tab: Diagnóstico (Admin) ---------------------------------
+if perms["is_admin"]:
+    with tabs[idx]:
+        st.subheader("📈 Diagnóstico (métricas deste processo)")
+        on = metrics_enabled()
+        st.caption("Tempo por etapa da TV, chamadas externas (Sheets, clima, cotações) e acertos de cache, "
+                   "somados desde o início do processo (ou do último zerar). Ligue de forma permanente com "
+                   "`LUKMA_METRICS=1` ou `[app].metrics = true`; desligado, a coleta não custa nada.")
+        c1, c2 = st.columns([1, 1])
+        with c1:
+            if st.toggle("Coletar métricas", value=on, key="metrics_on") != on:
+                enable_metrics(not on)
+                st.rerun()
+        with c2:
+            if st.button("Zerar métricas"):
+                REGISTRY.reset()
+                st.rerun()
+        st.markdown("#### Latências")
+        st.dataframe(REGISTRY.timings(), use_container_width=True, hide_index=True)
+        st.markdown("#### Contadores")
+        st.dataframe(REGISTRY.counter_frame(), use_container_width=True, hide_index=True)
+        with st.expander("Formato Prometheus"):
+            text = REGISTRY.prometheus()
+            st.code(text, language="text")
+            st.download_button("Baixar metrics.txt", text, file_name="metrics.txt", mime="text/plain")
+        if store.journal is not None:
+            st.markdown("#### Fila de gravação na planilha")
+            st.caption("Saves do Admin entram num diário local (SQLite) e são entregues em segundo plano; "
+                       "saves seguidos da mesma aba saem numa gravação só. Desligue com `[app].write_behind = false`.")
+            recent = store.journal.recent()
+            shown = recent.assign(**{c: recent[c].map(_clock) for c in ("created_at", "updated_at")}) if len(recent) else recent
+            st.dataframe(shown, use_container_width=True, hide_index=True)
+            for seq, ws_name in recent.loc[recent["state"] == "conflict", ["seq", "ws_name"]].head(5).itertuples(index=False):
+                rejected = store.journal.entry_frame(int(seq))
+                if rejected is not None:
+                    st.download_button(f"Baixar edição rejeitada #{seq} ({ws_name}).csv",
+                                       rejected.to_csv(index=False).encode("utf-8"),
+                                       file_name=f"{ws_name}-rejeitada-{seq}.csv", mime="text/csv", key=f"rejected_{seq}")
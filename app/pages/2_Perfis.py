@@ -0,0 +1,41 @@
+import streamlit as st
+
+from utils.config import runtime_config
+from utils.profiler import KEEP_PROFILES, SUFFIX, list_profiles, profile_dir
+
+# --------------------------------- Perfis de rerun (somente administrador) ---------------------------------
+st.set_page_config(page_title="Perfis • Lukma TV", page_icon="🔥", layout="wide")
+st.title("🔥 Perfis de rerun")
+
+auth = st.session_state.get("auth_user")
+if not auth or not auth.get("is_admin"):
+    st.warning("Entre no **Painel Admin** com um usuário administrador para ver os perfis.")
+    st.stop()
+
+out_dir = profile_dir()
+rate = runtime_config().profile_sample_rate
+st.caption(f"Amostragem: **{rate:.1%}** dos reruns (`profile_sample_rate` na aba settings ou `[app]` do secrets); "
+           f"numa tela específica, abra com `?profile=1`. Pasta `{out_dir}` (mantém os {KEEP_PROFILES} mais recentes).")
+st.caption("Abra o `.speedscope.json` em https://www.speedscope.app ; o `.folded` serve para o flamegraph.pl.")
+
+df = list_profiles(out_dir)
+if df.empty:
+    st.info("Nenhum perfil gravado ainda.")
+    st.stop()
+
+st.dataframe(df, use_container_width=True, hide_index=True)
+name = st.selectbox("Perfil", df["arquivo"].tolist())
+path = out_dir / name
+folded = path.with_name(name[:-len(SUFFIX)] + ".folded")
+c1, c2, c3 = st.columns([1, 1, 1])
+with c1:
+    if path.is_file():
+        st.download_button("⬇️ speedscope (.json)", path.read_bytes(), file_name=name, mime="application/json")
+with c2:
+    if folded.is_file():
+        st.download_button("⬇️ flamegraph (.folded)", folded.read_bytes(), file_name=folded.name, mime="text/plain")
+with c3:
+    if st.button("🗑️ Apagar este perfil"):
+        path.unlink(missing_ok=True)
+        folded.unlink(missing_ok=True)
+        st.rerun()
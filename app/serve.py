@@ -0,0 +1,43 @@
+"""
+Sobe a TV já aquecida: imports, cliente do Sheets, leituras, índices, clima, cotações e tema entram
+em cache no boot, em vez de pesarem no render do primeiro visitante depois de um deploy.
+
+Uso:
+    python app/serve.py                               # = streamlit run app/tv.py, com aquecimento
+    python app/serve.py --server.port 8502 --server.headless true
+    python app/serve.py --no-warmup
+Os demais argumentos vão direto para o `streamlit run`.
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+APP = Path(__file__).resolve().parent
+sys.path.insert(0, str(APP))
+RUNTIME_WAIT = 60  # s esperando o runtime do Streamlit (opções da linha de comando e secrets carregados)
+
+def _warm_up_when_ready():
+    from streamlit.runtime import Runtime
+    deadline = time.monotonic() + RUNTIME_WAIT
+    while not Runtime.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    from utils.warmup import warm_up  # mesmos módulos que o tv.py importa (sys.path acima)
+    timings = warm_up()
+    stages = ", ".join(f"{k}={'falhou' if v is None else f'{v:.0f} ms'}" for k, v in timings.items())
+    print(f"Aquecimento concluído: {stages}", flush=True)
+
+def main():
+    ap = argparse.ArgumentParser(description="Sobe a Lukma TV com aquecimento de caches no boot.")
+    ap.add_argument("--no-warmup", action="store_true", help="sobe sem aquecer (igual ao streamlit run)")
+    args, streamlit_args = ap.parse_known_args()
+
+    if not args.no_warmup:
+        threading.Thread(target=_warm_up_when_ready, name="lukma-warmup", daemon=True).start()
+
+    from streamlit.web import cli
+    cli.main(args=["run", str(APP / "tv.py"), *streamlit_args], prog_name="streamlit")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Daemon de sincronização: um único processo lê planilha, clima e cotações e grava snapshots
+versionados numa pasta local; as réplicas da app (TV, feed, export) só leem esses arquivos.
+O tráfego externo fica constante, não importa quantas réplicas ou telas existam.
+
+Uso:
+    python app/sync_daemon.py --out /var/lib/lukma-tv/snapshots
+    python app/sync_daemon.py --out /var/lib/lukma-tv/snapshots --once
+
+Nas réplicas, aponte para a mesma pasta: `LUKMA_SNAPSHOT_DIR=...` ou `[app].snapshot_dir`
+no secrets. Sem heartbeat do daemon por MAX_STALE segundos, elas voltam a ler direto.
+A aba users nunca é sincronizada (o Admin lê e grava direto na planilha).
+Mídia (imagens, fotos, vídeos) não entra: as telas só recebem as URLs e quem baixa é o navegador,
+então as réplicas não fazem tráfego de mídia a economizar.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from utils.bus import bus_changed, bus_tokens, publish
+from utils.config import parse_config
+from utils.data import filter_active, rates_now, weather_now
+from utils.feed import content_version
+from utils.sheets import fetch_tables, sheet_last_update, table_version
+from utils.snapshots import SYNC_TABLES, SnapshotWriter
+
+class SyncLoop:
+    def __init__(self, out_dir: str, poll: float):
+        self.out_dir = out_dir
+        self.poll = poll
+        self.stamp = None
+        self.seen = {}             # carimbos do barramento das abas na última leitura
+        self.next_tables = 0.0     # sem carimbo do Drive: próxima releitura por tempo
+        self.settings = pd.DataFrame(columns=["key","value"])
+        self.units = pd.DataFrame()
+        self.next_weather = 0.0
+        self.next_rates = 0.0
+
+    def tick(self):
+        writer = SnapshotWriter(self.out_dir)
+        changed = []
+        stamp = sheet_last_update()
+        cfg = parse_config(self.settings)
+        now = time.monotonic()
+        if stamp is None:
+            # carimbo do Drive indisponível: relê só quando o Admin avisar pelo barramento ou a cada
+            # sheets_ttl_seconds (como o cache das réplicas), nunca a cada poll
+            due = bool(bus_changed(self.seen)) or now >= self.next_tables
+        else:
+            due = stamp != self.stamp
+        if due or not writer.manifest["tables"]:
+            self.seen = bus_tokens(SYNC_TABLES)  # antes da leitura: não perde gravação concorrente
+            self.next_tables = now + cfg.sheets_ttl_seconds
+            tables = fetch_tables(SYNC_TABLES, strict=True)
+            for name, df in tables.items():
+                if writer.write_table(name, df, table_version(df)):
+                    changed.append(name)
+            self.stamp = stamp
+            self.settings, self.units = tables["settings"], filter_active(tables["weather_units"])
+            if "weather_units" in changed:
+                self.next_weather = 0.0  # unidade nova/alterada: clima já no próximo passo
+
+        cfg = parse_config(self.settings)
+        if now >= self.next_weather:
+            weather = weather_now(self.units).to_dict("records")
+            # API fora do ar: mantém o último clima bom em vez de publicar vazio
+            if (weather or self.units.empty) and writer.write_data("weather", weather, content_version({"weather": weather})):
+                changed.append("weather")
+            self.next_weather = now + cfg.weather_refresh_minutes * 60
+        if now >= self.next_rates:
+            rates = rates_now()
+            if rates and writer.write_data("rates", rates, content_version({"rates": rates})):
+                changed.append("rates")
+            self.next_rates = now + cfg.currency_refresh_minutes * 60
+
+        writer.commit()  # heartbeat, mesmo sem mudanças
+        for name in changed:
+            publish(name)  # réplicas deste host recarregam na hora
+        self.seen.update(bus_tokens([n for n in changed if n in self.seen]))  # o próprio aviso não força releitura
+        return changed
+
+def main():
+    ap = argparse.ArgumentParser(description="Sincroniza planilha/clima/cotações em snapshots locais.")
+    ap.add_argument("--out", required=True, help="pasta compartilhada dos snapshots")
+    ap.add_argument("--poll", type=float, default=15.0, help="segundos entre verificações da planilha")
+    ap.add_argument("--once", action="store_true", help="um ciclo e sai")
+    args = ap.parse_args()
+
+    loop = SyncLoop(args.out, args.poll)
+    while True:
+        try:
+            changed = loop.tick()
+            if changed:
+                print(f"Snapshot atualizado: {', '.join(changed)}")
+        except Exception as e:
+            print(f"Falha na sincronização (snapshot anterior mantido): {e}")
+        if args.once:
+            break
+        time.sleep(args.poll)
+
+if __name__ == "__main__":
+    main()
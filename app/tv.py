@@ -1,10 +1,19 @@
 import pandas as pd
 import streamlit as st
 
-from utils.sheets import read_tables
-from utils.data import fetch_weather, fetch_rates, world_times
+from utils.sheets import show_read_errors, table_version
+from utils.sites import current_site, read_site_tables
+from utils.birthdays import birthday_index, local_today
+from utils.schedule import schedule_index, local_now
+from utils.data import fetch_weather_records, fetch_rates, world_times, active_view
+from utils.config import runtime_config, settings_config
+from utils.feed import TV_COLUMNS, TV_TABLES
+from utils.metrics import laps
+from utils.orchestrator import depends_on, gather
+from utils.profiler import profile_rerun
 from utils.ui import (
     inject_base_css,
+    empty_card_html,
     news_card,
     bday_card,
     weather_ticker,
@@ -12,49 +21,65 @@ from utils.ui import (
     line_e_block,     # << nome correto
 )
 
-# ------------------------------ Config & CSS ------------------------------
+# ------------------------------ Config, dados & CSS ------------------------------
 st.set_page_config(page_title="Lukma TV", page_icon="📺", layout="wide")
-inject_base_css()
-st.markdown("<a class='logo-btn' href='/1_Admin' target='_self'>⚙️ Admin</a>", unsafe_allow_html=True)
+profile_rerun("tv")  # amostra este rerun se sorteado (profile_sample_rate) ou com ?profile=1
 
-# ------------------------------ Dados ------------------------------
-TABLES = ["news","birthdays","videos","weather_units","worldclocks"]
-tables = read_tables(TABLES)
+clock = laps("tv_stage_seconds")  # tempo por etapa do render (no-op com métricas desligadas)
+
+site = current_site()  # ?site=<slug>: planilha global + a do site, nada dos outros escritórios
 
-def filter_active(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty: return pd.DataFrame()
-    df = df.copy(); df.columns = [str(c).strip() for c in df.columns]
-    if "active" in df.columns:
-        df = df[df["active"].astype(str).str.lower().isin(["true","1","yes"])]
-    return df.reset_index(drop=True)
+# (tabelas e clima por site: telas de escritórios diferentes não compartilham busca nem último valor bom)
+dep = {"tables": f"tables@{site}" if site else "tables", "weather": f"weather@{site}" if site else "weather"}
 
-def safe_len(df: pd.DataFrame) -> int:
-    return 0 if df is None or df.empty else len(df)
+def _tables():
+    return read_site_tables(site, TV_TABLES, columns=TV_COLUMNS)
 
-news_df = filter_active(tables.get("news", pd.DataFrame()))
-bd_df   = filter_active(tables.get("birthdays", pd.DataFrame()))
-vid_df  = filter_active(tables.get("videos", pd.DataFrame()))
+def _weather():
+    # unidades da leitura que o render já pediu (dependência declarada: sem segunda leitura no pool)
+    tables = depends_on(dep["tables"], _tables)
+    units = active_view("weather_units", tables.get("weather_units", pd.DataFrame()))  # uma por versão
+    return fetch_weather_records(units if not units.empty else pd.DataFrame())
 
-wu_df_raw = tables.get("weather_units", pd.DataFrame())
-wu_df = filter_active(wu_df_raw) if not wu_df_raw.empty else pd.DataFrame()
-wc_df = tables.get("worldclocks", pd.DataFrame())
+# planilha, clima e cotações em paralelo, sob um prazo único; o que atrasar sai com o último valor bom
+# e termina em segundo plano (cache pronto para o próximo render)
+deps, stale = gather({dep["tables"]: _tables, dep["weather"]: _weather, "rates": fetch_rates},
+                     runtime_config().render_deadline_seconds,
+                     defaults={dep["tables"]: {}, dep["weather"]: (), "rates": {}})
+tables, weather, rates = deps[dep["tables"]], deps[dep["weather"]], deps["rates"]
+show_read_errors(tables)  # falhas da leitura no pool, exibidas aqui (thread do script)
+clock.lap("fetch")
 
-weather_df = fetch_weather(wu_df if not wu_df.empty else pd.DataFrame())
-rates = fetch_rates()
+inject_base_css(tables.get("settings"))
+st.markdown("<a class='logo-btn' href='/1_Admin' target='_self'>⚙️ Admin</a>", unsafe_allow_html=True)
+clock.lap("css")
+
+# ------------------------------ Dados ------------------------------
+# notícias/vídeos: só o que está dentro da janela de publicação, ponderado por prioridade
+now = local_now()
+news_src = tables.get("news", pd.DataFrame())
+vid_src  = tables.get("videos", pd.DataFrame())
+news_rows = schedule_index("news", table_version(news_src), news_src).playlist(now)
+vid_rows  = schedule_index("videos", table_version(vid_src), vid_src).playlist(now)
+bd_src  = tables.get("birthdays", pd.DataFrame())
+# só os aniversariantes de hoje (ou, sem nenhum hoje, os do mês) entram na rotação
+bd_scope, bd_rows = birthday_index(table_version(bd_src), bd_src).current(local_today())
+clock.lap("indexes")
+
+# clima e horários já são registros imutáveis compartilhados (records.py): nada de DataFrame daqui para baixo
 times = world_times()
 
 # rotação (notícia, aniversariante, vídeo)
-news_interval_ms = int(st.secrets["app"].get("news_rotation_seconds", 10)) * 1000
-news_i = st.session_state.get("rot_news", 0) % max(safe_len(news_df), 1)
-bday_i = st.session_state.get("rot_bdays", 0) % max(safe_len(bd_df), 1)
+# aba settings (a do site vale sobre a global) > secrets > 10s
+screen_cfg = settings_config(tables.get("settings")) if site else runtime_config()
+news_interval_ms = screen_cfg.news_rotation_seconds * 1000
+news_i = st.session_state.get("rot_news", 0) % max(len(news_rows), 1)
+bday_i = st.session_state.get("rot_bdays", 0) % max(len(bd_rows), 1)
 
 vid_default_ms = 30_000
-if safe_len(vid_df) > 0:
-    current_vid = vid_df.iloc[st.session_state.get("rot_videos", 0) % len(vid_df)]
-    try:
-        vid_ms = int(float(current_vid.get("duration_seconds") or 30)) * 1000
-    except Exception:
-        vid_ms = vid_default_ms
+if vid_rows:
+    current_vid = vid_rows[st.session_state.get("rot_videos", 0) % len(vid_rows)]
+    vid_ms = current_vid.duration_ms(vid_default_ms)
 else:
     current_vid = None
     vid_ms = vid_default_ms
@@ -64,46 +89,52 @@ st.markdown("<div class='grid'>", unsafe_allow_html=True)
 
 # A - Notícias
 st.markdown("<div class='area a'>", unsafe_allow_html=True)
-if safe_len(news_df) == 0:
-    st.markdown("<div class='title'>📰 Notícias</div><div class='empty'>Sem notícias ativas.</div>", unsafe_allow_html=True)
+if not news_rows:
+    st.markdown(empty_card_html("📰 Notícias", "Sem notícias ativas."), unsafe_allow_html=True)
 else:
-    r = news_df.iloc[news_i]
-    news_card(r.get("title",""), r.get("description",""), r.get("image_url",""))
+    r = news_rows[news_i]
+    news_card(r.title, r.description, r.image_url)
 st.markdown("</div>", unsafe_allow_html=True)
+clock.lap("ui_news")
 
 # C - Aniversariantes
 st.markdown("<div class='area c'>", unsafe_allow_html=True)
-if safe_len(bd_df) == 0:
-    st.markdown("<div class='title'>🎉 Aniversariante do mês</div><div class='empty'>Sem aniversariantes.</div>", unsafe_allow_html=True)
+if not bd_rows:
+    st.markdown(empty_card_html("🎉 Aniversariante do mês", "Sem aniversariantes."), unsafe_allow_html=True)
 else:
-    r = bd_df.iloc[bday_i]
-    day = str(r.get("birthday",""))[-2:] if r.get("birthday") else "--"
-    bday_card(r.get("name",""), r.get("sector",""), day, r.get("photo_url",""))
+    r = bd_rows[bday_i]
+    title = "🎉 Aniversariante do dia" if bd_scope == "day" else "🎉 Aniversariante do mês"
+    bday_card(r.name, r.sector, r.day, r.photo_url, title=title)
 st.markdown("</div>", unsafe_allow_html=True)
+clock.lap("ui_birthdays")
 
 # D - Vídeos
 st.markdown("<div class='area d'>", unsafe_allow_html=True)
 if current_vid is None:
-    st.markdown("<div class='title'>🎬 Vídeos institucionais</div><div class='empty'>Sem vídeos.</div>", unsafe_allow_html=True)
+    st.markdown(empty_card_html("🎬 Vídeos institucionais", "Sem vídeos."), unsafe_allow_html=True)
 else:
-    video_player(str(current_vid.get("url","")))
+    video_player(current_vid.url)
 st.markdown("</div>", unsafe_allow_html=True)
+clock.lap("ui_video")
 
 # E - 3 cartões: Câmbio | Horários | Clima (1ª unidade)
 st.markdown("<div class='area e'>", unsafe_allow_html=True)
-line_e_block(times, rates, weather_df if weather_df is not None else pd.DataFrame())
+line_e_block(times, rates, weather)
 st.markdown("</div>", unsafe_allow_html=True)
+clock.lap("ui_line_e")
 
 # F - Ticker (tempo)
 st.markdown("<div class='area f'>", unsafe_allow_html=True)
-weather_ticker(weather_df if weather_df is not None else pd.DataFrame())
+weather_ticker(weather)
 st.markdown("</div>", unsafe_allow_html=True)
+clock.lap("ui_ticker")
 
 st.markdown("</div>", unsafe_allow_html=True)
 
 # ------------------------------ Auto refresh + índices ------------------------------
 refresh_ms = min(news_interval_ms, vid_ms)
 st.markdown(f"<script>setTimeout(function(){{ window.location.reload(); }}, {refresh_ms});</script>", unsafe_allow_html=True)
-st.session_state["rot_news"]   = (st.session_state.get("rot_news", 0) + 1) % max(safe_len(news_df), 1)
-st.session_state["rot_bdays"]  = (st.session_state.get("rot_bdays", 0) + 1) % max(safe_len(bd_df), 1)
-st.session_state["rot_videos"] = (st.session_state.get("rot_videos", 0) + 1) % max(safe_len(vid_df), 1)
+st.session_state["rot_news"]   = (st.session_state.get("rot_news", 0) + 1) % max(len(news_rows), 1)
+st.session_state["rot_bdays"]  = (st.session_state.get("rot_bdays", 0) + 1) % max(len(bd_rows), 1)
+st.session_state["rot_videos"] = (st.session_state.get("rot_videos", 0) + 1) % max(len(vid_rows), 1)
+clock.total()
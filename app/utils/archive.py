@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from .config import parse_config
+from .data import TRUTHY
+from .schedule import parse_when
+from .sheets import DEFAULT_COLUMNS, append_rows
+
+# Abas "quentes" -> aba de arquivo (mesmas colunas + archived_at)
+ARCHIVE_TABS = {"news": "news_archive", "videos": "videos_archive"}
+
+def retention_days(settings_df: Optional[pd.DataFrame]) -> int:
+    """Retenção (`archive_retention_days`) configurada na aba settings."""
+    return parse_config(settings_df).archive_retention_days
+
+def stale_reason(row: dict, now: datetime, days: int) -> Optional[str]:
+    """Por que a linha pode sair da aba quente (None = continua)."""
+    if str(row.get("active", "")).strip().lower() not in TRUTHY:
+        return "inativo"
+    until, ok = parse_when(row.get("publish_until"), end_of_day=True)
+    if ok and until is not None and until <= now:
+        return "janela encerrada"
+    if days:
+        created, ok = parse_when(row.get("created_at"))
+        if ok and created is not None and created < now - timedelta(days=days):
+            return f"mais de {days} dias"
+    return None
+
+def split_stale(df: pd.DataFrame, now: datetime, days: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(linhas que ficam, linhas a arquivar com a coluna `motivo`)."""
+    if df is None or df.empty:
+        return df, pd.DataFrame(columns=list(getattr(df, "columns", [])) + ["motivo"])
+    reasons = [stale_reason(r, now, days) for r in df.to_dict("records")]
+    mask = pd.Series([r is not None for r in reasons], index=df.index)
+    stale = df[mask].assign(motivo=[r for r in reasons if r is not None])
+    return df[~mask].reset_index(drop=True), stale.reset_index(drop=True)
+
+def archive_stale(store, ws_name: str, base_version: Optional[str], now: datetime, days: int) -> int:
+    """
+    Move as linhas vencidas de `ws_name` para a aba de arquivo: um append em lote no arquivo
+    e uma regravação da aba quente (via store, com merge otimista). Devolve quantas saíram.
+    O append vem primeiro: se a regravação falhar, sobra uma cópia no arquivo (a restauração
+    deduplica por id), nunca uma linha perdida.
+    """
+    snap = store.snapshot(ws_name, base_version)
+    keep, stale = split_stale(snap.df, now, days)
+    if stale.empty:
+        return 0
+    stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    append_rows(ARCHIVE_TABS[ws_name], [{**r, "archived_at": stamp} for r in stale.drop(columns=["motivo"]).to_dict("records")])
+    store.save(ws_name, keep, snap.version)
+    return len(stale)
+
+class ArchiveIndex:
+    """Itens arquivados por id (o arquivamento mais recente vence), para busca e restauração."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.by_id: Dict[str, dict] = {}
+        if df is None or df.empty or "id" not in df.columns:
+            return
+        for r in df.to_dict("records"):
+            rid = str(r.get("id") or "").strip()
+            if rid and str(r.get("archived_at", "")) >= str(self.by_id.get(rid, {}).get("archived_at", "")):
+                self.by_id[rid] = r
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def search(self, query: str = "", limit: int = 200) -> List[dict]:
+        q = (query or "").strip().lower()
+        rows = sorted(self.by_id.values(), key=lambda r: str(r.get("archived_at", "")), reverse=True)
+        if q:
+            rows = [r for r in rows if q in str(r.get("title", "")).lower() or q == str(r.get("id", "")).lower()]
+        return rows[:limit]
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def archive_index(name: str, version: str, _df: pd.DataFrame) -> ArchiveIndex:
+    return ArchiveIndex(_df)
+
+def restore_rows(store, ws_name: str, ids: List[str], hot_version: Optional[str], archive_version: Optional[str],
+                 now: datetime) -> int:
+    """
+    Devolve itens do arquivo para a aba quente, ativos. Janela vencida é limpa e a idade
+    recomeça em `now`; senão o próximo arquivamento levaria o item de volta.
+    """
+    arch_name = ARCHIVE_TABS[ws_name]
+    arch = store.snapshot(arch_name, archive_version)
+    index = ArchiveIndex(arch.df)
+    ids = [i for i in ids if i in index.by_id]
+    if not ids:
+        return 0
+    hot = store.snapshot(ws_name, hot_version)
+    cols = DEFAULT_COLUMNS[ws_name]
+    present = set(hot.df["id"].astype(str)) if "id" in hot.df.columns else set()
+    back = [{c: index.by_id[i].get(c, "") for c in cols} for i in ids if i not in present]
+    for r in back:
+        r["active"] = "TRUE"
+        if stale_reason(r, now, 0):
+            r["publish_until"] = ""
+        if "created_at" in r:
+            r["created_at"] = now.strftime("%Y-%m-%d %H:%M:%S")
+    if back:
+        store.save(ws_name, pd.concat([hot.df.reindex(columns=cols), pd.DataFrame(back, columns=cols)], ignore_index=True), hot.version)
+    rest = arch.df[~arch.df["id"].astype(str).isin(ids)]
+    store.save(arch_name, rest.reset_index(drop=True), arch.version)
+    return len(ids)
@@ -1,8 +1,21 @@
+import copy
+from typing import Dict
+
 import streamlit as st
 import pandas as pd
 import bcrypt
 import streamlit_authenticator as stauth
-from .sheets import read_df, upsert_row
+from .bus import bus_token
+from .sheets import read_df, table_version, upsert_row
+
+# ---- Índice de permissões: username -> bitmask, recompilado só quando a aba users muda ----
+PERM_FIELDS = [
+    "is_admin","can_news","can_weather","can_birthdays","can_videos",
+    "can_worldclocks","can_currencies","active"
+]
+PERM_BITS = {f: 1 << i for i, f in enumerate(PERM_FIELDS)}
+PERM_TRUTHY = ["1","true","yes","y","sim"]
+INDEX_TTL = 180  # mesmo TTL da leitura das abas
 
 def _users_df() -> pd.DataFrame:
     df = read_df("users")
@@ -14,15 +27,67 @@ def _users_df() -> pd.DataFrame:
         ])
     return df
 
-def build_authenticator():
+class PermissionIndex:
+    """Permissões e credenciais (usuários ativos) compiladas de uma versão da aba users."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.masks: Dict[str, int] = {}
+        self.credentials = {"usernames": {}}
+        if df is None or df.empty or "username" not in df.columns:
+            return
+        for r in df.to_dict("records"):
+            username = str(r.get("username") or "").strip()
+            if not username or username in self.masks:
+                continue  # primeira linha vence (como no filtro antigo + iloc[0])
+            mask = 0
+            for f, bit in PERM_BITS.items():
+                if str(r.get(f, "")).strip().lower() in PERM_TRUTHY:
+                    mask |= bit
+            self.masks[username] = mask
+            if mask & PERM_BITS["active"]:
+                self.credentials["usernames"][username] = {
+                    "name": r.get("name", ""),
+                    "email": r.get("email", ""),
+                    "password": r.get("password_hash", ""),  # already hashed
+                }
+
+    def mask(self, username: str) -> int:
+        return self.masks.get(str(username), 0)
+
+    def has(self, username: str, perm_field: str) -> bool:
+        return bool(self.mask(username) & PERM_BITS.get(perm_field, 0))
+
+    def perms(self, username: str) -> Dict[str, bool]:
+        m = self.mask(username)
+        return {f: bool(m & bit) for f, bit in PERM_BITS.items()}
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def permission_index(version: str, _df: pd.DataFrame) -> PermissionIndex:
+    """Compilado uma vez por versão da aba users (compartilhado entre sessões)."""
+    return PermissionIndex(_df)
+
+def live_permissions(store) -> PermissionIndex:
+    """
+    Índice da versão vigente da aba users no TableStore do Admin. A sessão fixa uma versão só para
+    a grade de edição; login e checagem de permissão usam sempre esta (desativação vale no rerun seguinte).
+    """
+    snap = store.refresh(["users"])["users"]
+    return permission_index(snap.version, snap.df)
+
+def current_permissions() -> PermissionIndex:
+    """Índice vigente; entre releituras a consulta é só um lookup, sem DataFrame."""
+    return _permissions_for(bus_token("users"))
+
+@st.cache_resource(show_spinner=False, ttl=INDEX_TTL, max_entries=2)
+def _permissions_for(token: str) -> PermissionIndex:
     df = _users_df()
-    creds = {"usernames": {}}
-    for _, r in df[df["active"].astype(str).str.lower().isin(["true","1","yes"])].iterrows():
-        creds["usernames"][r["username"]] = {
-            "name": r["name"],
-            "email": r["email"],
-            "password": r["password_hash"],  # already hashed
-        }
+    return permission_index(table_version(df), df)
+
+def build_authenticator():
+    creds = copy.deepcopy(current_permissions().credentials)  # o Authenticate altera o dict
     return stauth.Authenticate(
         creds,
         st.secrets["auth"]["cookie_name"],
@@ -31,12 +96,7 @@ def build_authenticator():
     )
 
 def check_perm(username: str, perm_field: str) -> bool:
-    df = _users_df()
-    row = df[df["username"] == username]
-    if row.empty: 
-        return False
-    v = str(row.iloc[0].get(perm_field, ""))
-    return v.lower() in ["1","true","yes","y"]
+    return current_permissions().has(username, perm_field)
 
 def is_admin(username: str) -> bool:
     return check_perm(username, "is_admin")
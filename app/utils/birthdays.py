@@ -0,0 +1,72 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from .data import TRUTHY, TV_TZ
+from .records import Birthday
+
+# Formatos aceitos na coluna birthday (o recomendado no Admin é YYYY-MM-DD)
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d/%m", "%m-%d"]
+
+def parse_month_day(value) -> Optional[Tuple[int, int]]:
+    """Extrai (mês, dia) de uma data de aniversário; None se inválida."""
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            # ano bissexto fixo: aceita 29/02 nos formatos sem ano
+            d = datetime.strptime(raw if "%Y" in fmt else f"{raw}/2000", fmt if "%Y" in fmt else f"{fmt}/%Y")
+            return d.month, d.day
+        except ValueError:
+            continue
+    return None
+
+class BirthdayIndex:
+    """
+    Aniversariantes ativos agrupados por (mês, dia), montado uma vez por versão da tabela.
+    Cada item é um registro Birthday (name, sector, photo_url, month, day "07").
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.by_day: Dict[Tuple[int, int], List[Birthday]] = {}
+        self.by_month: Dict[int, List[Birthday]] = {m: [] for m in range(1, 13)}
+        self.invalid: List[str] = []  # nomes com data inválida (para avisar no Admin)
+        if df is None or df.empty:
+            return
+        for r in df.to_dict("records"):
+            if "active" in r and str(r.get("active", "")).strip().lower() not in TRUTHY:
+                continue
+            md = parse_month_day(r.get("birthday"))
+            if md is None:
+                self.invalid.append(str(r.get("name") or r.get("id") or "?"))
+                continue
+            item = Birthday(str(r.get("name") or ""), str(r.get("sector") or ""),
+                            str(r.get("photo_url") or ""), md[0], f"{md[1]:02d}")
+            self.by_day.setdefault(md, []).append(item)
+            self.by_month[md[0]].append(item)
+        for items in self.by_month.values():
+            items.sort(key=lambda it: (it.day, it.name))
+
+    def today(self, d: date) -> List[Birthday]:
+        return self.by_day.get((d.month, d.day), [])
+
+    def month(self, m: int) -> List[Birthday]:
+        return self.by_month.get(m, [])
+
+    def current(self, d: date) -> Tuple[str, List[Birthday]]:
+        """Subconjunto exibido na TV: os de hoje, se houver; senão os do mês."""
+        todays = self.today(d)
+        if todays:
+            return "day", todays
+        return "month", self.month(d.month)
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def birthday_index(version: str, _df: pd.DataFrame) -> BirthdayIndex:
+    """Índice compartilhado entre sessões; só é reconstruído quando a versão da aba muda."""
+    return BirthdayIndex(_df)
+
+def local_today() -> date:
+    return pd.Timestamp.now(tz=TV_TZ).date()
@@ -0,0 +1,86 @@
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import streamlit as st
+
+# ---- Barramento local de invalidação entre processos (um arquivo de versão por aba) ----
+# Quem grava numa aba "bate" o arquivo dela; cada worker compara o carimbo (stat: inode + mtime)
+# na próxima leitura e só relê as abas cujo carimbo mudou. Sem daemon, sem socket: basta os
+# workers da máquina apontarem para a mesma pasta.
+BUS_ENV = "LUKMA_BUS_DIR"
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+def default_bus_dir() -> str:
+    if os.environ.get(BUS_ENV):
+        return os.environ[BUS_ENV]
+    try:
+        configured = st.secrets.get("app", {}).get("bus_dir")
+    except Exception:
+        configured = None
+    return configured or os.path.join(tempfile.gettempdir(), "lukma-tv-bus")
+
+class VersionBus:
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or default_bus_dir())
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{_SAFE_NAME.sub('_', name)}.ver"
+
+    def publish(self, name: str):
+        """Marca a aba como alterada (escrita atômica: arquivo novo + rename)."""
+        path = self._path(name)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{time.time_ns()} {os.getpid()}\n")
+        os.replace(tmp, path)
+
+    def token(self, name: str) -> str:
+        """Carimbo atual da aba ("0" se nunca foi gravada neste host)."""
+        try:
+            s = os.stat(self._path(name))
+        except FileNotFoundError:
+            return "0"
+        return f"{s.st_ino}:{s.st_mtime_ns}"
+
+    def tokens(self, names: Iterable[str]) -> Dict[str, str]:
+        return {n: self.token(n) for n in names}
+
+    def changed(self, seen: Dict[str, str]) -> List[str]:
+        """Abas cujo carimbo mudou desde `seen`."""
+        return [n for n, tok in seen.items() if self.token(n) != tok]
+
+@st.cache_resource(show_spinner=False)
+def version_bus() -> VersionBus:
+    return VersionBus()
+
+def publish(name: str) -> bool:
+    """Avisa os workers (inclusive este); falha no barramento nunca derruba a gravação."""
+    try:
+        version_bus().publish(name)
+        return True
+    except OSError:
+        return False
+
+def bus_token(name: str) -> str:
+    try:
+        return version_bus().token(name)
+    except OSError:
+        return "0"
+
+def bus_tokens(names: Iterable[str]) -> Dict[str, str]:
+    try:
+        return version_bus().tokens(names)
+    except OSError:
+        return {n: "0" for n in names}
+
+def bus_changed(seen: Dict[str, str]) -> List[str]:
+    """Abas cujo carimbo mudou desde `seen` (barramento inacessível = carimbo "0", como em bus_token)."""
+    try:
+        return version_bus().changed(seen)
+    except OSError:
+        return [n for n, tok in seen.items() if tok != "0"]
@@ -0,0 +1,153 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from .bus import bus_token
+from .snapshots import snapshot_reader
+
+# ---- Configuração de operação lida da aba settings (tipada, validada, recarregada a quente) ----
+CONFIG_TTL = 60  # segundos entre releituras da aba settings
+
+@dataclass(frozen=True)
+class Knob:
+    key: str
+    kind: type
+    default: float
+    minimum: float
+    maximum: float
+    help: str
+
+SCHEMA: List[Knob] = [
+    Knob("sheets_ttl_seconds", int, 180, 15, 3600, "cache das leituras das abas (TV/feed)"),
+    Knob("sheets_read_sleep_ms", int, 400, 0, 5000, "pausa entre leituras sequenciais (cota)"),
+    Knob("sheets_max_retries", int, 4, 0, 10, "tentativas em erro 429 (cota)"),
+    Knob("weather_refresh_minutes", int, 15, 1, 240, "cache da previsão do tempo"),
+    Knob("currency_refresh_minutes", int, 5, 1, 240, "cache das cotações"),
+    Knob("news_rotation_seconds", int, 10, 3, 600, "troca de notícia/aniversariante na TV"),
+    Knob("feed_ttl_seconds", int, 15, 1, 600, "reconstrução do feed JSON"),
+    Knob("archive_retention_days", int, 180, 0, 3650, "idade máxima na aba quente (0 = sem limite)"),
+    Knob("profile_sample_rate", float, 0.0, 0.0, 1.0, "fração dos reruns perfilados (0 = desligado)"),
+    Knob("render_deadline_seconds", float, 3.0, 0.2, 60.0, "espera máxima pelos dados de um render da TV"),
+]
+KNOBS: Dict[str, Knob] = {k.key: k for k in SCHEMA}
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    sheets_ttl_seconds: int = 180
+    sheets_read_sleep_ms: int = 400
+    sheets_max_retries: int = 4
+    weather_refresh_minutes: int = 15
+    currency_refresh_minutes: int = 5
+    news_rotation_seconds: int = 10
+    feed_ttl_seconds: int = 15
+    archive_retention_days: int = 180
+    profile_sample_rate: float = 0.0
+    render_deadline_seconds: float = 3.0
+    errors: Tuple[str, ...] = ()
+
+def _coerce(knob: Knob, raw) -> Tuple[Optional[float], Optional[str]]:
+    s = str(raw).strip().replace(",", ".")
+    try:
+        f = float(s)
+        if f != f:
+            raise ValueError("NaN")
+        v = knob.kind(f)
+    except (ValueError, OverflowError):  # int(inf), "1e400"...: inválido, nunca derruba a config
+        return None, f"`{knob.key}`: valor inválido {raw!r} (esperado número)"
+    if not knob.minimum <= v <= knob.maximum:
+        return None, f"`{knob.key}`: {v} fora do intervalo {knob.minimum:g}–{knob.maximum:g}"
+    return v, None
+
+def parse_config(settings_df: Optional[pd.DataFrame], defaults: Optional[dict] = None) -> RuntimeConfig:
+    """
+    Monta a configuração: padrão do schema < `defaults` (ex.: secrets) < aba settings.
+    Valor inválido/fora do intervalo é ignorado (fica o anterior) e listado em `errors`.
+    Chaves desconhecidas (ex.: theme_*) são de outros módulos e não entram aqui.
+    """
+    values = {k.key: k.kind(k.default) for k in SCHEMA}
+    errors = []
+    for key, raw in (defaults or {}).items():
+        if key in KNOBS:
+            v, err = _coerce(KNOBS[key], raw)
+            if err is None:
+                values[key] = v
+    if settings_df is not None and not settings_df.empty and {"key", "value"} <= set(settings_df.columns):
+        for r in settings_df.to_dict("records"):
+            key = str(r.get("key") or "").strip()
+            if key not in KNOBS or str(r.get("value") or "").strip() == "":
+                continue
+            v, err = _coerce(KNOBS[key], r.get("value"))
+            if err:
+                errors.append(err)
+            else:
+                values[key] = v
+    return RuntimeConfig(**values, errors=tuple(errors))
+
+def _secrets_defaults() -> dict:
+    try:
+        return dict(st.secrets.get("app", {}))
+    except Exception:
+        return {}
+
+def runtime_config(site: Optional[str] = None) -> RuntimeConfig:
+    """
+    Configuração vigente do processo; relida a cada CONFIG_TTL ou logo que a aba settings é gravada.
+    Com `site`, as chaves da aba settings do site valem sobre as globais (ver settings_config).
+    """
+    cfg = _load_config(bus_token("settings"))
+    _apply_sheets_limits(cfg)
+    if not site:
+        return cfg
+    from .sites import read_site_tables  # sites -> sheets -> este módulo: import tardio
+    return settings_config(read_site_tables(site, ["settings"], columns={"settings": ["key", "value"]})["settings"])
+
+def settings_config(settings_df: Optional[pd.DataFrame]) -> RuntimeConfig:
+    """
+    Configuração de uma aba settings já lida (ex.: a mesclada de um site, que a tela já tem em mãos).
+    Vale para o que é da tela (rotação); prazos, cache e cota do Sheets seguem a configuração global.
+    """
+    if settings_df is None:
+        return runtime_config()
+    from .sheets import table_version
+    return _settings_config(table_version(settings_df), settings_df)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _settings_config(version: str, _df: pd.DataFrame) -> RuntimeConfig:
+    return parse_config(_df, _secrets_defaults())
+
+def _apply_sheets_limits(cfg: RuntimeConfig):
+    """Retries e pausa entre leituras do sheets.py (fora do cache: valem a cada chamada, não só ao recalcular)."""
+    from . import sheets  # sheets importa este módulo: import tardio evita o ciclo
+    sheets.MAX_RETRIES = cfg.sheets_max_retries
+    sheets.BETWEEN_READ_SLEEP = cfg.sheets_read_sleep_ms / 1000
+
+@st.cache_resource(show_spinner=False, ttl=CONFIG_TTL, max_entries=2)
+def _load_config(token: str) -> RuntimeConfig:
+    from . import sheets  # sheets importa este módulo: import tardio evita o ciclo
+    reader = snapshot_reader()
+    df = reader.table("settings") if reader else None  # sync_daemon ativo: nada de ir à planilha
+    if df is None:
+        try:
+            df = sheets.fetch_projected({"settings": ["key", "value"]})["settings"]
+        except Exception:
+            df = None  # sem planilha (ou sem aba): padrões + secrets
+    return parse_config(df, _secrets_defaults())
+
+def ttl_bucket(seconds: float, now: Optional[float] = None) -> int:
+    """
+    Janela de tempo atual para TTL dinâmico: entra na chave de um st.cache_data sem ttl fixo,
+    então mudar o TTL na aba settings vale na próxima leitura, sem redeploy.
+    """
+    seconds = max(float(seconds), 1.0)
+    return int((time.time() if now is None else now) // seconds)
+
+def describe() -> pd.DataFrame:
+    """Tabela do schema com o valor vigente (para o Admin)."""
+    cfg = runtime_config()
+    return pd.DataFrame([{
+        "key": k.key, "valor atual": getattr(cfg, k.key), "padrão": k.kind(k.default),
+        "faixa": f"{k.minimum:g}–{k.maximum:g}", "uso": k.help,
+    } for k in SCHEMA])
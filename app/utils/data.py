@@ -1,18 +1,129 @@
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
 import pandas as pd
 import streamlit as st
 
-@st.cache_data(ttl=900, show_spinner=False)  # 15 min
+from .config import runtime_config, ttl_bucket
+from .metrics import cache_lookup, cache_miss, count, timer
+from .records import ClockReading, WeatherReading, weather_readings
+from .sheets import table_version
+from .snapshots import snapshot_reader
+
+TRUTHY = ["true","1","yes"]
+# Bases das APIs externas; LUKMA_API_BASE aponta todas para um servidor local (bench/, simulações)
+API_BASE_ENV = "LUKMA_API_BASE"
+API_BASES = {
+    "open_meteo": "https://api.open-meteo.com",
+    "geocoding": "https://geocoding-api.open-meteo.com",
+    "exchangerate": "https://api.exchangerate.host",
+    "coingecko": "https://api.coingecko.com",
+}
+TV_TZ = "America/Sao_Paulo"  # fuso local das telas (datas de aniversário/publicação)
+WEATHER_COLUMNS = ["alias","temperature","windspeed","weathercode"]
+
+def api_url(service: str, path: str) -> str:
+    return (os.environ.get(API_BASE_ENV) or API_BASES[service]).rstrip("/") + path
+
+def filter_active(df: pd.DataFrame) -> pd.DataFrame:
+    """Mantém só as linhas com active verdadeiro (se a coluna existir)."""
+    if df is None or df.empty: return pd.DataFrame()
+    df = df.copy(deep=False); df.columns = [str(c).strip() for c in df.columns]  # copy-on-write: só o rótulo muda
+    if "active" in df.columns:
+        df = df[df["active"].astype(str).str.lower().isin(TRUTHY)]
+    return df.reset_index(drop=True)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _active_shared(name: str, version: str, _df: pd.DataFrame) -> pd.DataFrame:
+    return filter_active(_df)
+
+def active_view(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Subconjunto ativo compartilhado por todas as sessões: calculado uma vez por versão da aba.
+    Devolve cópia rasa (copy-on-write): o frame de cada sessão não duplica os dados.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    return _active_shared(name, table_version(df), df).copy(deep=False)
+
+# ---- Geocodificação (Open-Meteo): cidade -> (lat, lon) ----
+GEOCODE_WORKERS = 8
+
+@lru_cache(maxsize=1024)
+def geocode_city(city: str) -> Tuple[Optional[float], Optional[float]]:
+    """Coordenadas da cidade ou (None, None). Cache por processo (cidades não mudam de lugar)."""
+    import requests  # adiado: só quem consulta APIs paga o import
+    try:
+        with timer("external_call_seconds", service="open_meteo", op="geocode"):
+            g = requests.get(
+                api_url("geocoding", "/v1/search"),
+                params={"name": city, "count": 1, "language": "pt"},
+                timeout=10
+            ).json()
+        if g.get("results"):
+            return g["results"][0]["latitude"], g["results"][0]["longitude"]
+    except Exception:
+        pass
+    return None, None
+
+def geocode_many(cities: Iterable[str], workers: int = GEOCODE_WORKERS) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Geocodifica cidades distintas em paralelo (importação em lote / "Geocodificar vazios")."""
+    uniq = sorted({str(c).strip() for c in cities if str(c or "").strip()})
+    if not uniq:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(uniq))) as ex:
+        return dict(zip(uniq, ex.map(geocode_city, uniq)))
+
 def fetch_weather(units_df: pd.DataFrame) -> pd.DataFrame:
     """
     Retorna DF com alias, temperature, windspeed, weathercode.
     Defensivo: funciona se units_df estiver vazio/sem 'active'.
+    Cache de `weather_refresh_minutes` (aba settings, padrão 15 min). Com o sync_daemon
+    rodando, vem do snapshot local (nenhuma chamada externa neste processo).
     """
-    cols = ["alias","temperature","windspeed","weathercode"]
+    reader = snapshot_reader()
+    payload = reader.data("weather") if reader else None
+    if payload is not None:
+        count("cache_requests_total", cache="weather", result="snapshot")
+        return pd.DataFrame(payload, columns=WEATHER_COLUMNS)
+    bucket = ttl_bucket(runtime_config().weather_refresh_minutes * 60)
+    return cache_lookup("weather", _fetch_weather_cached, table_version(units_df), bucket, units_df)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _fetch_weather_cached(version: str, bucket: int, _units_df: pd.DataFrame) -> pd.DataFrame:
+    # chave = versão das unidades (sem hashear o DataFrame a cada rerun)
+    cache_miss()
+    return weather_now(_units_df)
+
+def fetch_weather_records(units_df: pd.DataFrame) -> Tuple[WeatherReading, ...]:
+    """
+    Mesmo clima de fetch_weather, já como registros para o render da TV: a conversão acontece
+    uma vez por versão das unidades/janela de TTL e a tupla é compartilhada entre as sessões.
+    """
+    reader = snapshot_reader()
+    payload = reader.data("weather") if reader else None
+    if payload is not None:
+        count("cache_requests_total", cache="weather", result="snapshot")
+        return weather_readings(payload)
+    bucket = ttl_bucket(runtime_config().weather_refresh_minutes * 60)
+    return cache_lookup("weather", _weather_records_shared, table_version(units_df), bucket, units_df)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _weather_records_shared(version: str, bucket: int, _units_df: pd.DataFrame) -> Tuple[WeatherReading, ...]:
+    return weather_readings(_fetch_weather_cached(version, bucket, _units_df).to_dict("records"))
+
+def weather_now(units_df: pd.DataFrame) -> pd.DataFrame:
+    """Consulta a Open-Meteo agora, sem cache (usada pelo cache acima e pelo sync_daemon)."""
+    import requests
+    cols = WEATHER_COLUMNS
     if units_df is None or units_df.empty:
         return pd.DataFrame(columns=cols)
 
-    units_df = units_df.copy()
+    units_df = units_df.copy(deep=False)
     units_df.columns = [str(c).strip() for c in units_df.columns]
     if "active" in units_df.columns:
         units_df = units_df[units_df["active"].astype(str).str.lower().isin(["true","1","yes"])]
@@ -27,20 +138,15 @@ def fetch_weather(units_df: pd.DataFrame) -> pd.DataFrame:
         alias = r.get("alias") or city or "Unidade"
         try:
             if (not lat or not lon) and city:
-                g = requests.get(
-                    "https://geocoding-api.open-meteo.com/v1/search",
-                    params={"name": city, "count": 1, "language": "pt"},
-                    timeout=10
-                ).json()
-                if g.get("results"):
-                    lat = g["results"][0]["latitude"]; lon = g["results"][0]["longitude"]
+                lat, lon = geocode_city(str(city).strip())
             if not lat or not lon:
                 continue
-            w = requests.get(
-                "https://api.open-meteo.com/v1/forecast",
-                params={"latitude": lat, "longitude": lon, "current_weather": True, "timezone": "America/Sao_Paulo"},
-                timeout=10
-            ).json()
+            with timer("external_call_seconds", service="open_meteo", op="forecast"):
+                w = requests.get(
+                    api_url("open_meteo", "/v1/forecast"),
+                    params={"latitude": lat, "longitude": lon, "current_weather": True, "timezone": "America/Sao_Paulo"},
+                    timeout=10
+                ).json()
             cur = w.get("current_weather") or {}
             rows.append({
                 "alias": alias,
@@ -53,55 +159,76 @@ def fetch_weather(units_df: pd.DataFrame) -> pd.DataFrame:
 
     return pd.DataFrame(rows, columns=cols)
 
-def weather_emoji(code: int) -> str:
+# código WMO -> emoji, tabela única (ticker, cartão e feed): consulta por índice, sem varrer listas
+_WMO_EMOJI = {0: "☀️", **dict.fromkeys([1,2,3], "⛅"), **dict.fromkeys([45,48], "🌫️"),
+              **dict.fromkeys([51,53,55,61,63,65,80,81,82], "🌧️"), **dict.fromkeys([71,73,75,85,86], "❄️"),
+              **dict.fromkeys([95,96,99], "⛈️")}
+EMOJI_BY_CODE = tuple(_WMO_EMOJI.get(c, "🌡️") for c in range(100))
+
+def weather_emoji(code) -> str:
     try:
-        code = int(code)
+        c = int(code)
     except Exception:
         return "🌡️"
-    if code in [0]: return "☀️"
-    if code in [1,2,3]: return "⛅"
-    if code in [45,48]: return "🌫️"
-    if code in [51,53,55,61,63,65,80,81,82]: return "🌧️"
-    if code in [71,73,75,85,86]: return "❄️"
-    if code in [95,96,99]: return "⛈️"
-    return "🌡️"
-
-@st.cache_data(ttl=300, show_spinner=False)  # 5 min
+    return EMOJI_BY_CODE[c] if 0 <= c < len(EMOJI_BY_CODE) else "🌡️"
+
 def fetch_rates() -> dict:
+    """Cotações em BRL; cache de `currency_refresh_minutes` (aba settings, padrão 5 min)."""
+    reader = snapshot_reader()
+    payload = reader.data("rates") if reader else None
+    if payload is not None:
+        count("cache_requests_total", cache="rates", result="snapshot")
+        return payload
+    return cache_lookup("rates", _fetch_rates_cached, ttl_bucket(runtime_config().currency_refresh_minutes * 60))
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _fetch_rates_cached(bucket: int) -> dict:
+    cache_miss()
+    return rates_now()
+
+def rates_now() -> dict:
+    """Consulta as cotações agora, sem cache."""
+    import requests
     out = {}
     try:
-        f = requests.get("https://api.exchangerate.host/latest", params={"base":"USD","symbols":"BRL"}, timeout=10).json()
+        with timer("external_call_seconds", service="exchangerate", op="usd"):
+            f = requests.get(api_url("exchangerate", "/latest"), params={"base":"USD","symbols":"BRL"}, timeout=10).json()
         out["USD"] = f["rates"]["BRL"]
     except Exception:
         pass
     try:
-        f = requests.get("https://api.exchangerate.host/latest", params={"base":"EUR","symbols":"BRL"}, timeout=10).json()
+        with timer("external_call_seconds", service="exchangerate", op="eur"):
+            f = requests.get(api_url("exchangerate", "/latest"), params={"base":"EUR","symbols":"BRL"}, timeout=10).json()
         out["EUR"] = f["rates"]["BRL"]
     except Exception:
         pass
     try:
-        cg = requests.get("https://api.coingecko.com/api/v3/simple/price",
-                          params={"ids":"bitcoin,ethereum","vs_currencies":"brl"},
-                          timeout=10).json()
+        with timer("external_call_seconds", service="coingecko", op="price"):
+            cg = requests.get(api_url("coingecko", "/api/v3/simple/price"),
+                              params={"ids":"bitcoin,ethereum","vs_currencies":"brl"},
+                              timeout=10).json()
         out["BTC"] = cg.get("bitcoin",{}).get("brl")
         out["ETH"] = cg.get("ethereum",{}).get("brl")
     except Exception:
         pass
     return out
 
-def world_times():
-    zones = [
-        ("Brasília", "America/Sao_Paulo"),
-        ("New York", "America/New_York"),
-        ("Hong Kong", "Asia/Hong_Kong"),
-    ]
-    now = pd.Timestamp.utcnow()
+WORLD_ZONES = [
+    ("Brasília", "America/Sao_Paulo"),
+    ("New York", "America/New_York"),
+    ("Hong Kong", "Asia/Hong_Kong"),
+]
+
+_ZONES = {z: ZoneInfo(z) for _, z in WORLD_ZONES}
+
+def world_times() -> List[ClockReading]:
+    now = datetime.now(timezone.utc)
     res = []
-    for label, z in zones:
+    for label, z in WORLD_ZONES:
         try:
-            res.append((label, now.tz_localize("UTC").tz_convert(z).strftime("%H:%M:%S")))
+            res.append(ClockReading(label, now.astimezone(_ZONES[z]).strftime("%H:%M:%S")))
         except Exception:
-            res.append((label, "--:--:--"))
+            res.append(ClockReading(label, "--:--:--"))
     return res
 
 def get_rotation_index(key: str, total: int, default_interval_ms: int) -> int:
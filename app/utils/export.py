@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .data import WORLD_ZONES
+from .feed import build_feed, content_version
+from .records import weather_readings
+from .ui import (
+    BASE_CSS,
+    bday_card_html,
+    empty_card_html,
+    line_e_html,
+    news_card_html,
+    video_player_html,
+    weather_ticker_html,
+)
+
+BOARD_JS = Path(__file__).resolve().parent.parent / "assets" / "kiosk" / "board.js"
+KEEP_VERSIONS = 3  # versões antigas mantidas p/ telas que ainda estão trocando
+
+def _short_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:12]
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _write_hashed(folder: Path, stem: str, ext: str, data: bytes) -> str:
+    """Grava `stem.<hash>.ext` só se ainda não existir; devolve o caminho relativo."""
+    folder.mkdir(parents=True, exist_ok=True)
+    name = f"{stem}.{_short_hash(data)}.{ext}"
+    target = folder / name
+    if not target.exists():
+        _write_atomic(target, data)
+    return f"{folder.name}/{name}"
+
+def _video_ms(duration) -> int:
+    try:
+        return int(float(duration or 30)) * 1000
+    except Exception:
+        return 30_000
+
+def build_bundle_data(tables: Dict[str, pd.DataFrame], weather_df: pd.DataFrame, rates: dict,
+                      rotation_seconds: int = 10) -> dict:
+    """Fragmentos já renderizados pelos componentes de ui.py + parâmetros de rotação."""
+    feed = build_feed(tables, weather_df, rates, rotation_seconds)
+    readings = weather_readings(weather_df.to_dict("records")) if weather_df is not None else ()
+    news = [news_card_html(n["title"], n["description"], n["image_url"]) for n in feed["news"]]
+    bday_title = "🎉 Aniversariante do dia" if feed["birthdays_scope"] == "day" else "🎉 Aniversariante do mês"
+    bdays = [bday_card_html(b["name"], b["sector"], b["day"], b["photo_url"], bday_title) for b in feed["birthdays"]]
+    videos = [{"html": video_player_html(v["url"]), "ms": _video_ms(v["duration_seconds"])} for v in feed["videos"]]
+    return {
+        "content_version": feed["version"],
+        "rotation_ms": int(rotation_seconds) * 1000,
+        "zones": [z for _, z in WORLD_ZONES],
+        "news": news or [empty_card_html("📰 Notícias", "Sem notícias ativas.")],
+        "birthdays": bdays or [empty_card_html("🎉 Aniversariante do mês", "Sem aniversariantes.")],
+        "videos": videos or [{"html": empty_card_html("🎬 Vídeos institucionais", "Sem vídeos."), "ms": 30_000}],
+        # relógios saem vazios (o JS preenche), senão a versão mudaria a cada segundo
+        "line_e": line_e_html([(label, "--:--:--") for label, _ in WORLD_ZONES], rates or {}, readings),
+        "ticker": weather_ticker_html(readings),
+    }
+
+def _index_html(manifest: dict, data: dict) -> str:
+    """Página inicial já com a primeira rotação renderizada (funciona mesmo antes do JS)."""
+    first_video = data["videos"][0]["html"]
+    return (
+        "<!doctype html><html lang='pt-BR'><head><meta charset='utf-8'>"
+        "<meta name='viewport' content='width=device-width, initial-scale=1'>"
+        "<title>Lukma TV</title>"
+        f"<link rel='stylesheet' href='{manifest['css']}'>"
+        "</head><body>"
+        "<div class='grid'>"
+        f"<div class='area a' id='slot-a'>{data['news'][0]}</div>"
+        f"<div class='area c' id='slot-c'>{data['birthdays'][0]}</div>"
+        f"<div class='area d' id='slot-d'>{first_video}</div>"
+        f"<div class='area e' id='slot-e'>{data['line_e']}</div>"
+        f"<div class='area f' id='slot-f'>{data['ticker']}</div>"
+        "</div>"
+        f"<script src='{manifest['js']}'></script>"
+        "</body></html>"
+    )
+
+def _prune(folder: Path, stem: str, keep_names: List[str], keep: int = KEEP_VERSIONS):
+    """Remove arquivos versionados antigos, preservando os `keep` mais recentes."""
+    if not folder.exists():
+        return
+    files = sorted(folder.glob(f"{stem}.*"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in files[keep:]:
+        if p.name not in keep_names:
+            p.unlink(missing_ok=True)
+
+def export_bundle(out_dir: str, tables: Dict[str, pd.DataFrame], weather_df: pd.DataFrame,
+                  rates: dict, rotation_seconds: int = 10) -> Optional[dict]:
+    """
+    Gera/atualiza o bundle estático em `out_dir`:
+      index.html, manifest.json, assets/theme.<hash>.css, assets/board.<hash>.js, data/feed.<versão>.json
+    Incremental: só grava o que mudou. Devolve o manifest novo, ou None se nada mudou.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    data = build_bundle_data(tables, weather_df, rates, rotation_seconds)
+    data_bytes = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+    manifest = {
+        "css": _write_hashed(out / "assets", "theme", "css", BASE_CSS.encode("utf-8")),
+        "js": _write_hashed(out / "assets", "board", "js", BOARD_JS.read_bytes()),
+        "data": f"data/feed.{content_version(data)}.json",
+        "content_version": data["content_version"],
+    }
+    data_path = out / manifest["data"]
+    if not data_path.exists():
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(data_path, data_bytes)
+
+    manifest_path = out / "manifest.json"
+    if manifest_path.exists():
+        try:
+            if json.loads(manifest_path.read_text("utf-8")) == manifest:
+                return None
+        except Exception:
+            pass
+
+    _write_atomic(out / "index.html", _index_html(manifest, data).encode("utf-8"))
+    _write_atomic(manifest_path, json.dumps(manifest, sort_keys=True).encode("utf-8"))
+
+    names = [Path(manifest[k]).name for k in ("css", "js", "data")]
+    _prune(out / "assets", "theme", names)
+    _prune(out / "assets", "board", names)
+    _prune(out / "data", "feed", names)
+    return manifest
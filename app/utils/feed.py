@@ -0,0 +1,119 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .birthdays import BirthdayIndex
+from .data import active_view, weather_emoji
+from .records import VideoItem, num_or_none, record_dict
+from .schedule import ScheduleIndex, local_now
+
+# Tabelas que alimentam o feed (as mesmas lidas pela TV)
+FEED_TABLES = ["news","birthdays","videos","weather_units","worldclocks"]
+# Tabelas lidas pelo tv.py (o aquecimento no boot lê as mesmas, com as mesmas chaves de cache)
+TV_TABLES = FEED_TABLES + ["settings"]
+
+# Colunas que as telas usam: a leitura é projetada, o resto (created_at, ids na TV...) nem sai da planilha
+TV_COLUMNS = {
+    "news": ["title","description","image_url","active","publish_from","publish_until","priority"],
+    "birthdays": ["name","sector","birthday","photo_url","active"],
+    "videos": ["title","url","duration_seconds","active","publish_from","publish_until","priority"],
+    "weather_units": ["alias","city","latitude","longitude","active"],
+    "worldclocks": ["label","timezone"],
+    "settings": ["key","value"],
+}
+FEED_COLUMNS = {**TV_COLUMNS, "news": ["id"] + TV_COLUMNS["news"], "videos": ["id"] + TV_COLUMNS["videos"]}
+
+def _records(df: pd.DataFrame, cols: List[str]) -> List[Dict[str, str]]:
+    """Converte as colunas pedidas em lista de dicts (texto), tolerando colunas ausentes."""
+    if df is None or df.empty:
+        return []
+    out = []
+    for r in df.to_dict("records"):
+        out.append({c: "" if r.get(c) is None else str(r.get(c)).strip() for c in cols})
+    return out
+
+
+def build_feed(tables: Dict[str, pd.DataFrame], weather_df: pd.DataFrame, rates: dict,
+               rotation_seconds: int = 10, now: Optional[datetime] = None) -> dict:
+    """
+    Monta o payload do feed (somente conteúdo ativo) com a versão do conteúdo.
+    A versão é um hash do próprio conteúdo: muda só quando algo visível muda.
+    Notícias/vídeos: só os que estão na janela de publicação, repetidos conforme a prioridade.
+    Aniversariantes: os de hoje, ou os do mês se ninguém faz aniversário hoje.
+    """
+    now = now or local_now()
+    news = [record_dict(it) for it in ScheduleIndex(tables.get("news")).playlist(now)]
+    bday_scope, bdays = BirthdayIndex(tables.get("birthdays")).current(now.date())
+    bdays = [record_dict(b) for b in bdays]
+    videos = [record_dict(it) for it in ScheduleIndex(tables.get("videos"), VideoItem).playlist(now)]
+    clocks = _records(tables.get("worldclocks"), ["label","timezone"])
+
+    ticker = []
+    if weather_df is not None and not weather_df.empty:
+        for r in weather_df.to_dict("records"):
+            code = num_or_none(r.get("weathercode"))
+            ticker.append({
+                "alias": str(r.get("alias") or "Unidade"),
+                "temperature": num_or_none(r.get("temperature")),
+                "windspeed": num_or_none(r.get("windspeed")),
+                "weathercode": None if code is None else int(code),  # JSON estrito: nada de NaN nem 3.0
+                "emoji": weather_emoji(r.get("weathercode")),
+            })
+
+    content = {
+        "news": news,
+        "birthdays": bdays,
+        "birthdays_scope": bday_scope,
+        "videos": videos,
+        "worldclocks": clocks,
+        "ticker": ticker,
+        "rates": {k: num_or_none(v) for k, v in sorted((rates or {}).items())},
+        "rotation_seconds": int(rotation_seconds),
+    }
+    return {"version": content_version(content), **content}
+
+def content_version(content: dict) -> str:
+    """Hash estável (JSON canônico) do conteúdo."""
+    raw = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str, allow_nan=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def feed_body(feed: dict) -> bytes:
+    """Corpo JSON determinístico do feed (mesma versão -> mesmos bytes)."""
+    return json.dumps(feed, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+                      allow_nan=False).encode("utf-8")
+
+def feed_etag(feed: dict) -> str:
+    return f'"{feed["version"]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Interpreta If-None-Match (lista separada por vírgula, '*' ou validadores fracos W/)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def load_sources(site: Optional[str] = None) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame, dict, int]:
+    """Lê as mesmas fontes da TV (caches incluídos): tabelas, clima, cotações e rotação (do `site`, se houver)."""
+    from .config import runtime_config
+    from .data import fetch_weather, fetch_rates
+    from .sites import read_site_tables
+
+    tables = read_site_tables(site, FEED_TABLES, columns={n: FEED_COLUMNS[n] for n in FEED_TABLES})
+    wu_df = active_view("weather_units", tables.get("weather_units", pd.DataFrame()))
+    weather_df = fetch_weather(wu_df)
+    rates = fetch_rates()
+    rotation = runtime_config(site).news_rotation_seconds  # settings do site vale sobre a global
+    return tables, weather_df, rates, rotation
+
+def load_feed(site: Optional[str] = None) -> dict:
+    return build_feed(*load_sources(site))
@@ -0,0 +1,232 @@
+import io
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from .birthdays import parse_month_day
+from .data import TRUTHY, geocode_many
+from .schedule import parse_when
+from .sheets import DEFAULT_COLUMNS
+
+# Abas que aceitam importação em lote: colunas obrigatórias e chave natural (deduplicação)
+IMPORT_REQUIRED = {
+    "birthdays": ["name", "birthday"],
+    "news": ["title"],
+    "weather_units": ["city"],
+}
+IMPORT_KEYS = {
+    "birthdays": ["name", "birthday"],
+    "news": ["title"],
+    "weather_units": ["alias", "city", "state"],
+}
+IMPORT_CHUNK = 500  # linhas por bloco lido do arquivo
+FALSY = ["false", "0", "no", "n", "nao", "não"]
+
+@dataclass
+class ImportPlan:
+    """Resultado da validação de um arquivo: o que entra, o que muda e o que fica de fora."""
+    ws_name: str
+    added: List[dict] = field(default_factory=list)
+    updated: List[dict] = field(default_factory=list)   # linha completa, já com o id existente
+    changes: List[dict] = field(default_factory=list)   # {id, coluna, antes, depois} p/ o preview
+    unchanged: int = 0
+    duplicates: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (linha do arquivo, motivo)
+    ignored_columns: List[str] = field(default_factory=list)
+
+    @property
+    def fatal(self) -> bool:
+        return any(line == 0 for line, _ in self.errors)
+
+    @property
+    def pending(self) -> int:
+        return len(self.added) + len(self.updated)
+
+def _header(c) -> str:
+    return str(c).strip().lower().replace(" ", "_")
+
+def iter_upload(data: bytes, filename: str, chunksize: int = IMPORT_CHUNK) -> Iterator[pd.DataFrame]:
+    """Lê CSV (separador , ou ; detectado) em blocos, ou XLSX (primeira planilha). Tudo como texto."""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            df = pd.read_excel(io.BytesIO(data), dtype=str).fillna("")
+        except ImportError as e:
+            raise ValueError("Leitura de XLSX requer o pacote `openpyxl`.") from e
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start:start + chunksize]
+        return
+    text = data.decode("utf-8-sig", errors="replace")
+    sep = ";" if text.split("\n", 1)[0].count(";") > text.split("\n", 1)[0].count(",") else ","
+    yield from pd.read_csv(io.StringIO(text), sep=sep, dtype=str, keep_default_na=False,
+                           skipinitialspace=True, chunksize=chunksize)
+
+def _bool_text(v, default: bool = True) -> Optional[str]:
+    s = str(v or "").strip().lower()
+    if not s:
+        return "TRUE" if default else "FALSE"
+    if s in TRUTHY or s in ("y", "sim"):
+        return "TRUE"
+    return "FALSE" if s in FALSY else None
+
+def _key_part(col: str, v) -> str:
+    if col == "birthday":
+        md = parse_month_day(v)
+        return f"{md[0]:02d}-{md[1]:02d}" if md else ""
+    return " ".join(str(v or "").lower().split())
+
+def _same(ws_name: str, col: str, old, new: str) -> bool:
+    """Igualdade para o diff: colunas da chave comparam normalizadas (caixa/formato de data)."""
+    if col in IMPORT_KEYS[ws_name]:
+        return _key_part(col, old) == _key_part(col, new)
+    old = str(old if old is not None else "").strip()
+    return old.lower() == new.lower() if col == "active" else old == new
+
+def natural_key(ws_name: str, row: dict) -> tuple:
+    return tuple(_key_part(c, row.get(c)) for c in IMPORT_KEYS[ws_name])
+
+def _row_error(ws_name: str, row: dict) -> Optional[str]:
+    missing = [c for c in IMPORT_REQUIRED[ws_name] if not str(row.get(c) or "").strip()]
+    if missing:
+        return "campo obrigatório vazio: " + ", ".join(missing)
+    if "active" in row and _bool_text(row["active"]) is None:
+        return f"active inválido: {row['active']!r}"
+    if ws_name == "birthdays" and parse_month_day(row.get("birthday")) is None:
+        return f"data inválida: {row.get('birthday')!r}"
+    if ws_name == "news":
+        start, ok_from = parse_when(row.get("publish_from"))
+        end, ok_until = parse_when(row.get("publish_until"), end_of_day=True)
+        if not (ok_from and ok_until) or (start and end and end <= start):
+            return "janela de publicação inválida"
+    if ws_name == "weather_units":
+        for c in ("latitude", "longitude"):
+            v = str(row.get(c) or "").strip().replace(",", ".")
+            if v:
+                try:
+                    float(v)
+                except ValueError:
+                    return f"{c} inválida: {row.get(c)!r}"
+    return None
+
+class IdAllocator:
+    """Ids novos que não colidem com os existentes nem com os do botão "Adicionar" (epoch puro)."""
+
+    def __init__(self, existing: Iterable[str]):
+        self.used: Set[str] = {str(i).strip() for i in existing if str(i).strip()}
+        self.stamp = int(time.time())
+        self.seq = 0
+
+    def take(self, wanted: str = "") -> str:
+        wanted = str(wanted or "").strip()
+        if wanted and wanted not in self.used:
+            self.used.add(wanted)
+            return wanted
+        while True:
+            self.seq += 1
+            new = f"{self.stamp}{self.seq:04d}"
+            if new not in self.used:
+                self.used.add(new)
+                return new
+
+def build_plan(ws_name: str, chunks: Iterable[pd.DataFrame], existing: pd.DataFrame,
+               now: Optional[datetime] = None) -> ImportPlan:
+    """
+    Valida o arquivo contra DEFAULT_COLUMNS e compara com a aba atual pela chave natural:
+    linhas novas ganham id livre; as que já existem viram atualização (só se algo mudou);
+    repetidas no próprio arquivo são ignoradas.
+    """
+    cols = DEFAULT_COLUMNS[ws_name]
+    plan = ImportPlan(ws_name)
+    existing = existing if existing is not None else pd.DataFrame(columns=cols)
+    index: Dict[tuple, dict] = {}
+    for r in existing.to_dict("records"):
+        index.setdefault(natural_key(ws_name, r), r)
+    ids = IdAllocator(existing["id"] if "id" in existing.columns else [])
+    seen: Set[tuple] = set()
+    created_at = (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+
+    line = 1  # cabeçalho
+    checked_header = False
+    for chunk in chunks:
+        chunk = chunk.rename(columns=_header)
+        if not checked_header:
+            checked_header = True
+            plan.ignored_columns = [c for c in chunk.columns if c not in cols]
+            missing = [c for c in IMPORT_REQUIRED[ws_name] if c not in chunk.columns]
+            if missing:
+                plan.errors.append((0, "colunas obrigatórias ausentes: " + ", ".join(missing)))
+                return plan
+        present = [c for c in chunk.columns if c in cols]
+        for r in chunk[present].to_dict("records"):
+            line += 1
+            row = {c: str(v).strip() for c, v in r.items()}
+            if not any(row.values()):
+                continue
+            err = _row_error(ws_name, row)
+            if err:
+                plan.errors.append((line, err))
+                continue
+            if "active" in row:
+                row["active"] = _bool_text(row["active"])
+            key = natural_key(ws_name, row)
+            if key in seen:
+                plan.duplicates += 1
+                continue
+            seen.add(key)
+
+            current = index.get(key)
+            if current is not None:
+                diff = {c: v for c, v in row.items() if c != "id" and v and not _same(ws_name, c, current.get(c), v)}
+                if not diff:
+                    plan.unchanged += 1
+                    continue
+                merged = {c: current.get(c, "") for c in cols}
+                merged.update(diff)
+                plan.updated.append(merged)
+                plan.changes.extend({"id": merged.get("id", ""), "coluna": c, "antes": current.get(c, ""), "depois": v}
+                                    for c, v in diff.items())
+                continue
+
+            new = {c: row.get(c, "") for c in cols}
+            new["id"] = ids.take(row.get("id", ""))
+            if "active" in cols and not row.get("active"):
+                new["active"] = "TRUE"
+            if ws_name == "news":
+                new["created_at"] = new["created_at"] or created_at
+                new["priority"] = new["priority"] or "1"
+            plan.added.append(new)
+    if not checked_header:
+        plan.errors.append((0, "arquivo vazio"))
+    return plan
+
+def geocode_plan(plan: ImportPlan) -> int:
+    """Preenche lat/lon das unidades novas (cidades em paralelo). Devolve quantas ficaram sem coordenadas."""
+    todo = [r for r in plan.added if r.get("city") and not (r.get("latitude") and r.get("longitude"))]
+    found = geocode_many(r["city"] for r in todo)
+    missing = 0
+    for r in todo:
+        lat, lon = found.get(r["city"].strip(), (None, None))
+        if lat is None or lon is None:
+            missing += 1
+            continue
+        r["latitude"], r["longitude"] = lat, lon
+    return missing
+
+def apply_plan(existing: pd.DataFrame, plan: ImportPlan) -> pd.DataFrame:
+    """Aba completa após a importação (uma única gravação)."""
+    cols = DEFAULT_COLUMNS[plan.ws_name]
+    out = (existing if existing is not None else pd.DataFrame(columns=cols)).reindex(columns=cols).fillna("").astype(object)
+    if plan.updated:
+        # mesma chave natural que build_plan usou para achar a linha (ids podem estar em branco)
+        pos: Dict[tuple, int] = {}
+        for n, r in enumerate(out.to_dict("records")):
+            pos.setdefault(natural_key(plan.ws_name, r), n)
+        for row in plan.updated:
+            n = pos.get(natural_key(plan.ws_name, row))
+            if n is not None:
+                out.iloc[n] = [row.get(c, "") for c in cols]
+    if plan.added:
+        out = pd.concat([out, pd.DataFrame(plan.added, columns=cols)], ignore_index=True)
+    return out.reset_index(drop=True)
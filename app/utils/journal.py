@@ -0,0 +1,220 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+import streamlit as st
+
+# ---- Diário local de gravações do Admin (SQLite em modo WAL) ----
+# O "Salvar" grava a aba inteira aqui e volta na hora; o escritor em segundo plano (store.SheetsWriter)
+# entrega as pendências na planilha. Saves seguidos da mesma aba viram uma gravação só, cada aba sai na
+# ordem em que foi salva e uma falha (429, rede) só adia a entrega: a edição fica no disco, sobrevive a
+# restart e é retomada por qualquer worker da máquina que aponte para o mesmo arquivo.
+JOURNAL_ENV = "LUKMA_JOURNAL_DIR"
+LEASE = 120.0      # s de posse de um lote (worker que morreu no meio libera a aba depois disso)
+RETRY_BASE = 2.0   # s até a 2ª tentativa (dobra a cada falha)
+RETRY_MAX = 300.0
+KEEP_FINISHED = 200  # entregas antigas mantidas para o histórico do Admin
+NOT_JOURNALED = {"users"}  # hashes de senha não vão para o disco local: save síncrono (como nos snapshots)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS writes(
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ws_name TEXT NOT NULL,
+    base_version TEXT,          -- versão sobre a qual a edição foi feita
+    version TEXT NOT NULL,      -- versão gravada (a que os leitores passam a ver)
+    base TEXT,                  -- aba na versão base (JSON): merge de 3 vias na entrega
+    data TEXT NOT NULL,         -- aba inteira a gravar (JSON)
+    state TEXT NOT NULL DEFAULT 'pending',  -- pending | done | superseded | conflict
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    not_before REAL NOT NULL DEFAULT 0,     -- posse do lote ou espera entre tentativas
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS writes_pending ON writes(state, ws_name, seq);
+"""
+
+def journal_dir() -> str:
+    if os.environ.get(JOURNAL_ENV):
+        return os.environ[JOURNAL_ENV]
+    try:
+        configured = st.secrets.get("app", {}).get("journal_dir")
+    except Exception:
+        configured = None
+    return configured or os.path.join(tempfile.gettempdir(), "lukma-tv-journal")
+
+def write_behind_enabled() -> bool:
+    """`[app].write_behind = false` volta ao save síncrono (o Admin espera a planilha)."""
+    try:
+        return str(st.secrets.get("app", {}).get("write_behind", True)).strip().lower() not in ("false", "0", "no")
+    except Exception:
+        return True
+
+def _jsonable(v):
+    return v.item() if hasattr(v, "item") else str(v)  # escalares numpy, Timestamp...
+
+def frame_to_json(df: pd.DataFrame) -> str:
+    """Preserva os tipos do editor (bool continua bool na planilha: TRUE, não "True")."""
+    rows = df.astype(object).where(df.notna(), "").values.tolist()
+    return json.dumps({"columns": [str(c) for c in df.columns], "rows": rows}, default=_jsonable, ensure_ascii=False)
+
+def frame_from_json(text: Optional[str]) -> Optional[pd.DataFrame]:
+    if text is None:
+        return None
+    doc = json.loads(text)
+    return pd.DataFrame(doc["rows"], columns=doc["columns"])
+
+class Batch(NamedTuple):
+    """Pendências encadeadas de uma aba, entregues como uma gravação."""
+    ws_name: str
+    seqs: List[int]
+    base_version: Optional[str]
+    base: Optional[pd.DataFrame]
+    df: pd.DataFrame
+    attempts: int
+
+class Journal:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.close(os.open(str(self.path), os.O_CREAT | os.O_RDWR, 0o600))  # -wal/-shm herdam o modo do arquivo
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # em WAL: commit durável a queda do processo
+        self._db.executescript(SCHEMA)
+        self._frames: Dict[str, tuple] = {}  # aba -> (seq, frame) da última pendência já decodificada
+
+    def _tx(self, fn):
+        """Transação de escrita (BEGIN IMMEDIATE: um worker por vez decide quem entrega o quê)."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return out
+
+    def _query(self, sql: str, args=()) -> list:
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    # ---- lado do Admin ----
+    def enqueue(self, ws_name: str, df: pd.DataFrame, version: str,
+                base: Optional[pd.DataFrame], base_version: Optional[str]) -> int:
+        data, base_json = frame_to_json(df), None if base is None else frame_to_json(base)
+        now = time.time()
+        return self._tx(lambda db: db.execute(
+            "INSERT INTO writes(ws_name, base_version, version, base, data, created_at, updated_at)"
+            " VALUES (?,?,?,?,?,?,?)", (ws_name, base_version, version, base_json, data, now, now)).lastrowid)
+
+    def pending(self) -> Dict[str, str]:
+        """{aba: versão da última pendência} — o que os leitores devem ver no lugar da planilha."""
+        rows = self._query("SELECT ws_name, version, MAX(seq) FROM writes WHERE state = 'pending' GROUP BY ws_name")
+        return {name: version for name, version, _ in rows}
+
+    def frame(self, ws_name: str) -> Optional[pd.DataFrame]:
+        """Aba como ficará depois da última pendência (None = nada pendente)."""
+        rows = self._query("SELECT seq, data FROM writes WHERE state = 'pending' AND ws_name = ?"
+                           " ORDER BY seq DESC LIMIT 1", (ws_name,))
+        if not rows:
+            return None
+        seq, data = rows[0]
+        hit = self._frames.get(ws_name)
+        if not hit or hit[0] != seq:
+            hit = self._frames[ws_name] = (seq, frame_from_json(data))
+        return hit[1]
+
+    def depth(self) -> int:
+        return self._query("SELECT COUNT(*) FROM writes WHERE state = 'pending'")[0][0]
+
+    def status(self) -> Optional[dict]:
+        """Último evento do escritor: entrega, falha (com nova tentativa agendada) ou conflito."""
+        rows = self._query("SELECT ws_name, state, error, attempts, updated_at, not_before FROM writes"
+                           " WHERE state != 'pending' OR attempts > 0 ORDER BY updated_at DESC LIMIT 1")
+        if not rows:
+            return None
+        ws_name, state, error, attempts, updated_at, not_before = rows[0]
+        ok = state in ("done", "superseded")
+        return {"ws_name": ws_name, "ok": ok, "state": "ok" if ok else ("conflict" if state == "conflict" else "retrying"),
+                "error": error, "attempts": attempts, "at": updated_at, "retry_at": None if ok else not_before}
+
+    def recent(self, limit: int = 50) -> pd.DataFrame:
+        rows = self._query("SELECT seq, ws_name, state, attempts, error, created_at, updated_at FROM writes"
+                           " ORDER BY seq DESC LIMIT ?", (limit,))
+        return pd.DataFrame(rows, columns=["seq", "ws_name", "state", "attempts", "error", "created_at", "updated_at"])
+
+    def entry_frame(self, seq: int) -> Optional[pd.DataFrame]:
+        """Conteúdo salvo numa entrada (ex.: recuperar uma edição rejeitada por conflito)."""
+        rows = self._query("SELECT data FROM writes WHERE seq = ?", (seq,))
+        return frame_from_json(rows[0][0]) if rows else None
+
+    # ---- lado do escritor ----
+    def claim(self, lease: float = LEASE) -> Optional[Batch]:
+        """
+        Toma a aba com a pendência mais antiga que ninguém está entregando (nem esperando nova
+        tentativa). Pendências encadeadas (cada uma salva sobre a versão da anterior) saem juntas:
+        base da primeira, conteúdo da última.
+        """
+        def take(db):
+            now = time.time()
+            row = db.execute("SELECT ws_name FROM writes WHERE state = 'pending' GROUP BY ws_name"
+                             " HAVING MAX(not_before) <= ? ORDER BY MIN(seq) LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            entries = db.execute("SELECT seq, base_version, version, base, data, attempts FROM writes"
+                                 " WHERE state = 'pending' AND ws_name = ? ORDER BY seq", (row[0],)).fetchall()
+            chain = entries[:1]
+            for e in entries[1:]:
+                if e[1] != chain[-1][2]:
+                    break  # salva sobre outra versão (outro worker): vai no próximo lote, com merge próprio
+                chain.append(e)
+            seqs = [e[0] for e in chain]
+            db.execute(f"UPDATE writes SET not_before = ? WHERE seq IN ({','.join('?' * len(seqs))})", (now + lease, *seqs))
+            first, last = chain[0], chain[-1]
+            return Batch(row[0], seqs, first[1], frame_from_json(first[3]), frame_from_json(last[4]),
+                         max(e[5] for e in chain))
+        return self._tx(take)
+
+    def _finish(self, batch: Batch, state: str, error: Optional[str] = None):
+        def mark(db):
+            now = time.time()
+            *older, last = batch.seqs
+            db.execute("UPDATE writes SET state = ?, error = ?, updated_at = ? WHERE seq = ?", (state, error, now, last))
+            for seq in older:
+                db.execute("UPDATE writes SET state = 'superseded', error = NULL, updated_at = ? WHERE seq = ?", (now, seq))
+            # histórico curto: entregas antigas saem (com o JSON), pendências nunca
+            db.execute("DELETE FROM writes WHERE state != 'pending' AND seq NOT IN"
+                       " (SELECT seq FROM writes WHERE state != 'pending' ORDER BY seq DESC LIMIT ?)", (KEEP_FINISHED,))
+        self._tx(mark)
+
+    def done(self, batch: Batch):
+        self._finish(batch, "done")
+
+    def conflict(self, batch: Batch, error: str):
+        """Rejeitada: mesmas linhas alteradas na planilha. O conteúdo fica no diário para recuperação."""
+        self._finish(batch, "conflict", error)
+
+    def fail(self, batch: Batch, error: str) -> float:
+        """Falha transitória: o lote volta para a fila após a espera (devolvida, em s)."""
+        wait = min(RETRY_MAX, RETRY_BASE * 2 ** batch.attempts)
+        now = time.time()
+        self._tx(lambda db: db.execute(
+            f"UPDATE writes SET attempts = attempts + 1, error = ?, not_before = ?, updated_at = ?"
+            f" WHERE seq IN ({','.join('?' * len(batch.seqs))})", (error, now + wait, now, *batch.seqs)))
+        return wait
+
+@st.cache_resource(show_spinner=False)
+def write_journal() -> Optional[Journal]:
+    """Diário do processo (None com write-behind desligado)."""
+    if not write_behind_enabled():
+        return None
+    return Journal(os.path.join(journal_dir(), "writes.sqlite3"))
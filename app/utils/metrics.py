@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+# ---- Métricas do processo: cronômetros (histogramas) e contadores, em formato Prometheus ----
+# Desligadas por padrão: `timer()`/`laps()` devolvem objetos nulos e `count()` retorna na hora,
+# então o custo desligado é uma checagem de booleano. Liga com LUKMA_METRICS=1 ou `[app].metrics = true`.
+METRICS_ENV = "LUKMA_METRICS"
+PREFIX = "lukma_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # segundos
+ON = ["1", "true", "yes", "on"]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _configured() -> bool:
+    raw = os.environ.get(METRICS_ENV)
+    if raw is None:
+        try:
+            raw = st.secrets.get("app", {}).get("metrics")
+        except Exception:
+            raw = None
+    return str(raw or "").strip().lower() in ON
+
+_enabled: Optional[bool] = None
+
+def enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        _enabled = _configured()
+    return _enabled
+
+def enable(on: bool = True):
+    """Liga/desliga em tempo de execução (benchmarks, testes)."""
+    global _enabled
+    _enabled = bool(on)
+
+class Histogram:
+    """Contagem por faixa de latência (BUCKETS) + soma, total e máximo."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # último = acima da maior faixa (+Inf)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimativa por interpolação linear dentro da faixa (como o histogram_quantile do Prometheus)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for i, n in enumerate(self.counts):
+            upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+            if n and seen + n >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+            lower = upper
+        return self.max
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _fmt_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, labels: Labels, by: float = 1):
+        with self._lock:
+            self.counters[(name, labels)] = self.counters.get((name, labels), 0) + by
+
+    def observe(self, name: str, labels: Labels, seconds: float):
+        with self._lock:
+            h = self.histograms.get((name, labels))
+            if h is None:
+                h = self.histograms[(name, labels)] = Histogram()
+            h.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def prometheus(self) -> str:
+        """Exposição em texto (formato 0.0.4) para o scrape do Prometheus."""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            hists = sorted((k, (list(h.counts), h.sum, h.count)) for k, h in self.histograms.items())
+        lines: List[str] = []
+        last = None
+        for (name, labels), v in counters:
+            if name != last:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                last = name
+            lines.append(f"{PREFIX}{name}{_fmt_labels(labels)} {v:g}")
+        for (name, labels), (counts, total, n) in hists:
+            if name != last:
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                last = name
+            cum = 0
+            for le, c in zip([f"{b:g}" for b in BUCKETS] + ["+Inf"], counts):
+                cum += c
+                lines.append(f"{PREFIX}{name}_bucket{_fmt_labels(labels, (('le', le),))} {cum}")
+            lines.append(f"{PREFIX}{name}_sum{_fmt_labels(labels)} {total:.6f}")
+            lines.append(f"{PREFIX}{name}_count{_fmt_labels(labels)} {n}")
+        return "\n".join(lines) + "\n"
+
+    def timings(self) -> pd.DataFrame:
+        """Resumo dos histogramas (ms) para o Admin."""
+        with self._lock:
+            rows = [{
+                "métrica": name, "rótulos": ", ".join(f"{k}={v}" for k, v in labels),
+                "chamadas": h.count, "média ms": round(1000 * h.sum / h.count, 1) if h.count else 0.0,
+                "p50 ms": round(1000 * h.quantile(0.5), 1), "p95 ms": round(1000 * h.quantile(0.95), 1),
+                "máx ms": round(1000 * h.max, 1),
+            } for (name, labels), h in sorted(self.histograms.items())]
+        return pd.DataFrame(rows, columns=["métrica", "rótulos", "chamadas", "média ms", "p50 ms", "p95 ms", "máx ms"])
+
+    def counter_frame(self) -> pd.DataFrame:
+        with self._lock:
+            rows = [{"métrica": name, "rótulos": ", ".join(f"{k}={v}" for k, v in labels), "valor": v}
+                    for (name, labels), v in sorted(self.counters.items())]
+        return pd.DataFrame(rows, columns=["métrica", "rótulos", "valor"])
+
+REGISTRY = Registry()  # um por processo (Streamlit e feed_server têm cada um o seu)
+
+# ---- API usada pelo código instrumentado ----
+def count(name: str, by: float = 1, **labels):
+    if not enabled():
+        return
+    REGISTRY.inc(name, _labels(labels), by)
+
+class _Timer:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name: str, labels: Labels):
+        self.name, self.labels = name, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(self.name, self.labels, time.perf_counter() - self.t0)
+        return False
+
+_NULL = nullcontext()
+
+def timer(name: str, **labels):
+    """`with timer("external_call_seconds", service="sheets"):` — registra a duração do bloco."""
+    return _Timer(name, _labels(labels)) if enabled() else _NULL
+
+class Laps:
+    """Cronômetro de script de cima para baixo: `lap("etapa")` registra o tempo desde a marca anterior."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.t0 = self.t = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        REGISTRY.observe(self.name, (("stage", stage),), now - self.t)
+        self.t = now
+
+    def total(self, stage: str = "total"):
+        REGISTRY.observe(self.name, (("stage", stage),), time.perf_counter() - self.t0)
+
+class _NullLaps:
+    def lap(self, stage: str):
+        pass
+
+    def total(self, stage: str = "total"):
+        pass
+
+_NULL_LAPS = _NullLaps()
+
+def laps(name: str):
+    return Laps(name) if enabled() else _NULL_LAPS
+
+# ---- Acerto/erro de st.cache_data: a função cacheada só executa no erro e marca a flag ----
+_local = threading.local()
+
+def cache_miss():
+    """Chamar dentro da função cacheada (só roda quando o cache não tinha o valor)."""
+    _local.miss = True
+
+def cache_lookup(cache: str, fn, *args):
+    """Chama `fn(*args)` contando `cache_requests_total{cache, result=hit|miss}`."""
+    if not enabled():
+        return fn(*args)
+    prev = getattr(_local, "miss", False)
+    _local.miss = False
+    try:
+        return fn(*args)
+    finally:
+        REGISTRY.inc("cache_requests_total", _labels({"cache": cache, "result": "miss" if _local.miss else "hit"}))
+        _local.miss = prev
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import count
+
+# ---- Dependências de dados de um render: em paralelo, sob um prazo único ----
+# Cada dependência roda no pool do processo e o render espera no máximo `deadline` segundos no total.
+# O que não chegou a tempo (ou falhou) sai com o último valor bom do processo, ou o padrão; a busca
+# atrasada continua em segundo plano e, ao terminar, preenche o cache da função e o último valor bom
+# para o próximo render. Uma dependência ainda em andamento não é disparada de novo: telas
+# simultâneas (e o render seguinte) aguardam a mesma busca.
+WORKERS = 8
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="lukma-fetch")
+_lock = threading.RLock()  # RLock: o callback de um future já concluído roda na hora, com o lock tomado
+_inflight: Dict[str, Future] = {}
+_last: Dict[str, Any] = {}
+
+def _settle(name: str, fut: Future):
+    with _lock:
+        if _inflight.get(name) is fut:
+            del _inflight[name]
+        if not fut.cancelled() and fut.exception() is None:
+            _last[name] = fut.result()
+
+def submit(name: str, fn: Callable[[], Any]) -> Future:
+    """Dispara `fn` no pool, ou devolve a busca de mesmo nome que ainda está em andamento."""
+    with _lock:
+        fut = _inflight.get(name)
+        if fut is None:
+            fut = _inflight[name] = _pool.submit(fn)
+            fut.add_done_callback(lambda f: _settle(name, f))
+        return fut
+
+def depends_on(name: str, fn: Callable[[], Any]) -> Any:
+    """
+    Valor de outra dependência, de dentro de uma dependência: espera a busca de mesmo nome em
+    andamento (a que o render acabou de pedir), senão usa o último valor bom; só no primeiro uso dispara.
+    """
+    with _lock:
+        fut = _inflight.get(name)
+        if fut is None and name in _last:
+            return _last[name]
+    return (fut or submit(name, fn)).result()
+
+def last_known(name: str, default: Any = None) -> Any:
+    with _lock:
+        return _last.get(name, default)
+
+def gather(deps: Dict[str, Callable[[], Any]], deadline: float,
+           defaults: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Tuple[str, ...]]:
+    """
+    Roda as dependências em paralelo e devolve (valores, nomes servidos pelo último valor bom/padrão).
+    Dependências entre elas (ex.: clima precisa das unidades) são declaradas com `depends_on` dentro
+    da própria função: reaproveitam a busca da outra, sem ordem imposta aqui.
+    """
+    futures = {name: submit(name, fn) for name, fn in deps.items()}
+    wait(list(futures.values()), timeout=deadline)
+    values, stale = {}, []
+    for name, fut in futures.items():
+        if fut.done() and fut.exception() is None:
+            values[name] = fut.result()
+            continue
+        values[name] = last_known(name, (defaults or {}).get(name))
+        stale.append(name)
+        count("render_stale_total", dep=name, reason="error" if fut.done() else "deadline")
+    return values, tuple(stale)
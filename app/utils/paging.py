@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+PAGE_SIZES = [25, 50, 100, 200]
+_TRUTHY_EDIT = ["true","1","yes","y","sim"]
+
+def filter_frame(df: pd.DataFrame, query: str = "", status: str = "Todos") -> pd.DataFrame:
+    """Busca textual (qualquer coluna, sem regex) + filtro por active. Mantém os rótulos originais."""
+    if df is None or df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    q = (query or "").strip()
+    if q:
+        hit = pd.Series(False, index=df.index)
+        for c in df.columns:
+            hit |= df[c].astype(str).str.contains(q, case=False, regex=False, na=False)
+        mask &= hit
+    if status in ("Ativos", "Inativos") and "active" in df.columns:
+        act = df["active"].astype(str).str.lower().isin(_TRUTHY_EDIT)
+        mask &= act if status == "Ativos" else ~act
+    return df[mask]
+
+def page_bounds(total: int, page: int, size: int) -> Tuple[int, int, int]:
+    """(página ajustada, início, fim) para uma janela de `size` linhas."""
+    pages = max(1, -(-total // size))
+    page = min(max(int(page), 1), pages)
+    start = (page - 1) * size
+    return page, start, min(start + size, total)
+
+class TablePatch:
+    """
+    Edições pendentes de um editor paginado, por rótulo de linha do snapshot
+    (nunca o frame inteiro). Cada "visita" (página/filtro) tem um delta corrente,
+    vindo do st.data_editor; ao trocar de visita ele é consolidado.
+    """
+
+    def __init__(self):
+        self.edited: Dict[Any, Dict[str, Any]] = {}
+        self.added: Dict[str, dict] = {}
+        self.deleted: set = set()
+        self.view_key: Optional[str] = None
+        self._seq = 0
+        self._current: Tuple[Dict[Any, Dict[str, Any]], List[dict], List[Any]] = ({}, [], [])
+
+    def set_current(self, window_index: List[Any], delta: dict):
+        """Registra o estado do data_editor (edited_rows/added_rows/deleted_rows) da visita atual."""
+        delta = delta or {}
+        edited = {}
+        for pos, vals in (delta.get("edited_rows") or {}).items():
+            if int(pos) < len(window_index):
+                edited[window_index[int(pos)]] = dict(vals)
+        added = [dict(r) for r in (delta.get("added_rows") or [])]
+        deleted = [window_index[int(p)] for p in (delta.get("deleted_rows") or []) if int(p) < len(window_index)]
+        self._current = (edited, added, deleted)
+
+    def commit(self):
+        edited, added, deleted = self._current
+        for label, vals in edited.items():
+            if label in self.added:
+                self.added[label].update(vals)
+            else:
+                self.edited.setdefault(label, {}).update(vals)
+        for row in added:
+            self.add_row(row)
+        for label in deleted:
+            if label in self.added:
+                self.added.pop(label)
+            else:
+                self.deleted.add(label)
+                self.edited.pop(label, None)
+        self._current = ({}, [], [])
+
+    def enter(self, view_key: str) -> bool:
+        """Troca de visita (página/filtro): consolida o delta anterior. True se mudou."""
+        if view_key == self.view_key:
+            return False
+        self.commit()
+        self.view_key = view_key
+        return True
+
+    def add_row(self, row: dict):
+        self._seq += 1
+        self.added[f"+{self._seq}"] = dict(row)
+
+    def edit_row(self, label, values: dict):
+        if label in self.added:
+            self.added[label].update(values)
+        else:
+            self.edited.setdefault(label, {}).update(values)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Frame com as edições consolidadas aplicadas (linhas novas com rótulos "+n")."""
+        out = df
+        if self.added:
+            extra = pd.DataFrame(list(self.added.values()), index=list(self.added.keys()))
+            out = pd.concat([out, extra.reindex(columns=df.columns)])
+        if self.edited:
+            out = out.astype(object)  # colunas str do pandas não aceitam bool/float do editor
+            for label, vals in self.edited.items():
+                if label in out.index:
+                    for c, v in vals.items():
+                        if c in out.columns:
+                            out.at[label, c] = v
+        if self.deleted:
+            out = out.drop(index=[l for l in self.deleted if l in out.index])
+        return out
+
+    def summary(self) -> Tuple[int, int, int]:
+        edited, added, deleted = self._current
+        return (len(set(self.edited) | set(edited)), len(self.added) + len(added), len(self.deleted) + len(deleted))
+
+    def is_empty(self) -> bool:
+        return self.summary() == (0, 0, 0)
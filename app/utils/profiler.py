@@ -0,0 +1,171 @@
+import json
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from .config import runtime_config
+from .data import TV_TZ
+
+# ---- Profiler por amostragem de reruns (opt-in) ----
+# Uma thread lê a pilha da thread do script (sys._current_frames) a cada INTERVAL e, quando o rerun
+# termina, grava <página>-<data>-<ms>.speedscope.json (abre em speedscope.app) e .folded
+# (flamegraph.pl / speedscope). Liga por fração dos reruns (`profile_sample_rate` na aba settings
+# ou no secrets) ou, numa tela específica, com ?profile=1 na URL. Sem amostra sorteada, custo zero.
+PROFILE_ENV = "LUKMA_PROFILE_DIR"
+INTERVAL = 0.005      # s entre amostras
+MAX_SECONDS = 120     # teto de um perfil (rerun travado não amostra para sempre)
+KEEP_PROFILES = 50    # perfis mantidos no diretório (os mais antigos saem)
+SUFFIX = ".speedscope.json"
+APP_DIR = Path(__file__).resolve().parent.parent
+
+Frame = Tuple[str, str, int]  # (função, arquivo, linha da definição)
+
+def profile_dir() -> Path:
+    if os.environ.get(PROFILE_ENV):
+        return Path(os.environ[PROFILE_ENV])
+    try:
+        configured = st.secrets.get("app", {}).get("profile_dir")
+    except Exception:
+        configured = None
+    return Path(configured or os.path.join(tempfile.gettempdir(), "lukma-tv-profiles"))
+
+def _short(path: str) -> str:
+    """Caminho legível no flamegraph: relativo à app, ou a partir do pacote instalado."""
+    try:
+        return str(Path(path).resolve().relative_to(APP_DIR))
+    except ValueError:
+        return path.split("site-packages/", 1)[-1]
+
+class SamplingProfiler(threading.Thread):
+    """Amostra a pilha de uma thread até o frame raiz (o script) sair dela."""
+
+    def __init__(self, name: str, thread_id: int, root_frame, out_dir: Path,
+                 interval: float = INTERVAL, max_seconds: float = MAX_SECONDS):
+        super().__init__(name=f"profiler-{name}", daemon=True)
+        self.profile_name = name
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.out_dir = out_dir
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.frames: Dict[Frame, int] = {}
+        self.samples: List[List[int]] = []
+        self.weights: List[float] = []  # ms reais entre amostras
+        self.elapsed = 0.0
+        self.path: Optional[Path] = None
+        self._done = threading.Event()
+
+    def _stack(self) -> Optional[List[int]]:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            if frame is self.root_frame:
+                break
+            frame = frame.f_back
+        else:
+            return None  # raiz fora da pilha: o rerun terminou (ou a thread acabou)
+        return [self.frames.setdefault(k, len(self.frames)) for k in reversed(stack)]
+
+    def run(self):
+        t0 = last = time.perf_counter()
+        while not self._done.wait(self.interval):
+            now = time.perf_counter()
+            stack = self._stack()
+            if stack is None or now - t0 > self.max_seconds:
+                break
+            self.samples.append(stack)
+            self.weights.append((now - last) * 1000)
+            last = now
+        self.elapsed = time.perf_counter() - t0
+        self.root_frame = None
+        if self.samples:
+            try:
+                self.path = write_profile(self)
+            except OSError:
+                pass  # disco cheio/sem permissão: perfil perdido, app segue
+
+    def stop(self):
+        self._done.set()
+
+def speedscope_doc(prof: SamplingProfiler) -> dict:
+    frames = sorted(prof.frames, key=prof.frames.get)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "exporter": "lukma-tv",
+        "name": prof.profile_name,
+        "activeProfileIndex": 0,
+        "shared": {"frames": [{"name": fn, "file": _short(path), "line": line} for fn, path, line in frames]},
+        "profiles": [{
+            "type": "sampled", "name": prof.profile_name, "unit": "milliseconds",
+            "startValue": 0, "endValue": round(sum(prof.weights), 3),
+            "samples": prof.samples, "weights": [round(w, 3) for w in prof.weights],
+        }],
+    }
+
+def folded_stacks(prof: SamplingProfiler) -> str:
+    """Formato "a;b;c N" (N = amostras) do flamegraph.pl."""
+    names = {i: f"{fn} ({_short(path)}:{line})" for (fn, path, line), i in prof.frames.items()}
+    counts: Dict[str, int] = {}
+    for stack in prof.samples:
+        key = ";".join(names[i] for i in stack)
+        counts[key] = counts.get(key, 0) + 1
+    return "".join(f"{k} {n}\n" for k, n in sorted(counts.items()))
+
+def write_profile(prof: SamplingProfiler) -> Path:
+    prof.out_dir.mkdir(parents=True, exist_ok=True)
+    base = f"{prof.profile_name}-{time.strftime('%Y%m%d-%H%M%S')}-{int(prof.elapsed * 1000)}ms-{secrets.token_hex(2)}"
+    path = prof.out_dir / f"{base}{SUFFIX}"
+    path.write_text(json.dumps(speedscope_doc(prof)), "utf-8")
+    (prof.out_dir / f"{base}.folded").write_text(folded_stacks(prof), "utf-8")
+    rotate(prof.out_dir)
+    return path
+
+def rotate(out_dir: Path, keep: int = KEEP_PROFILES):
+    profiles = sorted(out_dir.glob(f"*{SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in profiles[keep:]:
+        p.unlink(missing_ok=True)
+        p.with_name(p.name[:-len(SUFFIX)] + ".folded").unlink(missing_ok=True)
+
+def _forced() -> bool:
+    try:
+        return str(st.query_params.get("profile", "")).strip().lower() in ("1", "true", "yes")
+    except Exception:
+        return False
+
+def profile_rerun(name: str) -> Optional[SamplingProfiler]:
+    """
+    Chamar no nível do módulo do script (tv.py, páginas). Sorteia se este rerun é perfilado;
+    se for, amostra até o script terminar, inclusive por st.stop()/st.rerun().
+    """
+    rate = runtime_config().profile_sample_rate
+    if not _forced() and not (rate and random.random() < rate):
+        return None
+    prof = SamplingProfiler(name, threading.get_ident(), sys._getframe(1), profile_dir())
+    prof.start()
+    return prof
+
+def list_profiles(out_dir: Optional[Path] = None) -> pd.DataFrame:
+    """Perfis gravados, mais recentes primeiro (para a página de perfis do Admin)."""
+    out_dir = out_dir or profile_dir()
+    rows = []
+    found = sorted(out_dir.glob(f"*{SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True) if out_dir.is_dir() else []
+    for p in found:
+        parts = p.name[:-len(SUFFIX)].rsplit("-", 4)  # página-data-hora-ms-sufixo
+        rows.append({
+            "arquivo": p.name, "página": parts[0] if len(parts) == 5 else "?",
+            "duração ms": int(parts[3][:-2]) if len(parts) == 5 and parts[3].endswith("ms") else None,
+            "gravado em": pd.Timestamp(p.stat().st_mtime, unit="s", tz="UTC").tz_convert(TV_TZ).strftime("%Y-%m-%d %H:%M:%S"),
+            "KiB": round(p.stat().st_size / 1024, 1),
+        })
+    return pd.DataFrame(rows, columns=["arquivo", "página", "duração ms", "gravado em", "KiB"])
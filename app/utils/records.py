@@ -0,0 +1,76 @@
+from dataclasses import dataclass, fields
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+# ---- Registros do render da TV ----
+# Montados uma vez por versão da aba (índices em cache) e compartilhados por todas as sessões:
+# imutáveis, com __slots__ (sem __dict__ por item) e acesso por atributo, sem DataFrame no caminho quente.
+# O pandas continua na leitura da planilha e nas telas de edição do Admin.
+
+def _text(row: dict, key: str) -> str:
+    v = row.get(key)
+    return "" if v is None else str(v).strip()
+
+def num_or_none(v) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if f != f else f  # NaN -> None
+
+@dataclass(frozen=True, slots=True)
+class NewsItem:
+    id: str
+    title: str
+    description: str
+    image_url: str
+
+    @classmethod
+    def from_row(cls, row: dict) -> "NewsItem":
+        return cls(_text(row, "id"), _text(row, "title"), _text(row, "description"), _text(row, "image_url"))
+
+@dataclass(frozen=True, slots=True)
+class VideoItem:
+    id: str
+    title: str
+    url: str
+    duration_seconds: str
+
+    @classmethod
+    def from_row(cls, row: dict) -> "VideoItem":
+        return cls(_text(row, "id"), _text(row, "title"), _text(row, "url"), _text(row, "duration_seconds"))
+
+    def duration_ms(self, default_ms: int) -> int:
+        secs = num_or_none(self.duration_seconds or None)
+        return int(secs) * 1000 if secs else default_ms
+
+@dataclass(frozen=True, slots=True)
+class Birthday:
+    name: str
+    sector: str
+    photo_url: str
+    month: int
+    day: str  # "07"
+
+@dataclass(frozen=True, slots=True)
+class WeatherReading:
+    alias: str
+    temperature: Optional[float]
+    windspeed: Optional[float]
+    weathercode: Optional[int]
+
+    @classmethod
+    def from_row(cls, row: dict) -> "WeatherReading":
+        code = num_or_none(row.get("weathercode"))
+        return cls(str(row.get("alias") or "Unidade"), num_or_none(row.get("temperature")),
+                   num_or_none(row.get("windspeed")), None if code is None else int(code))
+
+class ClockReading(NamedTuple):
+    label: str
+    time: str  # "HH:MM:SS"
+
+def weather_readings(rows: Iterable[dict]) -> Tuple[WeatherReading, ...]:
+    return tuple(WeatherReading.from_row(r) for r in rows)
+
+def record_dict(rec) -> dict:
+    """Campos do registro como dict (payload do feed)."""
+    return {f.name: getattr(rec, f.name) for f in fields(rec)}
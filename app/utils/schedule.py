@@ -0,0 +1,116 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from .data import TRUTHY, TV_TZ
+from .records import NewsItem, VideoItem
+
+SCHEDULE_COLUMNS = ["publish_from","publish_until","priority"]
+DATETIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M", "%Y-%m-%d", "%d/%m/%Y"]
+MAX_PRIORITY = 10
+RECORDS: Dict[str, type] = {"news": NewsItem, "videos": VideoItem}  # registro exibido por aba
+
+def parse_when(value, end_of_day: bool = False) -> Tuple[Optional[datetime], bool]:
+    """
+    Converte publish_from/publish_until (horário local, sem fuso) em datetime.
+    Devolve (datetime|None, válido). Só data: início do dia, ou fim do dia se `end_of_day`.
+    """
+    raw = str(value or "").strip()
+    if not raw:
+        return None, True
+    for fmt in DATETIME_FORMATS:
+        try:
+            d = datetime.strptime(raw, fmt)
+        except ValueError:
+            continue
+        if end_of_day and "%H" not in fmt:
+            d += timedelta(days=1)
+        return d, True
+    return None, False
+
+def parse_priority(value) -> int:
+    try:
+        return min(max(int(float(value)), 1), MAX_PRIORITY)
+    except (TypeError, ValueError):
+        return 1
+
+def weighted_playlist(items: List[tuple]) -> list:
+    """Round-robin ponderado suave sobre pares (item, prioridade): prioridade 3 aparece 3x por ciclo, bem espalhada."""
+    if not items:
+        return []
+    weights = [p for _, p in items]
+    current = [0] * len(items)
+    total = sum(weights)
+    out = []
+    for _ in range(total):
+        for i, w in enumerate(weights):
+            current[i] += w
+        best = max(range(len(items)), key=lambda i: current[i])
+        current[best] -= total
+        out.append(items[best][0])
+    return out
+
+class ScheduleIndex:
+    """
+    Índice de janelas de publicação de uma aba (news/videos), montado uma vez por versão.
+    As fronteiras (publish_from/publish_until) ficam ordenadas e uma varredura pelos eventos de
+    entrada/saída guarda o conjunto elegível de cada segmento; a playlist ponderada de um segmento
+    só é montada na primeira consulta a ele (e memorizada). Na renderização basta um bisect pelo
+    horário atual. Os itens são registros imutáveis (`record`: NewsItem, VideoItem).
+    """
+
+    def __init__(self, df: pd.DataFrame, record: type = NewsItem):
+        self.bounds: List[datetime] = []
+        self.segments: List[Tuple[int, ...]] = [()]  # índices em `entries` elegíveis em cada segmento
+        self.invalid: List[str] = []
+        self.entries: List[tuple] = []  # (registro, prioridade)
+        self._playlists: Dict[int, list] = {}
+        if df is None or df.empty:
+            return
+        starts: Dict[datetime, List[int]] = {}
+        ends: Dict[datetime, List[int]] = {}
+        live = set()
+        for r in df.to_dict("records"):
+            if "active" in r and str(r.get("active", "")).strip().lower() not in TRUTHY:
+                continue
+            start, ok_from = parse_when(r.get("publish_from"))
+            end, ok_until = parse_when(r.get("publish_until"), end_of_day=True)
+            if not (ok_from and ok_until) or (start and end and end <= start):
+                self.invalid.append(str(r.get("title") or r.get("id") or "?"))
+                continue
+            i = len(self.entries)
+            self.entries.append((record.from_row(r), parse_priority(r.get("priority"))))
+            if start is None:
+                live.add(i)  # no ar desde "sempre"
+            else:
+                starts.setdefault(start, []).append(i)
+            if end is not None:
+                ends.setdefault(end, []).append(i)
+
+        # segmento k = [bounds[k-1], bounds[k]); o segmento 0 vai do "sempre" até a 1ª fronteira
+        self.bounds = sorted(starts.keys() | ends.keys())
+        self.segments = [tuple(sorted(live))]
+        for at in self.bounds:
+            live.difference_update(ends.get(at, ()))
+            live.update(starts.get(at, ()))
+            self.segments.append(tuple(sorted(live)))
+
+    def playlist(self, now: datetime) -> list:
+        """Itens elegíveis agora, repetidos conforme a prioridade."""
+        k = bisect_right(self.bounds, now)
+        out = self._playlists.get(k)
+        if out is None:
+            # corrida entre sessões só repete o cálculo (mesmo resultado)
+            out = self._playlists[k] = weighted_playlist([self.entries[i] for i in self.segments[k]])
+        return out
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def schedule_index(name: str, version: str, _df: pd.DataFrame) -> ScheduleIndex:
+    """Índice compartilhado entre sessões; reconstruído só quando a versão da aba muda."""
+    return ScheduleIndex(_df, RECORDS.get(name, NewsItem))
+
+def local_now() -> datetime:
+    return pd.Timestamp.now(tz=TV_TZ).tz_localize(None).to_pydatetime()
@@ -1,12 +1,28 @@
+import hashlib
+import os
+import threading
 import time
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-import gspread
-from gspread.exceptions import APIError
 import pandas as pd
 import streamlit as st
-from google.oauth2.service_account import Credentials
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
+from .bus import bus_token, publish
+from .config import runtime_config, ttl_bucket
+from .journal import write_journal
+from .metrics import count, timer
+from .snapshots import snapshot_reader
+
+# Frames lidos são compartilhados entre sessões (cópias rasas): no pandas 2.x o copy-on-write
+# precisa ser ligado para que a edição de uma sessão nunca vaze para o cache (no 3.x já é padrão).
+try:
+    pd.set_option("mode.copy_on_write", True)
+except (KeyError, ValueError, pd.errors.OptionError):
+    pass
+
+# gspread/google-auth (~250 ms de import, com requests) só carregam quando a planilha é usada:
+# réplicas servidas por snapshot, o feed e as páginas que não tocam no Sheets nunca os importam.
 SCOPE = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
@@ -18,43 +34,80 @@ DEFAULT_COLUMNS = {
         "can_news","can_weather","can_birthdays","can_videos",
         "can_worldclocks","can_currencies","active"
     ],
-    "news": ["id","title","description","image_url","active","created_at"],
+    "news": ["id","title","description","image_url","active","created_at","publish_from","publish_until","priority"],
     "birthdays": ["id","name","sector","birthday","photo_url","active"],
-    "videos": ["id","title","url","duration_seconds","active"],
+    "videos": ["id","title","url","duration_seconds","active","publish_from","publish_until","priority"],
     "weather_units": ["id","alias","city","state","latitude","longitude","active"],
     "worldclocks": ["id","label","timezone"],
     "settings": ["key","value"],
+    "news_archive": ["id","title","description","image_url","active","created_at","publish_from","publish_until","priority","archived_at"],
+    "videos_archive": ["id","title","url","duration_seconds","active","publish_from","publish_until","priority","archived_at"],
 }
 
 # ---- Controle de cota: retry exponencial em 429, e pequeno espaçamento entre leituras ----
+READ_ERROR = "read_error"  # attrs do frame servido no lugar de uma aba que não pôde ser lida
+READ_ERROR_MSG = "❌ Falha ao ler abas (pode ser cota 429). Usando schema padrão vazio."
+
 MAX_RETRIES = 4
 BASE_SLEEP = 1.0  # segundos entre retries (exponential backoff)
 BETWEEN_READ_SLEEP = 0.4  # pequeno intervalo entre leituras de abas
 
 def _with_retry(fn, *args, **kwargs):
+    op = getattr(fn, "__name__", "call")
     attempt = 0
     while True:
         try:
-            return fn(*args, **kwargs)
-        except APIError as e:
+            count("sheets_calls_total", op=op)
+            with timer("external_call_seconds", service="sheets", op=op):
+                return fn(*args, **kwargs)
+        except Exception as e:
+            from gspread.exceptions import APIError  # já carregado: `fn` é do gspread
+            if not isinstance(e, APIError):
+                raise  # Não insistir em erros não relacionados a cota
             msg = str(e)
             is_429 = "429" in msg or "Quota exceeded" in msg
+            if is_429:
+                count("sheets_429_total", op=op)
             attempt += 1
             if not is_429 or attempt >= MAX_RETRIES:
                 raise
             sleep_for = BASE_SLEEP * (2 ** (attempt - 1))
             time.sleep(sleep_for)
-        except Exception:
-            # Não insistir em erros não relacionados a cota
-            raise
+
+# ---- Endpoint alternativo (bench/ e simulações de carga): LUKMA_SHEETS_ENDPOINT=http://127.0.0.1:PORTA ----
+SHEETS_ENDPOINT_ENV = "LUKMA_SHEETS_ENDPOINT"
+GOOGLE_HOSTS = ("https://sheets.googleapis.com", "https://www.googleapis.com")
+
+def _endpoint_session(endpoint: str):
+    """Sessão HTTP do gspread que troca os hosts do Google por um servidor local (sem credenciais)."""
+    import requests
+    base = endpoint.rstrip("/")
+
+    class EndpointSession(requests.Session):
+        def request(self, method, url, *args, **kwargs):
+            for host in GOOGLE_HOSTS:
+                if url.startswith(host):
+                    url = base + url[len(host):]
+                    break
+            return super().request(method, url, *args, **kwargs)
+
+    return EndpointSession()
+
+def _authorize():
+    """Cliente novo com o secrets atual (sem cache e sem mensagens: quem chama decide o que exibir)."""
+    import gspread
+    endpoint = os.environ.get(SHEETS_ENDPOINT_ENV)
+    if endpoint:
+        return gspread.Client(None, session=_endpoint_session(endpoint))
+    from google.oauth2.service_account import Credentials
+    creds = Credentials.from_service_account_info(st.secrets["gcp_service_account"], scopes=SCOPE)
+    return gspread.authorize(creds)
 
 @st.cache_resource(show_spinner=False)
 def _client():
     """Autentica no Google com Service Account vinda do secrets."""
     try:
-        creds_info = st.secrets["gcp_service_account"]
-        creds = Credentials.from_service_account_info(creds_info, scopes=SCOPE)
-        return gspread.authorize(creds)
+        return _authorize()
     except Exception as e:
         st.error(
             """
@@ -94,6 +147,58 @@ def _sheet():
         st.exception(e)
         raise
 
+def spreadsheet():
+    """Planilha aberta pelo cliente compartilhado do processo (TV, Admin e Init Headers)."""
+    return _sheet()
+
+def open_fresh():
+    """
+    Planilha aberta por um cliente novo, com o secrets atual (páginas de diagnóstico: um secrets
+    editado é testado de verdade, não o cliente em cache). Falhas sobem sem mensagem na tela.
+    """
+    return _with_retry(_authorize().open_by_key, st.secrets["gsheets"]["spreadsheet_id"])
+
+# ---- Fontes: a planilha global ou o conteúdo de um site (outra planilha e/ou abas com prefixo) ----
+class Source(NamedTuple):
+    key: str                  # slug do site (nome do cache, do barramento e dos ids)
+    spreadsheet_id: str = ""  # vazio = mesma planilha global
+    prefix: str = ""          # abas "<prefixo>news"... (conjunto de abas do site na planilha global)
+
+@st.cache_resource(show_spinner=False)
+def _open(spreadsheet_id: str):
+    """Planilha de um site, aberta pelo mesmo cliente (uma vez por processo)."""
+    return _with_retry(_client().open_by_key, spreadsheet_id)
+
+def _book(source: Optional[Source]):
+    return _open(source.spreadsheet_id) if source and source.spreadsheet_id else _sheet()
+
+def _tab(source: Optional[Source], name: str) -> str:
+    return f"{source.prefix}{name}" if source else name
+
+def _bus_name(source: Optional[Source], name: str) -> str:
+    return f"{source.key}.{name}" if source else name
+
+def _values_version(values: List[List[str]]) -> str:
+    """Hash curto do conteúdo bruto da aba: muda sempre que qualquer célula muda."""
+    h = hashlib.sha1()
+    for row in values or []:
+        h.update("\x1f".join(str(v) for v in row).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()[:16]
+
+def table_version(df: pd.DataFrame) -> str:
+    """
+    Versão de uma tabela lida por read_tables (carimbada em df.attrs na leitura).
+    Para frames sem carimbo, calcula um hash do conteúdo.
+    """
+    if df is None:
+        return "none"
+    v = df.attrs.get("version")
+    if v:
+        return v
+    values = [[str(c) for c in df.columns]] + df.astype(str).values.tolist()
+    return _values_version(values)
+
 def _values_to_df(values: List[List[str]], ws_name: str) -> pd.DataFrame:
     """Converte get_all_values() em DataFrame, com fallback de colunas padrão."""
     if not values:
@@ -108,60 +213,293 @@ def _values_to_df(values: List[List[str]], ws_name: str) -> pd.DataFrame:
         return pd.DataFrame()
     df = pd.DataFrame(rows, columns=headers) if rows else pd.DataFrame(columns=headers)
     df.columns = [str(c).strip() for c in df.columns]
+    df.attrs["version"] = _values_version(values)
     return df
 
-@st.cache_data(ttl=180, show_spinner=False)  # cache por 3 minutos para segurar cota
-def read_tables(ws_names: List[str]) -> Dict[str, pd.DataFrame]:
+def fetch_tables(ws_names: List[str], strict: bool = False, source: Optional[Source] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Lê várias abas de forma sequencial, sem cache (compatível com qualquer versão do gspread).
+    `strict=False`: aba que falhar volta com schema vazio. `strict=True`: a falha é propagada
+    (quem vai gravar por cima não pode confundir "falhou" com "aba vazia").
+    `source`: abas de um site (ver Source); as chaves do resultado são sempre os nomes lógicos.
+    """
+    out: Dict[str, pd.DataFrame] = {}
+    sh = _book(source)
+    for i, name in enumerate(ws_names):
+        try:
+            ws = _with_retry(sh.worksheet, _tab(source, name))
+            values = _with_retry(ws.get_all_values)
+            out[name] = _values_to_df(values, name)
+        except Exception:
+            if strict:
+                raise
+            # Em falha (incluindo cota 429 depois de retries), devolve schema vazio
+            out[name] = pd.DataFrame(columns=DEFAULT_COLUMNS.get(name, []))
+        if i < len(ws_names) - 1:
+            time.sleep(BETWEEN_READ_SLEEP)
+    return out
+
+# ---- Leitura projetada: só as colunas (e linhas) pedidas saem da planilha ----
+def _col_letter(i: int) -> str:
+    """Índice 0-based -> letra A1 (0 -> A, 26 -> AA)."""
+    out = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        out = chr(65 + r) + out
+    return out
+
+def _a1_ranges(ws_name: str, headers: List[str], wanted: List[str],
+               rows: Optional[Tuple[int, Optional[int]]] = None) -> List[Tuple[str, List[str]]]:
     """
-    Lê várias abas de forma sequencial (compatível com qualquer versão do gspread).
-    Usa retry, pequeno intervalo entre leituras e cache global.
+    Faixas A1 contíguas cobrindo as colunas pedidas que existem no cabeçalho:
+    [("'news'!B2:D", ["title","description","image_url"]), ...].
+    `rows` = (início, fim) em linhas de dados, 0-based e fim exclusivo (None = até o fim).
     """
+    pos = sorted({headers.index(c) for c in wanted if c in headers})
+    start, stop = rows or (0, None)
+    r0 = start + 2  # linha 1 é o cabeçalho
+    r1 = "" if stop is None else str(stop + 1)
+    out, run = [], []
+    for p in pos:
+        if run and p != run[-1] + 1:
+            out.append(run); run = []
+        run.append(p)
+    if run:
+        out.append(run)
+    title = ws_name.replace("'", "''")
+    return [(f"'{title}'!{_col_letter(r[0])}{r0}:{_col_letter(r[-1])}{r1}", [headers[p] for p in r]) for r in out]
+
+def fetch_projected(columns: Dict[str, List[str]],
+                    rows: Optional[Dict[str, Tuple[int, Optional[int]]]] = None,
+                    source: Optional[Source] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Lê só as colunas declaradas de cada aba com dois batchGet (cabeçalhos + faixas de dados),
+    em vez de um get_all_values por aba. Coluna pedida que não existe na aba volta vazia.
+    Falhas são propagadas (quem chama decide o fallback).
+    """
+    sh = _book(source)
+    names = list(columns)
+    quoted = {n: _tab(source, n).replace("'", "''") for n in names}
+    heads = _with_retry(sh.values_batch_get, [f"'{quoted[n]}'!1:1" for n in names])
+    headers = {}
+    for n, vr in zip(names, heads.get("valueRanges", [])):
+        headers[n] = [str(h).strip() for h in (vr.get("values") or [[]])[0]]
+
+    plan = {n: _a1_ranges(_tab(source, n), headers[n], columns[n], (rows or {}).get(n)) for n in names}
+    flat = [rng for n in names for rng, _ in plan[n]]
+    data = _with_retry(sh.values_batch_get, flat, params={"majorDimension": "ROWS"}) if flat else {}
+    ranges = iter(data.get("valueRanges", []))
+
     out: Dict[str, pd.DataFrame] = {}
+    for n in names:
+        blocks = [((next(ranges).get("values") or []), cols) for _, cols in plan[n]]
+        height = max((len(v) for v, _ in blocks), default=0)
+        table = {}
+        for values, cols in blocks:
+            for j, c in enumerate(cols):
+                table[c] = [(row[j] if j < len(row) else "") for row in values] + [""] * (height - len(values))
+        wanted = list(dict.fromkeys(columns[n]))
+        df = pd.DataFrame({c: table.get(c, [""] * height) for c in wanted}, columns=wanted)
+        df.attrs["version"] = _values_version([wanted] + df.values.tolist())
+        out[n] = df
+    return out
+
+def sheet_last_update():
+    """Carimbo de última alteração da planilha (Drive); None se indisponível."""
     try:
-        sh = _sheet()
-        for i, name in enumerate(ws_names):
+        return _with_retry(_sheet().get_lastUpdateTime)
+    except Exception:
+        return None
+
+class ReadCache:
+    """
+    Cache de leituras do processo, por aba (e projeção). Cada entrada guarda o carimbo com que
+    foi lida: janela de TTL + versão da aba no barramento (bus). Se outro worker gravou a aba,
+    o carimbo muda e só ela é relida; as demais continuam servidas da memória.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[tuple, Tuple[tuple, pd.DataFrame]] = {}
+        self._fetch_locks: Dict[Optional[str], threading.Lock] = {}
+
+    def fetch_lock(self, site: Optional[str] = None) -> threading.Lock:
+        """Um fetch por vez por fonte: a planilha global e a de cada site carregam em paralelo."""
+        with self._lock:
+            return self._fetch_locks.setdefault(site, threading.Lock())
+
+    def get(self, key: tuple, stamp: tuple) -> Optional[pd.DataFrame]:
+        hit = self._entries.get(key)
+        return hit[1] if hit and hit[0] == stamp else None
+
+    def put(self, key: tuple, stamp: tuple, df: pd.DataFrame):
+        self._entries[key] = (stamp, df)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+@st.cache_resource(show_spinner=False)
+def _read_cache() -> ReadCache:
+    return ReadCache()
+
+def read_tables(ws_names: List[str], columns: Optional[Dict[str, List[str]]] = None,
+                rows: Optional[Dict[str, Tuple[int, Optional[int]]]] = None,
+                source: Optional[Source] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Lê várias abas (ver fetch_tables) com retry, pequeno intervalo entre leituras e cache global
+    (TTL = `sheets_ttl_seconds` da aba settings, padrão 3 min para segurar cota; gravação em
+    qualquer worker invalida a aba na hora via barramento).
+    Com `columns` ({aba: [colunas]}), as abas listadas são lidas projetadas (fetch_projected);
+    `rows` limita as linhas de dados dessas abas. `source` lê as abas de um site (cache próprio).
+    """
+    cache = _read_cache()
+    bucket = ttl_bucket(runtime_config().sheets_ttl_seconds)
+    site = source.key if source else None
+
+    def key_stamp(n):
+        key = (n, tuple(columns[n]) if columns and n in columns else None,
+               tuple(rows[n]) if rows and n in rows else None, site)
+        return key, (bucket, bus_token(_bus_name(source, n)))
+
+    out, missing = {}, []
+    for n in ws_names:
+        df = cache.get(*key_stamp(n))
+        if df is not None:
+            out[n] = df
+    if len(out) < len(ws_names):
+        with cache.fetch_lock(site):  # um fetch por vez por fonte (sessões simultâneas esperam e reaproveitam)
+            stamps = {n: key_stamp(n) for n in ws_names if n not in out}
+            missing = [n for n, ks in stamps.items() if cache.get(*ks) is None]
+            fetched = _load_tables(missing, columns, rows, source) if missing else {}
+            for n, (key, stamp) in stamps.items():
+                if n in fetched:
+                    cache.put(key, stamp, fetched[n])  # falha também fica até a próxima janela (poupa cota)
+                    out[n] = fetched[n]
+                else:
+                    out[n] = cache.get(key, stamp)
+    cache_name = f"read_tables:{site}" if site else "read_tables"
+    count("cache_requests_total", len(ws_names) - len(missing), cache=cache_name, result="hit")
+    count("cache_requests_total", len(missing), cache=cache_name, result="miss")
+    # cópia rasa (copy-on-write): quem altera o frame não altera o cache
+    return {n: out[n].copy(deep=False) for n in ws_names}
+
+def clear_read_cache():
+    """Invalida as leituras cacheadas deste processo (depois de gravar)."""
+    _read_cache().clear()
+
+def _project(df: pd.DataFrame, cols: Optional[List[str]], bounds: Optional[Tuple[int, Optional[int]]]) -> pd.DataFrame:
+    """Projeção local (snapshot/fallback): mesmas colunas e linhas que a leitura por faixas A1."""
+    if cols is not None:
+        df = df.reindex(columns=cols).fillna("")
+    if bounds:
+        df = df.iloc[bounds[0]:bounds[1]].reset_index(drop=True)
+    return df
+
+def _load_tables(ws_names: List[str], columns: Optional[Dict[str, List[str]]],
+                 rows: Optional[Dict[str, Tuple[int, Optional[int]]]],
+                 source: Optional[Source] = None) -> Dict[str, pd.DataFrame]:
+    out = {}
+    journal = write_journal() if source is None else None  # Admin, diário e sync_daemon: só a global
+    pending = journal.pending() if journal else {}
+    for n in [n for n in ws_names if n in pending]:
+        # gravação do Admin ainda na fila: os leitores já veem o conteúdo salvo
+        df = journal.frame(n)
+        if df is not None:
+            out[n] = _project(df, (columns or {}).get(n), (rows or {}).get(n))
+            out[n].attrs["version"] = pending[n]
+    ws_names = [n for n in ws_names if n not in out]
+    if not ws_names:
+        return out
+    reader = snapshot_reader() if source is None else None
+    if reader:
+        # sync_daemon ativo: abas sincronizadas vêm do snapshot local; as outras (users...) da planilha
+        for n in ws_names:
+            df = reader.table(n)
+            if df is not None:
+                version = df.attrs["version"]
+                out[n] = _project(df, (columns or {}).get(n), (rows or {}).get(n))
+                out[n].attrs["version"] = version
+        ws_names = [n for n in ws_names if n not in out]
+        if not ws_names:
+            return out
+    try:
+        projected = {n: columns[n] for n in ws_names if columns and n in columns}
+        if projected:
             try:
-                ws = _with_retry(sh.worksheet, name)
-                values = _with_retry(ws.get_all_values)
-                out[name] = _values_to_df(values, name)
-            except Exception as sub_e:
-                # Em falha (incluindo cota 429 depois de retries), devolve schema vazio
-                out[name] = pd.DataFrame(columns=DEFAULT_COLUMNS.get(name, []))
-            if i < len(ws_names) - 1:
-                time.sleep(BETWEEN_READ_SLEEP)
+                out.update(fetch_projected(projected, rows, source))
+            except Exception:
+                # ex.: aba inexistente derruba o batchGet inteiro -> leitura normal, projetada localmente
+                full = fetch_tables(list(projected), source=source)
+                for n, cols in projected.items():
+                    out[n] = _project(full[n], cols, (rows or {}).get(n))
+        rest = [n for n in ws_names if n not in out]
+        if rest:
+            out.update(fetch_tables(rest, source=source))
         # Garante que todas as chaves existam
         for name in ws_names:
             if name not in out:
                 out[name] = pd.DataFrame(columns=DEFAULT_COLUMNS.get(name, []))
         return out
     except Exception as e:
-        st.error("❌ Falha ao ler abas (pode ser cota 429). Usando schema padrão vazio.")
-        st.exception(e)
-        return {name: pd.DataFrame(columns=DEFAULT_COLUMNS.get(name, [])) for name in ws_names}
+        if get_script_run_ctx(suppress_warning=True) is not None:
+            st.error(READ_ERROR_MSG)
+            st.exception(e)
+        # nas threads do pool (TV, sites) não há script para exibir: a falha vai no frame, para o render
+        for name in ws_names:
+            out[name] = pd.DataFrame(columns=DEFAULT_COLUMNS.get(name, []))
+            out[name].attrs[READ_ERROR] = f"{type(e).__name__}: {e}"
+        return out
+
+def read_errors(tables: Dict[str, pd.DataFrame]) -> List[str]:
+    """Falhas de leitura (sem repetição) por trás das abas recebidas: abas servidas pelo schema vazio."""
+    errors = [df.attrs.get(READ_ERROR) for df in tables.values() if df is not None]
+    return list(dict.fromkeys(e for e in errors if e))
+
+def show_read_errors(tables: Dict[str, pd.DataFrame]):
+    """Exibe, na thread do script, as falhas de uma leitura feita em segundo plano."""
+    for error in read_errors(tables):
+        st.error(f"{READ_ERROR_MSG}\n\n`{error}`")
 
-@st.cache_data(ttl=180, show_spinner=False)
 def read_df(ws_name: str) -> pd.DataFrame:
     """Compat: lê uma aba (usa internamente a leitura sequencial cacheada)."""
     tables = read_tables([ws_name])
     return tables.get(ws_name, pd.DataFrame(columns=DEFAULT_COLUMNS.get(ws_name, [])))
 
+def write_df(ws_name: str, df: pd.DataFrame, previous_shape: Optional[Tuple[int, int]] = None):
+    """
+    Grava a aba inteira, sem avisar leitores nem a tela (escritor em segundo plano do store).
+    Com `previous_shape` (linhas, colunas do conteúdo atual, cabeçalho incluso), é uma única
+    chamada: as células que sobrariam do conteúdo antigo vão em branco no mesmo update, e uma
+    falha no meio não deixa a aba apagada (sem o clear antes).
+    """
+    sh = _sheet()
+    ws = _with_retry(sh.worksheet, ws_name)
+    if df is None or df.empty:
+        values = [DEFAULT_COLUMNS[ws_name]] if ws_name in DEFAULT_COLUMNS else [[]]
+    else:
+        df = df.fillna("")
+        values = [df.columns.tolist()] + df.values.tolist()
+    if previous_shape is None:
+        _with_retry(ws.clear)
+        _with_retry(ws.update, values)
+        return
+    width = max(previous_shape[1], max(len(r) for r in values))
+    padded = [list(r) + [""] * (width - len(r)) for r in values]
+    padded += [[""] * width for _ in range(previous_shape[0] - len(values))]
+    _with_retry(ws.update, padded)
+
+def announce(ws_name: str):
+    """Invalida a aba neste e nos outros workers (barramento); sem barramento, ao menos aqui."""
+    if not publish(ws_name):
+        clear_read_cache()
+
 def replace_df(ws_name: str, df: pd.DataFrame):
     """Grava a aba inteira."""
     try:
-        sh = _sheet()
-        ws = _with_retry(sh.worksheet, ws_name)
-        _with_retry(ws.clear)
-        if df is None or df.empty:
-            if ws_name in DEFAULT_COLUMNS:
-                _with_retry(ws.update, [DEFAULT_COLUMNS[ws_name]])
-            else:
-                _with_retry(ws.update, [[]])
-        else:
-            df = df.fillna("")
-            _with_retry(ws.update, [df.columns.tolist()] + df.values.tolist())
-        # invalida caches de leitura
-        read_df.clear()
-        read_tables.clear()
+        write_df(ws_name, df)
+        announce(ws_name)
     except Exception as e:
         st.error(f"❌ Falha ao gravar na aba `{ws_name}`.")
         st.exception(e)
@@ -178,13 +516,38 @@ def append_row(ws_name: str, row: dict):
             _with_retry(ws.update, [headers])
         values = [str(row.get(h, "")) for h in headers]
         _with_retry(ws.append_row, values, value_input_option="USER_ENTERED")
-        read_df.clear()
-        read_tables.clear()
+        if not publish(ws_name):
+            clear_read_cache()
     except Exception as e:
         st.error(f"❌ Falha ao inserir linha na aba `{ws_name}`.")
         st.exception(e)
         raise
 
+def append_rows(ws_name: str, rows: List[dict]):
+    """Acrescenta várias linhas numa única chamada (cria a aba com o cabeçalho padrão se faltar)."""
+    if not rows:
+        return
+    try:
+        sh = _sheet()
+        from gspread import WorksheetNotFound
+        try:
+            ws = _with_retry(sh.worksheet, ws_name)
+        except WorksheetNotFound:
+            headers = DEFAULT_COLUMNS.get(ws_name) or list(rows[0].keys())
+            ws = _with_retry(sh.add_worksheet, title=ws_name, rows=100, cols=len(headers))
+        headers = _with_retry(ws.row_values, 1)
+        if not headers:
+            headers = DEFAULT_COLUMNS.get(ws_name) or list(rows[0].keys())
+            _with_retry(ws.update, [headers])
+        values = [["" if r.get(h) is None else str(r.get(h)) for h in headers] for r in rows]
+        _with_retry(ws.append_rows, values, value_input_option="RAW")
+        if not publish(ws_name):
+            clear_read_cache()
+    except Exception as e:
+        st.error(f"❌ Falha ao inserir linhas na aba `{ws_name}`.")
+        st.exception(e)
+        raise
+
 def upsert_row(ws_name: str, key_field: str, row: dict):
     """Atualiza a linha com key_field==row[key_field]; se não existir, insere."""
     try:
@@ -0,0 +1,96 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+from .sheets import READ_ERROR, Source, read_tables, table_version
+
+# ---- Sites: cada escritório com o próprio conteúdo, mesclado ao conteúdo global ----
+# No secrets, um bloco por site:
+#     [sites.sp]
+#     spreadsheet_id = "..."   # planilha própria: leituras e cota separadas das outras unidades
+#     tab_prefix = "sp_"       # ou/e abas "sp_news", "sp_videos"... (na planilha do site ou na global)
+# A tela escolhe o site com ?site=<slug> (ou `[app].site`, padrão do servidor) e só lê a planilha
+# global e a do seu site, em paralelo e cada uma no seu cache. Sem site, nada muda.
+SITE_TABLES = ["news","birthdays","videos","weather_units","worldclocks","settings"]  # users é sempre global
+SITE_PARAM = "site"
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lukma-site")
+
+def site_sources() -> Dict[str, Source]:
+    """{slug: Source} dos sites configurados em `[sites.<slug>]`."""
+    try:
+        conf = st.secrets.get("sites", {})
+    except Exception:
+        conf = {}
+    out = {}
+    for slug, spec in conf.items():
+        key = str(slug).strip().lower()
+        sid = str(spec.get("spreadsheet_id", "") or "").strip()
+        prefix = str(spec.get("tab_prefix", "") or "").strip()
+        if key and (sid or prefix):
+            out[key] = Source(key, sid, prefix)
+    return out
+
+def current_site() -> Optional[str]:
+    """Site desta tela: ?site=<slug>, senão `[app].site`. Slug desconhecido = só o conteúdo global."""
+    try:
+        slug = str(st.query_params.get(SITE_PARAM, "") or "")
+    except Exception:
+        slug = ""
+    if not slug.strip():
+        try:
+            slug = str(st.secrets.get("app", {}).get("site", "") or "")
+        except Exception:
+            slug = ""
+    slug = slug.strip().lower()
+    return slug if slug in site_sources() else None
+
+def merge_site(name: str, slug: str, glob: pd.DataFrame, own: pd.DataFrame) -> pd.DataFrame:
+    """
+    Conteúdo global + conteúdo do site. Em `settings` a chave do site vence a global; nas demais
+    abas as linhas se somam, e os ids do site ganham o prefixo "<slug>:" (não colidem com os globais).
+    """
+    if own is None or own.empty:
+        return glob
+    version = f"{table_version(glob)}+{slug}:{table_version(own)}"
+    if glob is None:
+        glob = pd.DataFrame(columns=own.columns)
+    if name == "settings" and "key" in own.columns and "key" in glob.columns:
+        mine = set(own["key"].astype(str).str.strip())
+        glob = glob[~glob["key"].astype(str).str.strip().isin(mine)]
+    elif "id" in own.columns:
+        own = own.assign(id=[f"{slug}:{v}" if str(v).strip() else v for v in own["id"]])
+    cols = list(glob.columns) + [c for c in own.columns if c not in glob.columns]
+    out = pd.concat([glob.reindex(columns=cols), own.reindex(columns=cols)], ignore_index=True).fillna("")
+    out.attrs["version"] = version
+    return out
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _merged(name: str, slug: str, global_version: str, site_version: str,
+            _glob: pd.DataFrame, _own: pd.DataFrame) -> pd.DataFrame:
+    """Mescla uma vez por (aba, site, versões): as telas do site compartilham o frame e os índices."""
+    return merge_site(name, slug, _glob, _own)
+
+def read_site_tables(site: Optional[str], ws_names: List[str],
+                     columns: Optional[Dict[str, List[str]]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Abas de uma tela. Sem site: a leitura global de sempre. Com site: planilha global e abas do
+    site lidas em paralelo (cada fonte com seu cache e seu lock de fetch) e mescladas por versão.
+    """
+    src = site_sources().get(site) if site else None
+    if src is None:
+        return read_tables(ws_names, columns=columns)
+    own_names = [n for n in ws_names if n in SITE_TABLES]
+    own_cols = {n: c for n, c in (columns or {}).items() if n in own_names} or None
+    pending_global = _pool.submit(read_tables, ws_names, columns)
+    own = read_tables(own_names, columns=own_cols, source=src)
+    out = pending_global.result()
+    for n in own_names:
+        glob, mine = out.get(n), own.get(n)
+        out[n] = _merged(n, src.key, table_version(glob), table_version(mine), glob, mine).copy(deep=False)
+        errors = [df.attrs[READ_ERROR] for df in (glob, mine) if df is not None and df.attrs.get(READ_ERROR)]
+        if errors:  # a mescla não herda attrs: a falha de qualquer das fontes segue para o render
+            out[n].attrs[READ_ERROR] = "; ".join(errors)
+    return out
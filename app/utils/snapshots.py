@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+# ---- Snapshots locais escritos pelo sync_daemon e lidos (via mmap) pelos processos da app ----
+# Layout:  <raiz>/manifest.json                      -> versões vigentes + heartbeat
+#          <raiz>/tables/<aba>.<versão>.arrow        -> Arrow IPC, imutável
+#          <raiz>/data/<nome>.<versão>.json          -> clima, cotações
+# O manifest é sempre o último a ser trocado (rename atômico): quem lê nunca vê meia versão.
+SNAPSHOT_ENV = "LUKMA_SNAPSHOT_DIR"
+SYNC_TABLES = ["news","birthdays","videos","weather_units","worldclocks","settings"]  # nunca users
+MAX_STALE = 600  # s sem heartbeat do daemon -> processos voltam a ler direto da planilha
+KEEP_VERSIONS = 3
+
+def snapshot_dir() -> Optional[str]:
+    if os.environ.get(SNAPSHOT_ENV):
+        return os.environ[SNAPSHOT_ENV]
+    try:
+        return st.secrets.get("app", {}).get("snapshot_dir") or None
+    except Exception:
+        return None
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class SnapshotWriter:
+    """Lado do daemon: grava só o que mudou e publica tudo de uma vez em `commit()`."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.manifest = SnapshotReader(root).manifest() or {"tables": {}, "data": {}}
+        self.manifest.setdefault("tables", {})
+        self.manifest.setdefault("data", {})
+
+    def write_table(self, name: str, df: pd.DataFrame, version: str) -> bool:
+        if self.manifest["tables"].get(name, {}).get("version") == version:
+            return False
+        sink = pa.BufferOutputStream()
+        table = pa.Table.from_pandas(df.astype(str).reset_index(drop=True), preserve_index=False)
+        with pa.ipc.new_file(sink, table.schema) as w:
+            w.write_table(table)
+        rel = f"tables/{name}.{version}.arrow"
+        _atomic_write(self.root / rel, sink.getvalue().to_pybytes())
+        self.manifest["tables"][name] = {"version": version, "file": rel, "rows": len(df)}
+        return True
+
+    def write_data(self, name: str, payload, version: str) -> bool:
+        if self.manifest["data"].get(name, {}).get("version") == version:
+            return False
+        rel = f"data/{name}.{version}.json"
+        _atomic_write(self.root / rel, json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+        self.manifest["data"][name] = {"version": version, "file": rel}
+        return True
+
+    def commit(self):
+        """Troca o manifest (também serve de heartbeat) e apaga versões antigas."""
+        self.manifest["written_at"] = time.time()
+        _atomic_write(self.root / "manifest.json", json.dumps(self.manifest, indent=1).encode("utf-8"))
+        live = {e["file"] for group in ("tables", "data") for e in self.manifest[group].values()}
+        for sub in ("tables", "data"):
+            by_name: Dict[str, List[Path]] = {}
+            for p in (self.root / sub).glob("*.*.*"):
+                by_name.setdefault(p.name.split(".", 1)[0], []).append(p)
+            for files in by_name.values():
+                files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+                for p in files[KEEP_VERSIONS:]:
+                    if f"{sub}/{p.name}" not in live:
+                        p.unlink(missing_ok=True)
+
+class SnapshotReader:
+    """Lado da app: manifest relido só quando o arquivo muda; tabelas abertas com memory-map."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._manifest_key = None
+        self._manifest: Optional[dict] = None
+
+    def manifest(self) -> Optional[dict]:
+        path = self.root / "manifest.json"
+        try:
+            s = path.stat()
+        except FileNotFoundError:
+            return None
+        key = (s.st_ino, s.st_mtime_ns)
+        if key != self._manifest_key:
+            self._manifest = json.loads(path.read_text("utf-8"))
+            self._manifest_key = key
+        return self._manifest
+
+    def fresh(self, max_stale: float = MAX_STALE) -> bool:
+        m = self.manifest()
+        return bool(m) and time.time() - float(m.get("written_at", 0)) <= max_stale
+
+    def version(self, name: str) -> Optional[str]:
+        m = self.manifest() or {}
+        entry = m.get("tables", {}).get(name) or m.get("data", {}).get(name)
+        return entry["version"] if entry else None
+
+    def table(self, name: str) -> Optional[pd.DataFrame]:
+        entry = (self.manifest() or {}).get("tables", {}).get(name)
+        if not entry:
+            return None
+        with pa.memory_map(str(self.root / entry["file"]), "r") as src:
+            df = pa.ipc.open_file(src).read_all().to_pandas()
+        df.attrs["version"] = entry["version"]
+        return df
+
+    def data(self, name: str):
+        entry = (self.manifest() or {}).get("data", {}).get(name)
+        if not entry:
+            return None
+        return json.loads((self.root / entry["file"]).read_text("utf-8"))
+
+@st.cache_resource(show_spinner=False)
+def _reader(root: str) -> SnapshotReader:
+    return SnapshotReader(root)
+
+def snapshot_reader() -> Optional[SnapshotReader]:
+    """Leitor dos snapshots do daemon, se configurado e com heartbeat recente; senão None."""
+    root = snapshot_dir()
+    if not root:
+        return None
+    reader = _reader(root)
+    try:
+        return reader if reader.fresh() else None
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,316 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+from .bus import bus_changed, bus_token, bus_tokens
+from .journal import NOT_JOURNALED, Batch, Journal, write_journal
+from .metrics import count
+from .sheets import DEFAULT_COLUMNS, announce, fetch_tables, replace_df, sheet_last_update, table_version, write_df
+
+# Chave de linha por aba (merge por linha nas gravações concorrentes)
+TABLE_KEYS = {"users": "username", "settings": "key"}
+MAX_AGE = 60.0  # segundos até reconferir se a planilha mudou
+HISTORY = 5     # versões antigas guardadas por aba (base do merge)
+WRITER_POLL = 1.0  # s entre olhadas no diário quando não há aviso de save
+
+class ConflictError(Exception):
+    """Gravação rejeitada: as mesmas linhas foram alteradas por outra pessoa."""
+
+    def __init__(self, ws_name: str, keys: List[str]):
+        self.ws_name = ws_name
+        self.keys = keys
+        super().__init__(f"Conflito na aba `{ws_name}`: {', '.join(keys[:10])}")
+
+class DuplicateKeyError(ConflictError):
+    """Merge impossível: a mesma chave aparece em mais de uma linha (ids repetidos na aba ou na edição)."""
+
+    def __init__(self, ws_name: str, keys: List[str]):
+        super().__init__(ws_name, keys)
+        self.args = (f"Chaves repetidas na aba `{ws_name}`: {', '.join(keys[:10])}",)
+
+@dataclass(frozen=True)
+class Snapshot:
+    name: str
+    df: pd.DataFrame
+    version: str
+    fetched_at: float
+
+def table_key(ws_name: str) -> str:
+    return TABLE_KEYS.get(ws_name, "id")
+
+def _norm(v) -> str:
+    """Normaliza célula p/ comparação (TRUE/True/1 do Sheets e do editor viram o mesmo texto)."""
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    s = str(v).strip()
+    low = s.lower()
+    if low in ("true", "false"):
+        return low
+    return "" if low in ("nan", "none", "nat") else s
+
+def _rows_by_key(df: pd.DataFrame, key: str, cols: List[str]) -> "OrderedDict":
+    """
+    {chave: (linha normalizada p/ comparar, linha original p/ gravar)}. Linha sem chave é
+    identificada pelo conteúdo (e pela ocorrência, se repetida), nunca pela posição: exclusões que
+    deslocam linhas não trocam uma pela outra. Chave repetida -> DuplicateKeyError.
+    """
+    out: "OrderedDict" = OrderedDict()
+    if df is None or df.empty or key not in df.columns:
+        return out
+    dups = []
+    for r in df.to_dict("records"):
+        norm = tuple(_norm(r.get(c)) for c in cols)
+        k = _norm(r.get(key))
+        if not k:
+            n = 0
+            while ("", norm, n) in out:
+                n += 1
+            k = ("", norm, n)
+        elif k in out:
+            dups.append(k)
+            continue
+        out[k] = (norm, tuple("" if r.get(c) is None else r.get(c) for c in cols))
+    if dups:
+        raise DuplicateKeyError("", sorted(set(dups)))
+    return out
+
+def merge_rows(base: pd.DataFrame, mine: pd.DataFrame, theirs: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Merge de 3 vias por linha (chave `key`): aplica sobre `theirs` (estado atual remoto)
+    as minhas inclusões/alterações/exclusões em relação a `base`.
+    Linha alterada pelos dois lados de formas diferentes -> ConflictError.
+    """
+    cols = list(mine.columns) + [c for c in theirs.columns if c not in mine.columns]
+    b, m, t = (_rows_by_key(df, key, cols) for df in (base, mine, theirs))
+
+    def changes(side):
+        ch = {}
+        for k in set(b) | set(side):
+            now, before = side.get(k), b.get(k)
+            if (now and now[0]) != (before and before[0]):
+                ch[k] = now  # None = excluída
+        return ch
+
+    my_ch, their_ch = changes(m), changes(t)
+    conflicts = sorted(k for k in set(my_ch) & set(their_ch)
+                       if (my_ch[k] and my_ch[k][0]) != (their_ch[k] and their_ch[k][0]))
+    if conflicts:
+        raise ConflictError("", conflicts)
+
+    merged = OrderedDict(t)
+    for k, row in my_ch.items():
+        if row is None:
+            merged.pop(k, None)
+        else:
+            merged[k] = row
+    return pd.DataFrame([row[1] for row in merged.values()], columns=cols)
+
+class TableStore:
+    """
+    Tabelas compartilhadas por todas as sessões do processo, com versão por aba.
+    - `snapshot()` devolve a versão atual (ou uma versão antiga ainda no histórico);
+    - `refresh()` só relê a planilha quando o carimbo de alteração do Drive mudou;
+    - `save()` grava com controle otimista: se a aba mudou desde `base_version`,
+      faz merge por linha ou rejeita com ConflictError.
+    Com `journal` (write-behind), o save vai para o diário local e volta na hora; o merge é feito
+    contra o snapshot atual (que já inclui as pendências) e de novo contra a planilha, na entrega.
+    """
+
+    def __init__(self, max_age: float = MAX_AGE, history: int = HISTORY,
+                 journal: Optional[Journal] = None, writer: Optional["SheetsWriter"] = None):
+        self.max_age = max_age
+        self.history = history
+        self.journal = journal
+        self.writer = writer
+        self._lock = threading.RLock()
+        self._current: Dict[str, Snapshot] = {}
+        self._history: Dict[str, "OrderedDict[str, Snapshot]"] = {}
+        self._stamp = None
+        self._checked_at = 0.0
+        self._failed = set()
+        self._dirty = set()
+        self._tokens: Dict[str, str] = {}
+
+    def _put(self, snap: Snapshot):
+        self._current[snap.name] = snap
+        hist = self._history.setdefault(snap.name, OrderedDict())
+        hist[snap.version] = snap
+        hist.move_to_end(snap.version)
+        while len(hist) > self.history:
+            hist.popitem(last=False)
+
+    def refresh(self, names: List[str], force: bool = False) -> Dict[str, Snapshot]:
+        with self._lock:
+            missing = [n for n in names if n not in self._current]
+            # gravação em outro worker deste servidor: o barramento avisa na hora, sem esperar o Drive
+            self._dirty.update(bus_changed({n: self._tokens.get(n) for n in names if n in self._current}))
+            if force or time.monotonic() - self._checked_at >= self.max_age:
+                stamp = sheet_last_update()
+                if force or stamp is None or stamp != self._stamp:
+                    # todas as abas já carregadas ficam velhas, não só as pedidas agora
+                    self._dirty |= set(self._current)
+                    self._stamp = stamp
+                self._checked_at = time.monotonic()
+            stale = [n for n in names if n not in missing and (n in self._dirty or n in self._failed)]
+            to_fetch = missing + stale
+            self._dirty -= set(to_fetch)
+            pending = self.journal.pending() if self.journal else {}
+            for name in [n for n in names if n in pending]:
+                # save ainda na fila: vale o diário (a entrega publica no barramento e a aba é relida)
+                if name in to_fetch:
+                    to_fetch.remove(name)
+                cur = self._current.get(name)
+                if cur is None or cur.version != pending[name]:
+                    df = self.journal.frame(name)
+                    if df is not None:
+                        self._put(Snapshot(name, df, pending[name], time.time()))
+                    elif name not in to_fetch:
+                        to_fetch.append(name)  # entregue entre as duas consultas
+            if to_fetch:
+                now = time.time()
+                self._tokens.update(bus_tokens(to_fetch))  # antes da leitura: não perde gravação concorrente
+                try:
+                    fetched = fetch_tables(to_fetch)
+                except Exception as e:
+                    st.error("❌ Falha ao ler abas (pode ser cota 429). Usando schema padrão vazio.")
+                    st.exception(e)
+                    fetched = {}
+                for name in to_fetch:
+                    if name not in fetched:
+                        # placeholder vazio, relido na próxima chamada
+                        self._failed.add(name)
+                        if name not in self._current:
+                            self._put(Snapshot(name, pd.DataFrame(columns=DEFAULT_COLUMNS.get(name, [])), "indisponivel", 0.0))
+                        continue
+                    self._failed.discard(name)
+                    df = fetched[name]
+                    v = table_version(df)
+                    if name in self._current and self._current[name].version == v:
+                        continue  # aba não mudou: mantém o snapshot (e os índices derivados)
+                    self._put(Snapshot(name, df, v, now))
+            return {n: self._current[n] for n in names}
+
+    def snapshot(self, name: str, version: Optional[str] = None) -> Snapshot:
+        with self._lock:
+            if version and version in self._history.get(name, {}):
+                return self._history[name][version]
+            return self.refresh([name])[name]
+
+    def _merge_onto(self, ws_name: str, df: pd.DataFrame, base_version: Optional[str], current: pd.DataFrame) -> pd.DataFrame:
+        base = self._history.get(ws_name, {}).get(base_version)
+        if base is None:
+            raise ConflictError(ws_name, ["(versão base expirou)"])
+        try:
+            return merge_rows(base.df, df, current, table_key(ws_name))
+        except ConflictError as e:
+            raise type(e)(ws_name, e.keys) from None
+
+    def save(self, ws_name: str, df: pd.DataFrame, base_version: Optional[str]) -> Snapshot:
+        """Grava `df` partindo de `base_version`; devolve o novo snapshot."""
+        if self.journal is not None and ws_name not in NOT_JOURNALED:
+            return self._enqueue(ws_name, df, base_version)
+        with self._lock:
+            remote = fetch_tables([ws_name], strict=True)[ws_name]
+            remote_v = table_version(remote)
+            to_write = df
+            if base_version != remote_v:
+                to_write = self._merge_onto(ws_name, df, base_version, remote)
+            cols = list(to_write.columns) or DEFAULT_COLUMNS.get(ws_name, [])
+            to_write = to_write.reindex(columns=cols).fillna("")
+            replace_df(ws_name, to_write)
+            self._tokens[ws_name] = bus_token(ws_name)  # a própria gravação não força releitura
+            snap = Snapshot(ws_name, to_write, table_version(to_write), time.time())
+            self._put(snap)
+            return snap
+
+    def _enqueue(self, ws_name: str, df: pd.DataFrame, base_version: Optional[str]) -> Snapshot:
+        """Write-behind: merge contra o snapshot atual, diário local e volta (sem esperar a planilha)."""
+        with self._lock:
+            current = self._current.get(ws_name) or self.refresh([ws_name])[ws_name]
+            to_write = df
+            if base_version != current.version:
+                to_write = self._merge_onto(ws_name, df, base_version, current.df)
+            cols = list(to_write.columns) or DEFAULT_COLUMNS.get(ws_name, [])
+            to_write = to_write.reindex(columns=cols).fillna("")
+            snap = Snapshot(ws_name, to_write, table_version(to_write), time.time())
+            self.journal.enqueue(ws_name, to_write, snap.version, current.df, current.version)
+            announce(ws_name)  # TV e outros workers releem a aba (e veem a pendência)
+            self._tokens[ws_name] = bus_token(ws_name)
+            self._put(snap)
+        count("journal_saves_total", table=ws_name)
+        if self.writer is not None:
+            self.writer.wake()
+        return snap
+
+class SheetsWriter(threading.Thread):
+    """
+    Entrega o diário na planilha, um lote por vez: a aba com a pendência mais antiga, com as
+    pendências encadeadas dela numa gravação só. Antes de gravar relê a aba e, se ela mudou desde
+    a base, faz o merge por linha (conflito: o lote é rejeitado e fica no diário). Falha transitória
+    (429 depois dos retries, rede) devolve o lote à fila com espera crescente, sem furar a ordem da aba.
+    """
+
+    def __init__(self, journal: Journal, poll: float = WRITER_POLL):
+        super().__init__(name="lukma-sheets-writer", daemon=True)
+        self.journal = journal
+        self.poll = poll
+        self._wake = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def run(self):
+        while True:
+            try:
+                batch = self.journal.claim()
+            except Exception:
+                batch = None  # diário ocupado/travado: tenta de novo no próximo ciclo
+            if batch is None:
+                self._wake.wait(self.poll)
+                self._wake.clear()
+                continue
+            self.deliver(batch)
+
+    def deliver(self, batch: Batch) -> str:
+        name = batch.ws_name
+        try:
+            remote = fetch_tables([name], strict=True)[name]
+            to_write = batch.df
+            if table_version(remote) != batch.base_version:
+                to_write = merge_rows(batch.base if batch.base is not None else remote, batch.df, remote, table_key(name))
+            write_df(name, to_write.fillna(""), previous_shape=(len(remote) + 1, len(remote.columns)))
+        except ConflictError as e:
+            self.journal.conflict(batch, str(type(e)(name, e.keys)))
+            result = "conflict"
+        except Exception as e:
+            self.journal.fail(batch, f"{type(e).__name__}: {e}"[:500])
+            count("journal_writes_total", table=name, result="retry")
+            return "retry"
+        else:
+            self.journal.done(batch)
+            result = "ok"
+        announce(name)  # depois de marcar no diário: quem reler já não vê a pendência
+        count("journal_writes_total", table=name, result=result)
+        if len(batch.seqs) > 1:
+            count("journal_coalesced_total", len(batch.seqs) - 1, table=name)
+        return result
+
+@st.cache_resource(show_spinner=False)
+def sheets_writer() -> Optional[SheetsWriter]:
+    """Escritor do processo (um por worker; o diário garante que só um entrega cada aba por vez)."""
+    journal = write_journal()
+    if journal is None:
+        return None
+    writer = SheetsWriter(journal)
+    writer.start()
+    return writer
+
+@st.cache_resource(show_spinner=False)
+def table_store() -> TableStore:
+    """Instância única por processo (compartilhada por todas as sessões do Admin)."""
+    return TableStore(journal=write_journal(), writer=sheets_writer())
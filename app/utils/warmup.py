@@ -0,0 +1,69 @@
+import time
+from typing import Dict, Optional
+
+import pandas as pd
+import streamlit as st
+
+from .birthdays import birthday_index
+from .data import active_view, fetch_rates, fetch_weather_records
+from .feed import TV_COLUMNS, TV_TABLES
+from .journal import write_journal
+from .schedule import local_now, schedule_index
+from .sheets import _sheet, table_version
+from .sites import current_site, read_site_tables
+from .snapshots import snapshot_reader
+from .store import sheets_writer
+from .ui import base_css_html, theme_asset_name
+
+# ---- Aquecimento no boot: o primeiro render depois de um deploy sai tão rápido quanto os demais ----
+# Percorre o caminho do tv.py com as mesmas chaves de cache (cliente e planilha, leitura projetada,
+# índices por versão, clima, cotações, tema). Quem chegar no meio espera a mesma busca em andamento
+# (locks do read_tables e do st.cache_data) em vez de repetir a chamada.
+def warm_up() -> Dict[str, float]:
+    """Roda cada etapa isolada (uma falha não impede as outras) e devolve ms por etapa (None = falhou)."""
+    timings: Dict[str, Optional[float]] = {}
+    state = {}
+
+    def stage(name: str, fn):
+        t0 = time.perf_counter()
+        try:
+            fn()
+            timings[name] = round((time.perf_counter() - t0) * 1000, 1)
+        except Exception:
+            timings[name] = None
+
+    def tables():
+        state["tables"] = read_site_tables(current_site(), TV_TABLES, columns=TV_COLUMNS)  # `[app].site`, se houver
+
+    def indexes():
+        t = state.get("tables", {})
+        for name in ("news", "videos"):
+            df = t.get(name, pd.DataFrame())
+            schedule_index(name, table_version(df), df).playlist(local_now())  # playlist do segmento atual
+        bd = t.get("birthdays", pd.DataFrame())
+        birthday_index(table_version(bd), bd)
+        state["units"] = active_view("weather_units", t.get("weather_units", pd.DataFrame()))
+
+    def weather():
+        units = state.get("units", pd.DataFrame())
+        fetch_weather_records(units if not units.empty else pd.DataFrame())
+
+    def fragments():
+        base_css_html()
+        if st.get_option("server.enableStaticServing"):
+            theme_asset_name()
+
+    def journal():
+        j = write_journal()
+        if j is not None and j.depth():
+            sheets_writer()  # saves que ficaram na fila antes do restart voltam a ser entregues
+
+    if snapshot_reader() is None:
+        stage("sheets_client", _sheet)  # imports do gspread/google-auth + autorização + open_by_key
+    stage("read_tables", tables)
+    stage("indexes", indexes)
+    stage("weather", weather)
+    stage("rates", fetch_rates)
+    stage("fragments", fragments)
+    stage("journal", journal)
+    return timings
@@ -0,0 +1,348 @@
+"""
+Stand-ins locais (HTTP) para Google Sheets/Drive, Open-Meteo, exchangerate.host e CoinGecko.
+
+A app fala com eles pelos mesmos clientes de produção (gspread, requests): basta exportar
+`FakeUpstreams.env()` (LUKMA_SHEETS_ENDPOINT e LUKMA_API_BASE). Latência, falhas 503, 429 e
+cota por minuto são configuráveis por serviço (`Faults`); cada chamada é contada em `stats()`.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+SERVICES = ["sheets", "drive", "open_meteo", "geocoding", "exchangerate", "coingecko"]
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0     # fração de respostas 503
+    rate_429: float = 0.0       # fração de respostas 429 (aleatórias)
+    quota_per_minute: int = 0   # 0 = sem limite; acima disso responde 429, como a cota do Sheets
+
+def service_of(path: str) -> Optional[str]:
+    if path.startswith("/v4/spreadsheets"):
+        return "sheets"
+    if path.startswith("/drive/v3/files"):
+        return "drive"
+    return {"/v1/forecast": "open_meteo", "/v1/search": "geocoding", "/latest": "exchangerate",
+            "/api/v3/simple/price": "coingecko"}.get(path)
+
+# ---- Planilha em memória (faixas A1 no formato que o gspread envia) ----
+_A1 = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+def _col(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+def split_range(rng: str) -> Tuple[str, str]:
+    """"'news'!B2:E" -> ("news", "B2:E")."""
+    title, _, a1 = rng.partition("!") if "!" in rng else (rng, "", "")
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    return title, a1.upper()
+
+def bounds(a1: str) -> Tuple[int, Optional[int], int, Optional[int]]:
+    """(linha0, linha1, col0, col1), 0-based com fim exclusivo; None = até o fim."""
+    if not a1:
+        return 0, None, 0, None
+    c0, r0, c1, r1 = _A1.match(a1).groups()
+    if ":" not in a1:
+        c1, r1 = c0, r0
+    return (int(r0) - 1 if r0 else 0, int(r1) if r1 else None,
+            _col(c0) if c0 else 0, _col(c1) + 1 if c1 else None)
+
+def _trim(rows: List[List[str]]) -> List[List[str]]:
+    """Como a API real: sem células vazias no fim da linha nem linhas vazias no fim."""
+    out = []
+    for r in rows:
+        r = list(r)
+        while r and r[-1] == "":
+            r.pop()
+        out.append(r)
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+class FakeBook:
+    def __init__(self, tabs: Dict[str, List[List[str]]], key: str = "bench"):
+        self.key = key
+        self.lock = threading.Lock()
+        self.tabs = {n: [[str(v) for v in r] for r in rows] for n, rows in tabs.items()}
+        self.ids = {n: i for i, n in enumerate(self.tabs)}
+        self.modified = time.time()
+
+    def _props(self, name: str) -> dict:
+        rows = self.tabs[name]
+        return {"sheetId": self.ids[name], "title": name, "index": list(self.tabs).index(name), "sheetType": "GRID",
+                "gridProperties": {"rowCount": max(len(rows), 1000), "columnCount": max((len(r) for r in rows), default=26)}}
+
+    def metadata(self) -> dict:
+        with self.lock:
+            return {"spreadsheetId": self.key, "properties": {"title": "Lukma TV (bench)", "locale": "pt_BR"},
+                    "sheets": [{"properties": self._props(n)} for n in self.tabs]}
+
+    def read(self, rng: str) -> dict:
+        title, a1 = split_range(rng)
+        with self.lock:
+            rows = self.tabs[title]
+            r0, r1, c0, c1 = bounds(a1)
+            values = _trim([r[c0:c1] for r in rows[r0:r1]])
+        return {"range": rng, "majorDimension": "ROWS", **({"values": values} if values else {})}
+
+    def write(self, rng: str, values: List[List]) -> dict:
+        title, a1 = split_range(rng)
+        r0, _, c0, _ = bounds(a1)
+        with self.lock:
+            rows = self.tabs[title]
+            for i, vals in enumerate(values):
+                while len(rows) <= r0 + i:
+                    rows.append([])
+                row = rows[r0 + i]
+                row.extend([""] * (c0 + len(vals) - len(row)))
+                row[c0:c0 + len(vals)] = ["" if v is None else str(v) for v in vals]
+            self.modified = time.time()
+        return {"spreadsheetId": self.key, "updatedRange": rng, "updatedRows": len(values)}
+
+    def clear(self, rng: str) -> dict:
+        title, a1 = split_range(rng)
+        r0, r1, c0, c1 = bounds(a1)
+        with self.lock:
+            for row in self.tabs[title][r0:r1]:
+                stop = len(row) if c1 is None else min(c1, len(row))
+                row[c0:stop] = [""] * max(stop - c0, 0)
+            self.tabs[title] = _trim(self.tabs[title])
+            self.modified = time.time()
+        return {"spreadsheetId": self.key, "clearedRange": rng}
+
+    def append(self, rng: str, values: List[List]) -> dict:
+        title, _ = split_range(rng)
+        with self.lock:
+            rows = self.tabs[title] = _trim(self.tabs[title])
+            rows.extend([["" if v is None else str(v) for v in vals] for vals in values])
+            self.modified = time.time()
+        return {"spreadsheetId": self.key, "updates": {"updatedRange": rng, "updatedRows": len(values)}}
+
+    def batch_update(self, body: dict) -> dict:
+        replies = []
+        with self.lock:
+            for req in body.get("requests", []):
+                if "addSheet" in req:
+                    title = req["addSheet"]["properties"]["title"]
+                    self.tabs.setdefault(title, [])
+                    self.ids.setdefault(title, len(self.ids))
+                    replies.append({"addSheet": {"properties": self._props(title)}})
+                else:
+                    replies.append({})
+            self.modified = time.time()
+        return {"spreadsheetId": self.key, "replies": replies}
+
+# ---- APIs de clima/cotações: respostas determinísticas a partir dos parâmetros ----
+def _num(seed: str, lo: float, hi: float) -> float:
+    h = int(hashlib.sha1(seed.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return round(lo + (hi - lo) * h, 2)
+
+def api_payload(service: str, q: Dict[str, str]) -> dict:
+    if service == "open_meteo":
+        key = f"{q.get('latitude')},{q.get('longitude')}"
+        return {"current_weather": {"temperature": _num(key, 5, 35), "windspeed": _num(key + "w", 0, 40),
+                                    "weathercode": [0, 2, 3, 45, 61, 80, 95][int(_num(key + "c", 0, 6.99))]}}
+    if service == "geocoding":
+        name = q.get("name", "")
+        return {"results": [{"name": name, "latitude": _num(name, -33, 5), "longitude": _num(name + "o", -73, -35)}]}
+    if service == "exchangerate":
+        return {"base": q.get("base"), "rates": {"BRL": 5.1 if q.get("base") == "USD" else 5.6}}
+    return {"bitcoin": {"brl": 350000.0}, "ethereum": {"brl": 18000.0}}
+
+def _error(code: int) -> dict:
+    if code == 429:
+        return {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED",
+                          "message": "Quota exceeded for quota metric 'Read requests' (bench)"}}
+    return {"error": {"code": code, "status": "UNAVAILABLE", "message": "The service is currently unavailable (bench)."}}
+
+class FakeUpstreams:
+    """Um servidor HTTP local com todos os serviços externos da app (rotas distintas por caminho)."""
+
+    def __init__(self, tabs: Dict[str, List[List[str]]], faults: Optional[Dict[str, Faults]] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0):
+        self.book = FakeBook(tabs)
+        self.faults = {s: Faults() for s in SERVICES}
+        self.faults.update(faults or {})
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: Dict[str, deque] = {s: deque() for s in SERVICES}
+        self._calls: Dict[str, int] = {}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        return {"LUKMA_SHEETS_ENDPOINT": self.url, "LUKMA_API_BASE": self.url}
+
+    def start(self) -> "FakeUpstreams":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- contadores: "<serviço>" e "<serviço>.429" / "<serviço>.503" ----
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._calls)
+
+    def reset_stats(self):
+        with self._lock:
+            self._calls.clear()
+
+    def _admit(self, service: str) -> int:
+        """Aplica as falhas configuradas: devolve 200, 429 ou 503 (depois da latência)."""
+        f = self.faults[service]
+        with self._lock:
+            self._calls[service] = self._calls.get(service, 0) + 1
+            roll = self.rng.random()
+            delay = max(f.latency_ms + self.rng.uniform(-f.jitter_ms, f.jitter_ms), 0) / 1000
+            status = 200
+            if f.quota_per_minute:
+                win, now = self._window[service], time.monotonic()
+                while win and now - win[0] > 60:
+                    win.popleft()
+                if len(win) >= f.quota_per_minute:
+                    status = 429
+                else:
+                    win.append(now)
+            if status == 200 and roll < f.rate_429:
+                status = 429
+            elif status == 200 and roll < f.rate_429 + f.error_rate:
+                status = 503
+            if status != 200:
+                key = f"{service}.{status}"
+                self._calls[key] = self._calls.get(key, 0) + 1
+        if delay:
+            time.sleep(delay)
+        return status
+
+    def _handler(self):
+        up = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, fmt, *args):
+                pass
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_PUT(self):
+                self._route("PUT")
+
+            def do_POST(self):
+                self._route("POST")
+
+            def _route(self, method: str):
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                service = service_of(parts.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                if service is None:
+                    return self._reply(404, {"error": {"code": 404, "message": "not found"}})
+                status = up._admit(service)
+                if status != 200:
+                    return self._reply(status, _error(status))
+                try:
+                    if service == "sheets":
+                        payload = self._sheets(method, parts.path, query, body)
+                    elif service == "drive":
+                        payload = {"id": up.book.key, "name": "Lukma TV (bench)",
+                                   "modifiedTime": datetime.fromtimestamp(up.book.modified, timezone.utc).isoformat()}
+                    else:
+                        payload = api_payload(service, {k: v[0] for k, v in query.items()})
+                except KeyError as e:
+                    return self._reply(400, {"error": {"code": 400, "message": f"Unable to parse range: {e}"}})
+                self._reply(200, payload)
+
+            def _sheets(self, method, path, query, body):
+                book = up.book
+                rest = path[len("/v4/spreadsheets/"):]
+                if rest.endswith(":batchUpdate"):
+                    return book.batch_update(body)
+                if rest.endswith("/values:batchGet"):
+                    return {"spreadsheetId": book.key, "valueRanges": [book.read(r) for r in query.get("ranges", [])]}
+                if "/values/" not in rest:
+                    return book.metadata()
+                rng = rest.split("/values/", 1)[1]
+                if rng.endswith(":clear"):
+                    return book.clear(unquote(rng[:-len(":clear")]))
+                if rng.endswith(":append"):
+                    return book.append(unquote(rng[:-len(":append")]), body.get("values", []))
+                if method == "PUT":
+                    return book.write(unquote(rng), body.get("values", []))
+                return book.read(unquote(rng))
+
+            def _reply(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+# ---- Massa de dados sintética ----
+ADMIN_USER, ADMIN_PASSWORD = "admin", "bench"
+
+def make_tabs(units: int = 5, rows: int = 100, seed: int = 0) -> Dict[str, List[List[str]]]:
+    """Abas no formato da planilha real: `rows` notícias/aniversariantes/vídeos e `units` unidades."""
+    rnd = random.Random(seed)
+    salt = "bench"
+    pw = hashlib.sha256((salt + ADMIN_PASSWORD).encode("utf-8")).hexdigest()
+    today = datetime.now()
+    tabs = {
+        "users": [["username", "name", "email", "password_hash", "password_salt", "is_admin", "can_news", "can_weather",
+                   "can_birthdays", "can_videos", "can_worldclocks", "can_currencies", "active"],
+                  [ADMIN_USER, "Admin", "admin@bench", pw, salt] + ["TRUE"] * 8],
+        "news": [["id", "title", "description", "image_url", "active", "created_at", "publish_from", "publish_until", "priority"]],
+        "birthdays": [["id", "name", "sector", "birthday", "photo_url", "active"]],
+        "videos": [["id", "title", "url", "duration_seconds", "active", "publish_from", "publish_until", "priority"]],
+        "weather_units": [["id", "alias", "city", "state", "latitude", "longitude", "active"]],
+        "worldclocks": [["id", "label", "timezone"], ["1", "Brasília", "America/Sao_Paulo"]],
+        "settings": [["key", "value"], ["theme_gap", "12px"]],
+    }
+    for i in range(1, rows + 1):
+        active = "TRUE" if rnd.random() < 0.8 else "FALSE"
+        tabs["news"].append([str(i), f"Notícia {i}", f"Descrição da notícia {i} " * 3, f"https://img.bench/{i}.jpg", active,
+                             today.strftime("%Y-%m-%d %H:%M:%S"), "", "", str(rnd.randint(1, 3))])
+        day = today if i % 25 == 0 else today.replace(day=rnd.randint(1, 28))
+        tabs["birthdays"].append([str(i), f"Pessoa {i}", f"Setor {i % 12}", day.strftime("1990-%m-%d"), "", active])
+        tabs["videos"].append([str(i), f"Vídeo {i}", f"https://video.bench/{i}.mp4", "30", active, "", "", "1"])
+    for i in range(1, units + 1):
+        geo = i % 5 != 0  # 1 em cada 5 sem coordenadas: passa pela geocodificação
+        tabs["weather_units"].append([str(i), f"Unidade {i}", f"Cidade {i}", "SP",
+                                      f"{-23 + i / 100:.4f}" if geo else "", f"{-46 - i / 100:.4f}" if geo else "", "TRUE"])
+    return tabs
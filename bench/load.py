@@ -0,0 +1,335 @@
+"""
+Simulador de carga: N telas da TV contra um servidor Streamlit rodando, para planejar capacidade.
+
+Uso:
+    python bench/load.py --launch --fakes --steps 5,10,20,40 --step-seconds 120
+    python bench/load.py --url http://tv-server:8501 --pid 4321 --steps 10,20,40
+    python bench/load.py --launch --fakes --latency-ms 150 --steps 10,50,100 --out bench/results/carga.json
+
+Cada tela simulada faz o que o navegador do quiosque faz: abre a página (index + health +
+host-config), conecta no websocket, pede o render e espera o `script_finished`; depois mantém a
+sessão aberta pelo intervalo que o próprio tv.py manda (setTimeout do reload) e recarrega.
+As telas entram escalonadas (quiosques não são sincronizados) e ficam de um degrau para o outro.
+
+Amostras por segundo: CPU e memória do servidor (/proc, precisa de --pid ou --launch), reruns/s,
+tráfego do websocket e chamadas aos serviços externos (só com --fakes). O relatório final marca o
+joelho: primeiro degrau em que o p95 do render passa de `--knee-factor` × o do primeiro degrau,
+a vazão de reruns não acompanha as telas, a CPU satura, aparecem erros ou o Sheets passa da cota.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "app")]
+
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from bench.fakes import SERVICES, Faults, FakeUpstreams, make_tabs
+
+RELOAD = re.compile(r"window\.location\.reload\(\);\s*\}\s*,\s*(\d+)\)")
+DEFAULT_REFRESH_MS = 10_000
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+# ---- Servidor observado ----
+def proc_sample(pid: Optional[int]) -> Optional[Dict[str, float]]:
+    """CPU acumulada (s) e RSS (MiB) do processo, lidos de /proc (Linux)."""
+    if not pid:
+        return None
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        rss = next(int(l.split()[1]) for l in Path(f"/proc/{pid}/status").read_text().splitlines() if l.startswith("VmRSS:"))
+    except (OSError, StopIteration, IndexError):
+        return None
+    return {"cpu_s": (int(stat[11]) + int(stat[12])) / CLK_TCK, "rss_mib": rss / 1024}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def launch_app(port: int, env: Dict[str, str], workdir: str) -> subprocess.Popen:
+    """Sobe `streamlit run app/tv.py` headless; com stand-ins, um secrets mínimo aponta para a planilha falsa."""
+    secrets = Path(workdir) / "secrets.toml"
+    secrets.write_text('[gsheets]\nspreadsheet_id = "bench"\n', "utf-8")
+    cmd = [sys.executable, "-m", "streamlit", "run", str(ROOT / "app" / "tv.py"), "--server.headless", "true",
+           "--server.port", str(port), "--browser.gatherUsageStats", "false"]
+    if "LUKMA_SHEETS_ENDPOINT" in env:
+        cmd += ["--secrets.files", str(secrets)]
+    p = subprocess.Popen(cmd, env={**os.environ, **env}, cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(120):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).read()
+            return p
+        except OSError:
+            if p.poll() is not None:
+                raise RuntimeError("o servidor Streamlit terminou ao subir")
+            time.sleep(0.5)
+    p.terminate()
+    raise RuntimeError("o servidor Streamlit não respondeu em 60 s")
+
+# ---- Telas simuladas ----
+@dataclass
+class Counters:
+    reruns: int = 0
+    errors: int = 0
+    ws_in: int = 0
+    ws_out: int = 0
+    http_in: int = 0
+    open_sessions: int = 0
+    refresh_ms: int = DEFAULT_REFRESH_MS  # último intervalo de reload mandado pelo tv.py
+    latencies: List[float] = field(default_factory=list)  # s, do pedido de render ao script_finished
+    active: List[float] = field(default_factory=list)     # s, carga da página inteira (HTTP + websocket + render)
+
+class TvScreen:
+    def __init__(self, base_url: str, counters: Counters, speedup: float):
+        self.http = base_url.rstrip("/")
+        self.ws_url = re.sub(r"^http", "ws", self.http) + "/_stcore/stream"
+        self.c = counters
+        self.speedup = speedup
+        self.refresh_ms = DEFAULT_REFRESH_MS
+
+    def _get(self, path: str) -> int:
+        with urllib.request.urlopen(self.http + path, timeout=30) as r:
+            return len(r.read())
+
+    async def _page_load(self):
+        loop = asyncio.get_running_loop()
+        for path in ("/", "/_stcore/health", "/_stcore/host-config"):
+            self.c.http_in += await loop.run_in_executor(None, self._get, path)
+
+    async def visit(self):
+        """Uma carga de página: render completo e a sessão aberta até o próximo reload."""
+        t_visit = time.perf_counter()
+        await self._page_load()
+        async with websockets.connect(self.ws_url, subprotocols=["streamlit"], max_size=None,
+                                      origin=self.http) as ws:
+            self.c.open_sessions += 1
+            try:
+                msg = BackMsg()
+                msg.rerun_script.query_string = ""
+                raw = msg.SerializeToString()
+                t0 = time.perf_counter()
+                await ws.send(raw)
+                self.c.ws_out += len(raw)
+                while True:
+                    data = await asyncio.wait_for(ws.recv(), timeout=120)
+                    self.c.ws_in += len(data)
+                    fm = ForwardMsg()
+                    fm.ParseFromString(data)
+                    kind = fm.WhichOneof("type")
+                    if kind == "delta":
+                        m = RELOAD.search(str(fm.delta))
+                        if m:
+                            self.refresh_ms = self.c.refresh_ms = int(m.group(1))
+                    elif kind == "script_finished":
+                        break
+                self.c.latencies.append(time.perf_counter() - t0)
+                self.c.active.append(time.perf_counter() - t_visit)
+                self.c.reruns += 1
+                await asyncio.sleep(self.refresh_ms / 1000 / self.speedup)
+            finally:
+                self.c.open_sessions -= 1
+
+    async def run(self, start_delay: float):
+        await asyncio.sleep(start_delay)
+        while True:
+            try:
+                await self.visit()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.c.errors += 1
+                await asyncio.sleep(1)
+
+# ---- Relatório ----
+def summarize_step(sessions: int, rows: List[dict], lat: List[float], cycle_s: float) -> dict:
+    """`cycle_s`: intervalo de reload + carga de página sem fila (medida no primeiro degrau)."""
+    def mean(k):
+        vals = [r[k] for r in rows if r.get(k) is not None]
+        return round(statistics.fmean(vals), 2) if vals else None
+    expected = sessions / cycle_s if sessions and cycle_s else 0.0
+    achieved = mean("reruns_s") or 0.0
+    q = statistics.quantiles(lat, n=100, method="inclusive") if len(lat) > 1 else [lat[0] if lat else 0.0] * 99
+    return {
+        "sessions": sessions, "reruns_s": achieved, "expected_reruns_s": round(expected, 2),
+        "p50_ms": round(q[49] * 1000, 1), "p95_ms": round(q[94] * 1000, 1),
+        "cpu_pct": mean("cpu_pct"), "rss_mib": max((r["rss_mib"] for r in rows if r.get("rss_mib")), default=None),
+        "ws_kib_s": mean("ws_kib_s"), "upstream_min": round((mean("upstream_s") or 0) * 60, 1),
+        "sheets_min": round((mean("sheets_s") or 0) * 60, 1), "errors": sum(r["errors"] for r in rows),
+    }
+
+def find_knee(steps: List[dict], knee_factor: float = 2.0, cpu_limit: float = 90.0,
+              sheets_quota: Optional[float] = None) -> Optional[int]:
+    """Índice do primeiro degrau saturado (None = nenhum)."""
+    if not steps:
+        return None
+    base = steps[0]["p95_ms"] or 1.0
+    for i, s in enumerate(steps):
+        reasons = []
+        if i and s["p95_ms"] > knee_factor * base:
+            reasons.append(f"p95 {s['p95_ms']:.0f} ms > {knee_factor:g}× {base:.0f} ms")
+        if s["expected_reruns_s"] and s["reruns_s"] < 0.9 * s["expected_reruns_s"]:
+            reasons.append(f"vazão {s['reruns_s']}/s < 90% de {s['expected_reruns_s']}/s")
+        if s.get("cpu_pct") is not None and s["cpu_pct"] >= cpu_limit:
+            reasons.append(f"CPU {s['cpu_pct']}%")
+        if s["errors"]:
+            reasons.append(f"{s['errors']} erro(s)")
+        if sheets_quota and s["sheets_min"] > sheets_quota:
+            reasons.append(f"Sheets {s['sheets_min']}/min > cota {sheets_quota:g}/min")
+        if reasons:
+            s["knee"] = "; ".join(reasons)
+            return i
+    return None
+
+# ---- Execução ----
+async def ramp(args, base_url: str, pid: Optional[int], upstreams: Optional[FakeUpstreams]) -> dict:
+    c = Counters()
+    screens: List[asyncio.Task] = []
+    series: List[dict] = []
+    steps: List[dict] = []
+    baseline: Optional[float] = None
+    last = {"t": time.monotonic(), "reruns": 0, "ws_in": 0, "errors": 0,
+            "proc": proc_sample(pid), "up": upstreams.stats() if upstreams else {}}
+    t_start = time.monotonic()
+
+    def sample(sessions: int) -> dict:
+        now = time.monotonic()
+        dt = max(now - last["t"], 1e-6)
+        proc = proc_sample(pid)
+        up = upstreams.stats() if upstreams else {}
+        calls = lambda st, keys: sum(v for k, v in st.items() if k in keys)
+        row = {
+            "t": round(now - t_start, 1), "sessions": sessions, "open": c.open_sessions,
+            "reruns_s": round((c.reruns - last["reruns"]) / dt, 3),
+            "ws_kib_s": round((c.ws_in - last["ws_in"]) / dt / 1024, 2),
+            "errors": c.errors - last["errors"],
+            "cpu_pct": round((proc["cpu_s"] - last["proc"]["cpu_s"]) / dt * 100, 1) if proc and last["proc"] else None,
+            "rss_mib": round(proc["rss_mib"], 1) if proc else None,
+            "upstream_s": round((calls(up, SERVICES) - calls(last["up"], SERVICES)) / dt, 3) if upstreams else None,
+            "sheets_s": round((up.get("sheets", 0) - last["up"].get("sheets", 0)) / dt, 3) if upstreams else None,
+        }
+        last.update(t=now, reruns=c.reruns, ws_in=c.ws_in, errors=c.errors, proc=proc, up=up)
+        return row
+
+    try:
+        for n in args.steps:
+            stagger = c.refresh_ms / 1000 / args.speedup
+            while len(screens) < n:
+                screen = TvScreen(base_url, c, args.speedup)
+                screens.append(asyncio.create_task(screen.run(random.uniform(0, stagger))))
+            mark_lat, mark_active = len(c.latencies), len(c.active)
+            rows = []
+            settle = args.step_seconds * args.settle
+            t_step = time.monotonic()
+            while time.monotonic() - t_step < args.step_seconds:
+                await asyncio.sleep(args.sample)
+                row = sample(n)
+                series.append(row)
+                if time.monotonic() - t_step >= settle:
+                    rows.append(row)
+                print(f"\r{n:>4} telas  {row['reruns_s']:>6.2f} reruns/s  CPU {row['cpu_pct'] if row['cpu_pct'] is not None else '-':>6}%  "
+                      f"RSS {row['rss_mib'] or '-':>7} MiB  erros {c.errors}", end="", file=sys.stderr)
+            print(file=sys.stderr)
+            if baseline is None and c.active[mark_active:]:
+                baseline = statistics.median(c.active[mark_active:])
+            cycle = c.refresh_ms / 1000 / args.speedup + (baseline or 0.0)
+            steps.append(summarize_step(n, rows, c.latencies[mark_lat:], cycle))
+    finally:
+        for t in screens:
+            t.cancel()
+        await asyncio.gather(*screens, return_exceptions=True)
+
+    knee = find_knee(steps, args.knee_factor, args.cpu_limit, args.sheets_quota)
+    if knee is None:
+        capacity = steps[-1]["sessions"]
+    else:
+        capacity = steps[knee - 1]["sessions"] if knee else 0
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    return {"steps": steps, "series": series, "knee": knee, "capacity": capacity,
+            "load_cpu_s": round(own.ru_utime + own.ru_stime, 1)}
+
+def main():
+    ap = argparse.ArgumentParser(description="Simulador de carga de telas da Lukma TV.")
+    ap.add_argument("--url", default="http://127.0.0.1:8501", help="servidor já rodando (ignorado com --launch)")
+    ap.add_argument("--pid", type=int, default=None, help="PID do servidor (CPU/memória via /proc)")
+    ap.add_argument("--launch", action="store_true", help="sobe `streamlit run app/tv.py` numa porta livre")
+    ap.add_argument("--fakes", action="store_true", help="stand-ins locais para Sheets/clima/cotações (com --launch)")
+    ap.add_argument("--units", type=int, default=10, help="unidades de clima nos stand-ins")
+    ap.add_argument("--rows", type=int, default=200, help="linhas por aba nos stand-ins")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="latência dos stand-ins")
+    ap.add_argument("--steps", type=lambda s: [int(x) for x in s.split(",")], default=[5, 10, 20, 40],
+                    help="telas simultâneas em cada degrau")
+    ap.add_argument("--step-seconds", type=float, default=120.0)
+    ap.add_argument("--settle", type=float, default=0.25, help="fração inicial do degrau fora das médias")
+    ap.add_argument("--sample", type=float, default=1.0, help="segundos entre amostras")
+    ap.add_argument("--speedup", type=float, default=1.0, help="divide o intervalo de reload (>1 comprime o tempo)")
+    ap.add_argument("--knee-factor", type=float, default=2.0)
+    ap.add_argument("--cpu-limit", type=float, default=90.0)
+    ap.add_argument("--sheets-quota", type=float, default=60.0, help="leituras/min permitidas à service account")
+    ap.add_argument("--out", default=None, help="JSON com degraus e série temporal")
+    args = ap.parse_args()
+
+    upstreams, proc, pid, base_url = None, None, args.pid, args.url
+    workdir = tempfile.mkdtemp(prefix="lukma-load-")
+    try:
+        env = {"LUKMA_BUS_DIR": str(Path(workdir) / "bus")}
+        if args.fakes:
+            upstreams = FakeUpstreams(make_tabs(args.units, args.rows),
+                                      {s: Faults(latency_ms=args.latency_ms) for s in SERVICES}).start()
+            env.update(upstreams.env())
+        if args.launch:
+            port = free_port()
+            proc = launch_app(port, env, workdir)
+            pid, base_url = proc.pid, f"http://127.0.0.1:{port}"
+        elif args.fakes:
+            print("--fakes sem --launch: exporte no servidor " +
+                  " ".join(f"{k}={v}" for k, v in upstreams.env().items()), file=sys.stderr)
+        report = asyncio.run(ramp(args, base_url, pid, upstreams))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if upstreams:
+            upstreams.stop()
+
+    table = pd.DataFrame(report["steps"]).rename(columns={
+        "sessions": "telas", "reruns_s": "reruns/s", "expected_reruns_s": "esperado/s", "p50_ms": "p50 ms",
+        "p95_ms": "p95 ms", "cpu_pct": "CPU %",
+        "rss_mib": "RSS MiB", "ws_kib_s": "WS KiB/s", "upstream_min": "externas/min", "sheets_min": "Sheets/min",
+        "errors": "erros", "knee": "joelho"})
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(table.to_string(index=False))
+    if report["knee"] is None:
+        print(f"\nSem joelho até {report['capacity']} telas (aumente os degraus).")
+    elif report["capacity"]:
+        print(f"\nCapacidade: {report['capacity']} telas (joelho em {report['steps'][report['knee']]['sessions']}: "
+              f"{report['steps'][report['knee']]['knee']}).")
+    else:
+        print(f"\nSaturado já no primeiro degrau: {report['steps'][0]['knee']}.")
+    if report["load_cpu_s"] > 0.8 * sum(args.step_seconds for _ in args.steps):
+        print("Atenção: o próprio gerador de carga ficou perto de 100% de CPU; rode-o em outra máquina.")
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps({"args": {k: v for k, v in vars(args).items()}, **report},
+                                             indent=1, ensure_ascii=False), "utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Benchmark offline da TV e do Admin (Streamlit AppTest) contra os stand-ins locais (bench/fakes.py).
+
+Uso:
+    python bench/run.py                                        # grade padrão
+    python bench/run.py --screens 1,10 --units 5,50 --rows 100,2000 --renders 10
+    python bench/run.py --latency-ms 120 --rate-429 0.05 --out bench/results/atual.json
+    python bench/run.py --compare bench/results/base.json      # mostra a variação contra uma rodada anterior
+
+Para cada cenário (telas × unidades × linhas) mede:
+    - latência do render da TV (p50/p95/p99, frio e quente) e do Admin logado;
+    - chamadas externas por render (Sheets, Drive, clima, cotações) e a estimativa por hora;
+    - memória incremental por sessão (tracemalloc, numa passada separada para não distorcer a latência).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app"
+sys.path[:0] = [str(ROOT), str(APP)]  # scripts da app importam `utils.*`; este módulo importa `bench.*`
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from bench.fakes import ADMIN_PASSWORD, ADMIN_USER, SERVICES, Faults, FakeUpstreams, make_tabs
+from utils import data as app_data
+from utils.config import runtime_config
+from utils.metrics import REGISTRY, enable as enable_metrics
+
+TIMEOUT = 120
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[max(min(int(q) - 1, 98), 0)]
+
+def _reset_process():
+    """Cada cenário começa frio: caches do Streamlit, geocodificação e métricas zerados."""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    app_data.geocode_city.cache_clear()
+    REGISTRY.reset()
+    gc.collect()
+
+def _session(script: str) -> AppTest:
+    at = AppTest.from_file(str(APP / script), default_timeout=TIMEOUT)
+    at.secrets["gsheets"] = {"spreadsheet_id": "bench"}
+    return at
+
+def _run(at: AppTest) -> float:
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(f"exceção no script: {at.exception[0].message[:300]}")
+    return elapsed
+
+def _admin_login(at: AppTest) -> float:
+    at.run()
+    at.text_input(key="login_username").input(ADMIN_USER)
+    at.text_input(key="login_password").input(ADMIN_PASSWORD)
+    t0 = time.perf_counter()
+    at.button[0].click().run()
+    return time.perf_counter() - t0
+
+def _per_render(calls: Dict[str, int], renders: int) -> Dict[str, float]:
+    return {k: round(v / max(renders, 1), 3) for k, v in sorted(calls.items())}
+
+def _per_hour(cold: Dict[str, int], warm: Dict[str, float], screens: int) -> Dict[str, float]:
+    """
+    Estimativa: cada tela recarrega a cada `news_rotation_seconds`; chamadas "quentes" repetem a
+    cada render e as "frias" (caches vazios) a cada expiração do TTL do serviço.
+    """
+    cfg = runtime_config()
+    ttl = {"sheets": cfg.sheets_ttl_seconds, "drive": cfg.sheets_ttl_seconds,
+           "open_meteo": cfg.weather_refresh_minutes * 60, "exchangerate": cfg.currency_refresh_minutes * 60,
+           "coingecko": cfg.currency_refresh_minutes * 60, "geocoding": None}  # geocodificação: cache do processo
+    renders_h = 3600 / cfg.news_rotation_seconds * screens
+    out = {}
+    for s in SERVICES:
+        refills = 3600 / ttl[s] if ttl.get(s) else 0
+        total = warm.get(s, 0) * renders_h + cold.get(s, 0) * refills
+        if total:
+            out[s] = round(total, 1)
+    return out
+
+def run_scenario(screens: int, units: int, rows: int, renders: int, faults: Dict[str, Faults],
+                 admin: bool = True, memory: bool = True) -> dict:
+    os.environ.pop("LUKMA_SNAPSHOT_DIR", None)  # sempre direto contra os stand-ins
+    os.environ["LUKMA_BUS_DIR"] = tempfile.mkdtemp(prefix="lukma-bench-bus-")
+    with FakeUpstreams(make_tabs(units, rows), faults) as up:
+        os.environ.update(up.env())
+        _reset_process()
+        enable_metrics(True)
+
+        sessions = [_session("tv.py") for _ in range(screens)]
+        up.reset_stats()
+        cold_s = _run(sessions[0])
+        cold = up.stats()
+        for at in sessions[1:]:
+            _run(at)
+        up.reset_stats()
+        lat = [_run(at) for _ in range(renders) for at in sessions]
+        warm = _per_render(up.stats(), len(lat))
+        stages = REGISTRY.timings()
+        stages = stages[stages["métrica"] == "tv_stage_seconds"]
+        stage_p95 = {r["rótulos"].split("=", 1)[1]: r["p95 ms"] for _, r in stages.iterrows()}
+
+        result = {
+            "screens": screens, "units": units, "rows": rows, "renders": len(lat),
+            "cold_ms": round(cold_s * 1000, 1),
+            "p50_ms": round(_percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(_percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(_percentile(lat, 99) * 1000, 1),
+            "cold_calls": cold, "calls_per_render": warm,
+            "calls_per_hour": _per_hour(cold, warm, screens),
+            "stage_p95_ms": stage_p95,
+        }
+
+        if admin:
+            at = _session("pages/1_Admin.py")
+            up.reset_stats()
+            login_s = _admin_login(at)
+            admin_lat = [_run(at) for _ in range(max(min(renders, 5), 1))]
+            result.update({
+                "admin_login_ms": round(login_s * 1000, 1),
+                "admin_p50_ms": round(_percentile(admin_lat, 50) * 1000, 1),
+                "admin_calls_per_render": _per_render(up.stats(), len(admin_lat) + 1),
+            })
+
+        if memory:
+            del sessions
+            gc.collect()
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            extra = [_session("tv.py") for _ in range(screens)]
+            for at in extra:
+                _run(at)
+            gc.collect()
+            result["kib_per_session"] = round((tracemalloc.get_traced_memory()[0] - base) / screens / 1024, 1)
+            tracemalloc.stop()
+            del extra
+    enable_metrics(False)
+    return result
+
+def _grid(arg: str) -> List[int]:
+    return [int(x) for x in str(arg).split(",") if x.strip()]
+
+def summary(results: List[dict]) -> pd.DataFrame:
+    rows = []
+    for r in results:
+        rows.append({
+            "telas": r["screens"], "unidades": r["units"], "linhas": r["rows"],
+            "frio ms": r["cold_ms"], "p50 ms": r["p50_ms"], "p95 ms": r["p95_ms"], "p99 ms": r["p99_ms"],
+            "chamadas/render": round(sum(v for k, v in r["calls_per_render"].items() if "." not in k), 3),
+            "chamadas/h": round(sum(r["calls_per_hour"].values())),
+            "sheets/h": r["calls_per_hour"].get("sheets", 0),
+            "admin p50 ms": r.get("admin_p50_ms", ""),
+            "KiB/sessão": r.get("kib_per_session", ""),
+        })
+    return pd.DataFrame(rows)
+
+def compare(results: List[dict], baseline: List[dict]) -> pd.DataFrame:
+    """Variação contra uma rodada anterior (mesmo cenário): >1 = piorou."""
+    base = {(b["screens"], b["units"], b["rows"]): b for b in baseline}
+    rows = []
+    for r in results:
+        b = base.get((r["screens"], r["units"], r["rows"]))
+        if not b:
+            continue
+        ratio = lambda k: round(r[k] / b[k], 2) if b.get(k) else None
+        rows.append({"telas": r["screens"], "unidades": r["units"], "linhas": r["rows"],
+                     "p50 ×": ratio("p50_ms"), "p95 ×": ratio("p95_ms"),
+                     "chamadas/h Δ": round(sum(r["calls_per_hour"].values()) - sum(b["calls_per_hour"].values())),
+                     "KiB/sessão Δ": (round(r["kib_per_session"] - b["kib_per_session"], 1)
+                                      if "kib_per_session" in r and "kib_per_session" in b else None)})
+    return pd.DataFrame(rows)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark offline da Lukma TV (AppTest + stand-ins locais).")
+    ap.add_argument("--screens", default="1,5", help="telas simultâneas (lista separada por vírgula)")
+    ap.add_argument("--units", default="5,50", help="unidades de clima")
+    ap.add_argument("--rows", default="100,1000", help="linhas em notícias/aniversariantes/vídeos")
+    ap.add_argument("--renders", type=int, default=5, help="renders quentes por tela")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="latência de cada serviço externo")
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 503")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="fração de respostas 429 do Sheets")
+    ap.add_argument("--quota", type=int, default=0, help="cota de chamadas/minuto do Sheets (0 = sem limite)")
+    ap.add_argument("--no-admin", action="store_true")
+    ap.add_argument("--no-memory", action="store_true")
+    ap.add_argument("--out", default=None, help="grava o JSON completo (para --compare depois)")
+    ap.add_argument("--compare", default=None, help="JSON de uma rodada anterior")
+    args = ap.parse_args()
+
+    base = Faults(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    faults = {s: Faults(**vars(base)) for s in SERVICES}
+    faults["sheets"] = Faults(**{**vars(base), "rate_429": args.rate_429, "quota_per_minute": args.quota})
+
+    results = []
+    for screens in _grid(args.screens):
+        for units in _grid(args.units):
+            for rows in _grid(args.rows):
+                print(f"… {screens} tela(s), {units} unidade(s), {rows} linha(s)", file=sys.stderr)
+                results.append(run_scenario(screens, units, rows, args.renders, faults,
+                                            admin=not args.no_admin, memory=not args.no_memory))
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(summary(results).to_string(index=False))
+        if args.compare:
+            print("\nComparação com", args.compare)
+            print(compare(results, json.loads(Path(args.compare).read_text("utf-8"))["scenarios"]).to_string(index=False))
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        meta = {"at": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                "pandas": pd.__version__, "streamlit": st.__version__, "args": vars(args)}
+        Path(args.out).write_text(json.dumps({"meta": meta, "scenarios": results}, indent=1, ensure_ascii=False), "utf-8")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pandas as pd
+
+from app.utils.archive import ArchiveIndex, retention_days, split_stale
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+def test_split_stale_reasons():
+    df = pd.DataFrame([
+        {"id": "1", "title": "no ar", "active": "TRUE", "created_at": "2026-10-01 09:00:00", "publish_until": ""},
+        {"id": "2", "title": "inativa", "active": "FALSE", "created_at": "2026-10-01 09:00:00", "publish_until": ""},
+        {"id": "3", "title": "antiga", "active": "TRUE", "created_at": "2025-01-01 09:00:00", "publish_until": ""},
+        {"id": "4", "title": "encerrada", "active": "TRUE", "created_at": "2026-10-01 09:00:00", "publish_until": "2026-10-18"},
+    ])
+    keep, stale = split_stale(df, NOW, 180)
+    assert keep["id"].tolist() == ["1"]
+    assert dict(zip(stale["id"], stale["motivo"])) == {"2": "inativo", "3": "mais de 180 dias", "4": "janela encerrada"}
+    assert split_stale(df, NOW, 0)[0]["id"].tolist() == ["1", "3"]  # 0 = sem limite de idade
+
+def test_retention_setting_and_archive_index():
+    assert retention_days(pd.DataFrame([{"key": "archive_retention_days", "value": "30"}])) == 30
+    assert retention_days(None) == 180
+    idx = ArchiveIndex(pd.DataFrame([
+        {"id": "2", "title": "Velha", "archived_at": "2026-01-01 00:00:00"},
+        {"id": "2", "title": "Velha (de novo)", "archived_at": "2026-05-01 00:00:00"},
+    ]))
+    assert len(idx) == 1 and idx.search("velha")[0]["title"] == "Velha (de novo)"
@@ -0,0 +1,42 @@
+import gspread
+import pytest
+import requests
+
+from app.utils.data import api_url
+from app.utils.sheets import _endpoint_session
+from bench.fakes import Faults, FakeUpstreams, bounds, make_tabs
+
+@pytest.fixture
+def upstreams():
+    with FakeUpstreams(make_tabs(units=2, rows=3)) as up:
+        yield up
+
+def _book(up):
+    return gspread.Client(None, session=_endpoint_session(up.url)).open_by_key("bench")
+
+def test_a1_bounds():
+    assert bounds("") == (0, None, 0, None)
+    assert bounds("1:1") == (0, 1, 0, None)
+    assert bounds("B2:E") == (1, None, 1, 5)
+    assert bounds("A1") == (0, 1, 0, 1)
+
+def test_gspread_round_trip(upstreams):
+    sh = _book(upstreams)
+    ws = sh.worksheet("news")
+    assert len(ws.get_all_values()) == 4
+    got = sh.values_batch_get(["'news'!1:1", "'news'!B2:B"])["valueRanges"]
+    assert got[0]["values"][0][:2] == ["id", "title"] and len(got[1]["values"]) == 3
+    ws.append_rows([["9", "Nova"]], value_input_option="RAW")
+    assert ws.get_all_values()[-1][:2] == ["9", "Nova"]
+    with pytest.raises(gspread.WorksheetNotFound):
+        sh.worksheet("nope")
+
+def test_injected_429_and_counters(upstreams, monkeypatch):
+    sh = _book(upstreams)
+    upstreams.faults["sheets"] = Faults(rate_429=1.0)
+    with pytest.raises(gspread.exceptions.APIError, match="Quota exceeded"):
+        sh.worksheet("news")
+    monkeypatch.setenv("LUKMA_API_BASE", upstreams.url)
+    assert requests.get(api_url("exchangerate", "/latest"), params={"base": "USD"}).json()["rates"]["BRL"] == 5.1
+    stats = upstreams.stats()
+    assert stats["sheets.429"] == 1 and stats["exchangerate"] == 1
@@ -0,0 +1,22 @@
+from bench.load import find_knee, summarize_step
+
+def _step(sessions, p95, reruns=1.0, expected=1.0, cpu=20.0, errors=0, sheets=0.0):
+    return {"sessions": sessions, "p95_ms": p95, "reruns_s": reruns, "expected_reruns_s": expected,
+            "cpu_pct": cpu, "errors": errors, "sheets_min": sheets}
+
+def test_knee_on_latency_and_throughput():
+    steps = [_step(5, 100), _step(10, 150), _step(20, 260), _step(40, 900)]
+    assert find_knee(steps) == 2 and "p95" in steps[2]["knee"]
+    steps = [_step(5, 100), _step(10, 120, reruns=0.5, expected=1.0)]
+    assert find_knee(steps) == 1 and "vazão" in steps[1]["knee"]
+
+def test_knee_on_sheets_quota_and_none():
+    assert find_knee([_step(5, 100), _step(10, 110, sheets=75.0)], sheets_quota=60) == 1
+    assert find_knee([_step(5, 100), _step(10, 110)]) is None
+
+def test_summarize_step():
+    rows = [{"reruns_s": 1.0, "cpu_pct": 10.0, "rss_mib": 100.0, "ws_kib_s": 2.0, "upstream_s": 0.1, "sheets_s": 0.0, "errors": 0},
+            {"reruns_s": 3.0, "cpu_pct": 30.0, "rss_mib": 120.0, "ws_kib_s": 4.0, "upstream_s": 0.3, "sheets_s": 0.0, "errors": 1}]
+    s = summarize_step(20, rows, [0.1, 0.2, 0.3], cycle_s=10.2)
+    assert s["reruns_s"] == 2.0 and s["rss_mib"] == 120.0 and s["errors"] == 1
+    assert s["upstream_min"] == 12.0 and s["expected_reruns_s"] == round(20 / 10.2, 2)
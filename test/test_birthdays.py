@@ -0,0 +1,26 @@
+from datetime import date
+
+import pandas as pd
+
+from app.utils.birthdays import BirthdayIndex, parse_month_day
+
+def test_parse_month_day_formats():
+    assert parse_month_day("1990-05-07") == (5, 7)
+    assert parse_month_day("07/05/1990") == (5, 7)
+    assert parse_month_day("29/02") == (2, 29)
+    assert parse_month_day("2025-13-01") is None
+    assert parse_month_day("") is None
+
+def test_index_today_then_month():
+    df = pd.DataFrame([
+        {"name": "Ana", "sector": "TI", "birthday": "1990-05-07", "photo_url": "", "active": "true"},
+        {"name": "Bia", "sector": "RH", "birthday": "1985-05-20", "photo_url": "", "active": "TRUE"},
+        {"name": "Caio", "sector": "RH", "birthday": "1985-05-20", "photo_url": "", "active": "false"},
+        {"name": "Davi", "sector": "RH", "birthday": "ontem", "photo_url": "", "active": "true"},
+    ])
+    idx = BirthdayIndex(df)
+    assert idx.invalid == ["Davi"]
+    assert [r.name for r in idx.today(date(2026, 5, 20))] == ["Bia"]
+    assert idx.current(date(2026, 5, 1)) == ("month", idx.month(5))
+    assert [r.day for r in idx.month(5)] == ["07", "20"]
+    assert idx.current(date(2026, 6, 1)) == ("month", [])
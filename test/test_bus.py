@@ -0,0 +1,30 @@
+import pandas as pd
+
+from app.utils import bus, sheets
+from app.utils.bus import VersionBus
+
+def test_publish_changes_only_that_token(tmp_path):
+    b = VersionBus(str(tmp_path))
+    assert b.token("news") == "0"
+    seen = b.tokens(["news", "videos"])
+    b.publish("news")
+    assert b.changed(seen) == ["news"]
+
+def test_read_tables_refetches_only_changed_tables(tmp_path, monkeypatch):
+    b = VersionBus(str(tmp_path))
+    monkeypatch.setattr(bus, "version_bus", lambda: b)
+    sheets._read_cache().clear()
+    calls = []
+
+    def fake_load(names, columns, rows, source=None):
+        calls.append(list(names))
+        return {n: pd.DataFrame({"id": [str(len(calls))]}) for n in names}
+
+    monkeypatch.setattr(sheets, "_load_tables", fake_load)
+    first = sheets.read_tables(["news", "videos"])
+    sheets.read_tables(["news", "videos"])
+    b.publish("videos")  # outro worker gravou videos
+    again = sheets.read_tables(["news", "videos"])
+    assert calls == [["news", "videos"], ["videos"]]
+    assert again["news"]["id"].tolist() == first["news"]["id"].tolist() == ["1"]
+    assert again["videos"]["id"].tolist() == ["2"]
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from app.utils import config, sheets
+from app.utils.config import parse_config, runtime_config, ttl_bucket
+
+def test_settings_override_secrets_and_defaults():
+    settings = pd.DataFrame([
+        {"key": "sheets_ttl_seconds", "value": "60"},
+        {"key": "currency_refresh_minutes", "value": "abc"},
+        {"key": "news_rotation_seconds", "value": "1"},       # abaixo do mínimo
+        {"key": "theme_gap", "value": "12px"},                # de outro módulo: ignorada
+    ])
+    cfg = parse_config(settings, {"news_rotation_seconds": 20, "weather_refresh_minutes": "30"})
+    assert cfg.sheets_ttl_seconds == 60
+    assert cfg.weather_refresh_minutes == 30
+    assert cfg.news_rotation_seconds == 20 and cfg.currency_refresh_minutes == 5
+    assert len(cfg.errors) == 2
+
+def test_ttl_bucket_changes_with_window():
+    assert ttl_bucket(60, now=119) == 1 and ttl_bucket(60, now=120) == 2
+    assert ttl_bucket(30, now=119) == 3
+
+def test_overflow_and_nan_are_reported_not_raised():
+    settings = pd.DataFrame([
+        {"key": "sheets_ttl_seconds", "value": "inf"},
+        {"key": "feed_ttl_seconds", "value": "1e400"},
+        {"key": "render_deadline_seconds", "value": "nan"},
+    ])
+    cfg = parse_config(settings)
+    assert (cfg.sheets_ttl_seconds, cfg.feed_ttl_seconds, cfg.render_deadline_seconds) == (180, 15, 3.0)
+    assert len(cfg.errors) == 3
+
+def test_sheets_limits_apply_on_every_call_not_only_on_recompute(monkeypatch):
+    cfg = parse_config(pd.DataFrame([{"key": "sheets_max_retries", "value": "2"},
+                                     {"key": "sheets_read_sleep_ms", "value": "50"}]))
+    monkeypatch.setattr(config, "_load_config", lambda token: cfg)  # entrada já em cache
+    monkeypatch.setattr(sheets, "MAX_RETRIES", 4)
+    monkeypatch.setattr(sheets, "BETWEEN_READ_SLEEP", 0.4)
+    assert runtime_config() is cfg and (sheets.MAX_RETRIES, sheets.BETWEEN_READ_SLEEP) == (2, 0.05)
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from app.utils.data import active_view, filter_active
+
+def _units(version="v1"):
+    df = pd.DataFrame({"alias": ["SP", "RJ", "BH"], "temp": np.array([20.0, 25.0, 18.0]),
+                       "active": ["TRUE", "false", "1"]})
+    df.attrs["version"] = version
+    return df
+
+def test_active_view_shared_per_version():
+    df = _units()
+    a, b = active_view("weather_units", df), active_view("weather_units", df)
+    assert a["alias"].tolist() == ["SP", "BH"]
+    assert a is not b and np.shares_memory(a["temp"].to_numpy(), b["temp"].to_numpy())
+
+def test_session_edit_does_not_leak():
+    df = _units("v2")
+    mine = active_view("weather_units", df)
+    mine.loc[0, "temp"] = 99.0  # copy-on-write: só a sessão vê
+    assert active_view("weather_units", df).loc[0, "temp"] == 20.0
+    assert df.loc[0, "temp"] == 20.0
+
+def test_filter_active_leaves_input_untouched():
+    df = _units()
+    df.columns = [" alias", "temp", "active"]
+    out = filter_active(df)
+    assert list(df.columns) == [" alias", "temp", "active"]
+    assert out["alias"].tolist() == ["SP", "BH"]
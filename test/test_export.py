@@ -0,0 +1,13 @@
+import pandas as pd
+
+from app.utils.export import export_bundle
+
+def test_export_is_incremental(tmp_path):
+    tables = {"news": pd.DataFrame([{"id": "1", "title": "Olá", "description": "", "image_url": "", "active": "true"}])}
+    first = export_bundle(str(tmp_path), tables, pd.DataFrame(), {"USD": 5.0})
+    assert first and (tmp_path / first["data"]).exists() and (tmp_path / first["css"]).exists()
+    assert export_bundle(str(tmp_path), tables, pd.DataFrame(), {"USD": 5.0}) is None
+
+    tables["news"].loc[0, "title"] = "Nova"
+    second = export_bundle(str(tmp_path), tables, pd.DataFrame(), {"USD": 5.0})
+    assert second["data"] != first["data"] and second["css"] == first["css"]
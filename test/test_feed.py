@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pandas as pd
+
+from app.utils.feed import build_feed, etag_matches, feed_body, feed_etag
+
+def _tables(title="Olá"):
+    return {
+        "news": pd.DataFrame([
+            {"id": "1", "title": title, "description": "", "image_url": "", "active": "TRUE"},
+            {"id": "2", "title": "Antiga", "description": "", "image_url": "", "active": "false"},
+        ]),
+        "birthdays": pd.DataFrame([{"id": "1", "name": "Ana", "sector": "TI", "birthday": "1990-05-07", "photo_url": "", "active": "true"}]),
+    }
+
+def test_feed_only_active_and_version_stable():
+    a = build_feed(_tables(), pd.DataFrame(), {"USD": 5.0}, now=datetime(2026, 5, 20, 12, 0))
+    b = build_feed(_tables(), pd.DataFrame(), {"USD": 5.0}, now=datetime(2026, 5, 20, 12, 0))
+    assert [n["id"] for n in a["news"]] == ["1"]
+    assert a["birthdays"][0]["day"] == "07"
+    assert a["version"] == b["version"]
+    assert build_feed(_tables("Outra"), pd.DataFrame(), {"USD": 5.0}, now=datetime(2026, 5, 20, 12, 0))["version"] != a["version"]
+
+def test_etag_matches():
+    etag = feed_etag({"version": "abc"})
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc", "zzz"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"zzz"', etag)
+    assert not etag_matches(None, etag)
+
+def test_ticker_weathercode_is_strict_json():
+    weather = pd.DataFrame([{"alias": "SP", "temperature": 21.5, "windspeed": 3.0, "weathercode": 3.0},
+                            {"alias": "RJ", "temperature": None, "windspeed": None, "weathercode": float("nan")}])
+    feed = build_feed(_tables(), weather, {}, now=datetime(2026, 5, 20, 12, 0))
+    assert [t["weathercode"] for t in feed["ticker"]] == [3, None]
+    assert b"NaN" not in feed_body(feed) and b'"weathercode":3,' in feed_body(feed)
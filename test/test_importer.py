@@ -0,0 +1,41 @@
+import pandas as pd
+
+from app.utils.importer import apply_plan, build_plan, iter_upload
+
+EXISTING = pd.DataFrame([
+    {"id": "1", "name": "Ana", "sector": "RH", "birthday": "1990-05-20", "photo_url": "", "active": "TRUE"},
+])
+
+CSV = (
+    "Name;Birthday;Sector;Extra\n"
+    "ana;20/05/1990;Financeiro;x\n"   # mesma chave da Ana -> atualização
+    "Bruno;1985-02-29;TI;\n"           # data inválida
+    "Carla;1992-07-01;TI;\n"
+    "Carla;01/07/1992;TI;\n"           # repetida no arquivo
+    "Diego;1988-12-03;;\n"
+).encode()
+
+def test_plan_dedupes_validates_and_allocates_ids():
+    plan = build_plan("birthdays", iter_upload(CSV, "lote.csv", chunksize=2), EXISTING)
+    assert plan.ignored_columns == ["extra"]
+    assert [r["name"] for r in plan.added] == ["Carla", "Diego"]
+    assert len({r["id"] for r in plan.added} | {"1"}) == 3
+    assert plan.updated[0]["id"] == "1" and plan.updated[0]["sector"] == "Financeiro"
+    assert plan.duplicates == 1 and plan.errors == [(3, "data inválida: '1985-02-29'")]
+
+    out = apply_plan(EXISTING, plan)
+    assert out["name"].tolist() == ["Ana", "Carla", "Diego"]
+    assert out["active"].tolist() == ["TRUE", "TRUE", "TRUE"]
+
+def test_missing_required_column_is_fatal():
+    plan = build_plan("birthdays", iter_upload(b"name,sector\nAna,RH\n", "x.csv"), EXISTING)
+    assert plan.fatal and not plan.added
+
+def test_updates_rows_without_id_by_natural_key():
+    existing = pd.DataFrame([
+        {"id": "", "name": "Ana", "sector": "RH", "birthday": "1990-05-20", "photo_url": "", "active": "TRUE"},
+        {"id": "", "name": "Bia", "sector": "TI", "birthday": "1991-03-02", "photo_url": "", "active": "TRUE"},
+    ])
+    csv = b"name,birthday,sector\nAna,20/05/1990,Financeiro\nBia,02/03/1991,Vendas\n"
+    out = apply_plan(existing, build_plan("birthdays", iter_upload(csv, "x.csv"), existing))
+    assert out["name"].tolist() == ["Ana", "Bia"] and out["sector"].tolist() == ["Financeiro", "Vendas"]
@@ -0,0 +1,68 @@
+import os
+
+import pandas as pd
+
+from app.utils import store as store_mod
+from app.utils.journal import Journal
+from app.utils.sheets import table_version
+from app.utils.store import SheetsWriter, Snapshot, TableStore
+
+V0 = pd.DataFrame([{"id": "1", "title": "A", "active": True}, {"id": "2", "title": "B", "active": True}])
+
+def _journal(tmp_path) -> Journal:
+    return Journal(str(tmp_path / "writes.sqlite3"))
+
+def test_chained_saves_coalesce_and_readers_see_the_last(tmp_path):
+    j = _journal(tmp_path)
+    v1 = V0.assign(title=["A1", "B"])
+    v2 = v1.assign(title=["A2", "B"])
+    j.enqueue("news", v1, "v1", V0, "v0")
+    j.enqueue("news", v2, "v2", v1, "v1")
+    j.enqueue("news", V0, "x", V0, "v0")  # outro worker, sobre a versão antiga: lote separado
+    assert j.depth() == 3 and j.pending() == {"news": "x"}
+
+    batch = j.claim()
+    assert batch.seqs == [1, 2] and batch.base_version == "v0"
+    assert batch.df["title"].tolist() == ["A2", "B"] and batch.df["active"].tolist() == [True, True]
+    assert j.claim() is None  # a aba está em entrega: o 3º save espera (ordem por aba)
+    j.done(batch)
+    assert j.recent()["state"].tolist() == ["pending", "done", "superseded"]
+    assert j.status()["state"] == "ok" and j.claim().seqs == [3]
+
+def test_failure_backs_off_and_survives_reopen(tmp_path):
+    j = _journal(tmp_path)
+    j.enqueue("videos", V0, "v1", V0, "v0")
+    assert j.fail(j.claim(), "APIError: 429") == 2.0
+    assert j.claim() is None and j.status()["state"] == "retrying"
+    again = _journal(tmp_path)  # restart: a pendência continua no disco
+    assert again.frame("videos")["title"].tolist() == ["A", "B"]
+    assert again.claim(lease=0) is None
+
+def test_store_enqueues_merges_and_writer_delivers(tmp_path, monkeypatch):
+    remote = {"news": V0.assign(title=["A", "B (planilha)"])}
+    writes = []
+    monkeypatch.setattr(store_mod, "announce", lambda name: None)
+    monkeypatch.setattr(store_mod, "fetch_tables", lambda names, strict=False: {n: remote[n] for n in names})
+    monkeypatch.setattr(store_mod, "write_df", lambda name, df, previous_shape=None: writes.append((name, df)))
+
+    j = _journal(tmp_path)
+    s = TableStore(journal=j)
+    s._put(Snapshot("news", V0, "v0", 0.0))
+    snap = s.save("news", V0.assign(title=["A (admin)", "B"]), "v0")
+    assert s.snapshot("news").version == snap.version and writes == []  # volta sem tocar a planilha
+
+    assert SheetsWriter(j).deliver(j.claim()) == "ok"
+    (name, df), = writes
+    assert name == "news" and df["title"].tolist() == ["A (admin)", "B (planilha)"]
+    assert j.depth() == 0
+
+def test_users_save_stays_synchronous_and_journal_is_private(tmp_path, monkeypatch):
+    users = pd.DataFrame([{"username": "ana", "password_hash": "h", "active": "TRUE"}])
+    writes = []
+    monkeypatch.setattr(store_mod, "fetch_tables", lambda names, strict=False: {n: users for n in names})
+    monkeypatch.setattr(store_mod, "replace_df", lambda name, df: writes.append(name))
+
+    j = _journal(tmp_path)
+    TableStore(journal=j).save("users", users.assign(active=["FALSE"]), table_version(users))
+    assert writes == ["users"] and j.depth() == 0  # hash de senha não passa pelo disco local
+    assert os.stat(j.path).st_mode & 0o777 == 0o600
@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils import metrics
+
+@pytest.fixture(autouse=True)
+def _fresh():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.enable(False)
+    metrics.REGISTRY.reset()
+
+def test_disabled_records_nothing():
+    metrics.enable(False)
+    metrics.count("sheets_calls_total", op="get_all_values")
+    with metrics.timer("external_call_seconds", service="sheets"):
+        pass
+    metrics.laps("tv_stage_seconds").lap("read_tables")
+    assert metrics.REGISTRY.counters == {} and metrics.REGISTRY.histograms == {}
+
+def test_prometheus_text():
+    metrics.enable(True)
+    metrics.count("sheets_429_total", op="values_batch_get")
+    metrics.count("sheets_429_total", op="values_batch_get")
+    for s in (0.003, 0.02, 0.3):
+        metrics.REGISTRY.observe("tv_stage_seconds", (("stage", "read_tables"),), s)
+    text = metrics.REGISTRY.prometheus()
+    assert '# TYPE lukma_sheets_429_total counter' in text
+    assert 'lukma_sheets_429_total{op="values_batch_get"} 2' in text
+    assert 'lukma_tv_stage_seconds_bucket{stage="read_tables",le="0.025"} 2' in text
+    assert 'lukma_tv_stage_seconds_bucket{stage="read_tables",le="+Inf"} 3' in text
+    assert 'lukma_tv_stage_seconds_count{stage="read_tables"} 3' in text
+
+def test_quantile_within_bucket():
+    h = metrics.Histogram()
+    for _ in range(9):
+        h.observe(0.04)
+    h.observe(2.0)
+    assert 0.025 < h.quantile(0.5) <= 0.05
+    assert h.quantile(1.0) == 2.0
+
+def test_cache_lookup_hit_and_miss():
+    metrics.enable(True)
+    seen = {}
+    def cached(key):
+        if key not in seen:
+            metrics.cache_miss()
+            seen[key] = key * 2
+        return seen[key]
+    assert metrics.cache_lookup("weather", cached, 2) == 4
+    metrics.cache_lookup("weather", cached, 2)
+    c = metrics.REGISTRY.counters
+    assert c[("cache_requests_total", (("cache", "weather"), ("result", "miss")))] == 1
+    assert c[("cache_requests_total", (("cache", "weather"), ("result", "hit")))] == 1
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from app.utils.orchestrator import depends_on, gather, last_known
+
+def test_late_dependency_falls_back_then_lands_for_next_render():
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "fresco"
+
+    t0 = time.perf_counter()
+    values, stale = gather({"t_fast": lambda: 1, "t_slow": slow}, deadline=0.2, defaults={"t_slow": "padrão"})
+    assert time.perf_counter() - t0 < 1
+    assert values == {"t_fast": 1, "t_slow": "padrão"} and stale == ("t_slow",)
+
+    # ainda em andamento: o render seguinte espera a mesma busca, sem disparar outra
+    values, stale = gather({"t_slow": slow}, deadline=0.05, defaults={"t_slow": "padrão"})
+    assert stale == ("t_slow",) and len(calls) == 1
+
+    release.set()
+    values, stale = gather({"t_slow": slow}, deadline=2)
+    assert values["t_slow"] == "fresco" and not stale and last_known("t_slow") == "fresco"
+
+def test_failure_serves_last_known_value():
+    gather({"t_flaky": lambda: {"USD": 5.0}}, deadline=2)
+
+    def boom():
+        raise RuntimeError("503")
+
+    values, stale = gather({"t_flaky": boom}, deadline=2, defaults={"t_flaky": {}})
+    assert values["t_flaky"] == {"USD": 5.0} and stale == ("t_flaky",)
+
+def test_dependency_reuses_the_read_the_render_requested():
+    release = threading.Event()
+    reads = []
+
+    def tables():
+        reads.append(1)
+        release.wait(5)
+        return {"weather_units": ["SP"]}
+
+    def weather():
+        return ("clima", *depends_on("t_tables", tables)["weather_units"])
+
+    threading.Timer(0.1, release.set).start()
+    values, stale = gather({"t_tables": tables, "t_weather": weather}, deadline=2)
+    assert values["t_weather"] == ("clima", "SP") and not stale and len(reads) == 1
+    assert gather({"t_weather2": weather}, deadline=2)[0]["t_weather2"] == ("clima", "SP") and len(reads) == 1
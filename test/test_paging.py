@@ -0,0 +1,23 @@
+import pandas as pd
+
+from app.utils.paging import TablePatch, filter_frame, page_bounds
+
+DF = pd.DataFrame({"id": [str(i) for i in range(10)], "name": [f"Nome {i}" for i in range(10)],
+                   "active": ["TRUE", "FALSE"] * 5})
+
+def test_filter_and_bounds():
+    assert filter_frame(DF, "nome 3")["id"].tolist() == ["3"]
+    assert filter_frame(DF, "", "Inativos")["id"].tolist() == ["1", "3", "5", "7", "9"]
+    assert page_bounds(10, 5, 4) == (3, 8, 10)
+
+def test_patch_tracks_rows_across_pages():
+    patch = TablePatch()
+    patch.enter("p1")
+    window = DF.iloc[4:8]  # página 2 (tamanho 4)
+    patch.set_current(list(window.index), {"edited_rows": {0: {"name": "X"}}, "deleted_rows": [1],
+                                           "added_rows": [{"id": "10", "name": "Novo"}]})
+    patch.enter("p2")  # troca de página consolida o delta
+    out = patch.apply(DF)
+    assert out.loc[4, "name"] == "X" and 5 not in out.index
+    assert out["id"].tolist()[-1] == "10"
+    assert patch.summary() == (1, 1, 1)
@@ -3,3 +3,32 @@ from app.utils.auth import check_perm
 def test_check_perm_false_when_missing(monkeypatch):
     # Simula DF vazio: a função retorna False
     assert check_perm("naoexiste", "can_news") is False
+
+def test_permission_index_bitmask():
+    import pandas as pd
+    from app.utils.auth import PermissionIndex
+    idx = PermissionIndex(pd.DataFrame([
+        {"username": "ana", "name": "Ana", "password_hash": "h", "is_admin": "FALSE", "can_news": "TRUE", "active": "TRUE"},
+        {"username": "bia", "name": "Bia", "password_hash": "h", "is_admin": "true", "can_news": "", "active": "false"},
+    ]))
+    assert idx.has("ana", "can_news") and not idx.has("ana", "is_admin")
+    assert idx.has("bia", "is_admin") and not idx.has("bia", "active")
+    assert list(idx.credentials["usernames"]) == ["ana"]
+    assert idx.perms("ninguem") == {f: False for f in idx.perms("ninguem")}
+
+def test_deactivation_applies_while_session_pins_older_users(monkeypatch):
+    import time
+    import pandas as pd
+    from app.utils import store as store_mod
+    from app.utils.auth import live_permissions
+    from app.utils.store import Snapshot, TableStore
+
+    monkeypatch.setattr(store_mod, "bus_token", lambda name: "0")
+    s = TableStore(max_age=3600)
+    s._checked_at, s._tokens["users"] = time.monotonic(), "0"
+    row = {"username": "ana", "name": "Ana", "password_hash": "h", "is_admin": "TRUE", "active": "TRUE"}
+    s._put(Snapshot("users", pd.DataFrame([row]), "v0", 0.0))  # versão fixada pela sessão logada
+    assert live_permissions(s).has("ana", "active")
+    s._put(Snapshot("users", pd.DataFrame([{**row, "active": "FALSE"}]), "v1", 0.0))  # outro admin desativou
+    assert s.snapshot("users", "v0").df["active"].tolist() == ["TRUE"]  # a grade segue na versão fixada
+    assert not live_permissions(s).has("ana", "active")
@@ -0,0 +1,40 @@
+import json
+import sys
+import threading
+import time
+
+from app.utils.profiler import SUFFIX, SamplingProfiler, list_profiles, rotate
+
+def _busy(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+def test_profiles_until_root_frame_returns(tmp_path):
+    def script():
+        prof = SamplingProfiler("tv", threading.get_ident(), sys._getframe(0), tmp_path, interval=0.002)
+        prof.start()
+        _busy(60)
+        return prof
+    prof = script()
+    prof.join(timeout=5)
+    assert not prof.is_alive() and prof.path is not None
+    doc = json.loads(prof.path.read_text("utf-8"))
+    names = [f["name"] for f in doc["shared"]["frames"]]
+    assert "script" in names and "_busy" in names
+    profile = doc["profiles"][0]
+    assert len(profile["samples"]) == len(profile["weights"]) > 5
+    assert all(names[s[0]] == "script" for s in profile["samples"])  # raiz = frame do script
+    folded = prof.path.with_name(prof.path.name[:-len(SUFFIX)] + ".folded").read_text("utf-8")
+    assert folded.splitlines()[0].startswith("script (")
+
+def test_rotate_and_list(tmp_path):
+    for i in range(4):
+        base = tmp_path / f"admin-20261019-10000{i}-{100 + i}ms-ab1{i}"
+        base.with_name(base.name + SUFFIX).write_text("{}")
+        base.with_name(base.name + ".folded").write_text("")
+        time.sleep(0.01)
+    rotate(tmp_path, keep=2)
+    df = list_profiles(tmp_path)
+    assert len(df) == 2 and len(list(tmp_path.glob("*.folded"))) == 2
+    assert df["página"].tolist() == ["admin", "admin"] and df["duração ms"].tolist() == [103, 102]
@@ -0,0 +1,29 @@
+import pickle
+
+from app.utils.data import world_times
+from app.utils.records import NewsItem, VideoItem, WeatherReading, record_dict, weather_readings
+from app.utils.ui import line_e_html, weather_ticker_html
+
+def test_weather_readings_normalize_missing_values():
+    rows = [{"alias": "Matriz", "temperature": "21.6", "windspeed": float("nan"), "weathercode": 3.0},
+            {"alias": "", "temperature": None, "windspeed": 12, "weathercode": None}]
+    a, b = weather_readings(rows)
+    assert a == WeatherReading("Matriz", 21.6, None, 3)
+    assert b.alias == "Unidade" and b.temperature is None and b.weathercode is None
+    html = weather_ticker_html((a, b))
+    assert "<b>Matriz</b> • 22°C • -- km/h" in html and "--°C • 12 km/h" in html
+    assert "22°C" in line_e_html([], {}, (a, b)) and "Sem dados" in weather_ticker_html(())
+
+def test_records_are_slotted_and_picklable():
+    item = NewsItem.from_row({"id": 7, "title": " Olá ", "description": None})
+    assert item == NewsItem("7", "Olá", "", "") and not hasattr(item, "__dict__")
+    assert pickle.loads(pickle.dumps(item)) == item
+    assert record_dict(item) == {"id": "7", "title": "Olá", "description": "", "image_url": ""}
+    assert VideoItem("1", "", "", "12.5").duration_ms(30_000) == 12_000
+    assert VideoItem("1", "", "", "").duration_ms(30_000) == 30_000
+    assert VideoItem("1", "", "", "abc").duration_ms(30_000) == 30_000
+
+def test_world_times_are_clock_tuples():
+    times = world_times()
+    label, hhmm = times[0]
+    assert label == times[0].label and len(hhmm) == 8 and hhmm.count(":") == 2
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+import pandas as pd
+
+from app.utils.schedule import ScheduleIndex
+
+def test_windows_and_priority():
+    df = pd.DataFrame([
+        {"id": "a", "title": "Sempre", "active": "true", "publish_from": "", "publish_until": "", "priority": ""},
+        {"id": "b", "title": "Campanha", "active": "true", "publish_from": "2026-05-10 08:00", "publish_until": "2026-05-12", "priority": "3"},
+        {"id": "c", "title": "Inativa", "active": "false", "publish_from": "", "publish_until": "", "priority": ""},
+        {"id": "d", "title": "Quebrada", "active": "true", "publish_from": "amanhã", "publish_until": "", "priority": ""},
+    ])
+    idx = ScheduleIndex(df)
+    assert idx.invalid == ["Quebrada"]
+    assert [it.id for it in idx.playlist(datetime(2026, 5, 10, 7, 59))] == ["a"]
+    during = [it.id for it in idx.playlist(datetime(2026, 5, 12, 23, 0))]  # "até" inclui o dia todo
+    assert sorted(during) == ["a", "b", "b", "b"] and during[0] == "b"
+    assert [it.id for it in idx.playlist(datetime(2026, 5, 13))] == ["a"]
+    assert [it.id for it in idx.playlist(datetime(2026, 5, 11))][0] == "b"
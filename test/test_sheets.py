@@ -0,0 +1,63 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import sheets
+from app.utils.sheets import _a1_ranges, _col_letter, _load_tables, fetch_projected, read_errors
+
+VALUES = {
+    "users": [["username", "name", "password_hash", "active"], ["ana", "Ana", "segredo", "TRUE"]],
+    "news": [["id", "title", "description", "created_at", "active"],
+             ["1", "A", "desc", "2026-01-01", "TRUE"], ["2", "B", "", "2026-01-02"]],
+}
+
+def _letters(s):
+    n = 0
+    for ch in s:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+class FakeSheet:
+    def __init__(self):
+        self.requested = []
+
+    def values_batch_get(self, ranges, params=None):
+        out = []
+        for rng in ranges:
+            self.requested.append(rng)
+            title, a1 = re.match(r"'(.+)'!(.+)", rng).groups()
+            values = VALUES[title]
+            if a1 == "1:1":
+                out.append({"values": values[:1]})
+                continue
+            c0, r0, c1, r1 = re.match(r"([A-Z]+)(\d+):([A-Z]+)(\d*)", a1).groups()
+            rows = values[int(r0) - 1:int(r1) if r1 else None]
+            out.append({"values": [r[_letters(c0):_letters(c1) + 1] for r in rows]})
+        return {"valueRanges": out}
+
+def test_a1_ranges_group_contiguous_columns():
+    assert _col_letter(0) == "A" and _col_letter(25) == "Z" and _col_letter(27) == "AB"
+    heads = ["id", "title", "description", "created_at", "active"]
+    assert _a1_ranges("news", heads, ["title", "description", "active", "nada"]) == [
+        ("'news'!B2:C", ["title", "description"]), ("'news'!E2:E", ["active"])]
+    assert _a1_ranges("news", heads, ["title"], (10, 20))[0][0] == "'news'!B12:B21"
+
+def test_fetch_projected_never_reads_other_columns(monkeypatch):
+    fake = FakeSheet()
+    monkeypatch.setattr(sheets, "_sheet", lambda: fake)
+    out = fetch_projected({"users": ["username", "active"], "news": ["title", "active", "image_url"]})
+    assert out["users"].to_dict("records") == [{"username": "ana", "active": "TRUE"}]
+    assert out["news"].to_dict("records") == [
+        {"title": "A", "active": "TRUE", "image_url": ""}, {"title": "B", "active": "", "image_url": ""}]
+    assert not any("C" in r.split("!")[1] for r in fake.requested if r.startswith("'users'"))  # password_hash
+
+def test_failed_read_in_pool_thread_returns_the_error_for_the_render(monkeypatch):
+    def quota(names, source=None):
+        raise RuntimeError("429 quota")
+
+    monkeypatch.setattr(sheets, "write_journal", lambda: None)
+    monkeypatch.setattr(sheets, "snapshot_reader", lambda: None)
+    monkeypatch.setattr(sheets, "fetch_tables", quota)
+    with ThreadPoolExecutor(1) as pool:  # sem script: nada de st.error perdido na thread
+        out = pool.submit(_load_tables, ["news", "videos"], None, None).result()
+    assert list(out["news"].columns) == sheets.DEFAULT_COLUMNS["news"] and out["news"].empty
+    assert read_errors(out) == ["RuntimeError: 429 quota"]
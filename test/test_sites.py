@@ -0,0 +1,52 @@
+import threading
+
+import pandas as pd
+
+from app.utils import sites
+from app.utils.sheets import Source, table_version
+from app.utils.config import runtime_config
+from app.utils.sites import merge_site, read_site_tables
+
+def _frame(rows, version):
+    df = pd.DataFrame(rows)
+    df.attrs["version"] = version
+    return df
+
+def test_merge_site_adds_rows_and_overrides_settings():
+    news = merge_site("news", "sp", _frame([{"id": "1", "title": "Global"}], "g1"),
+                      _frame([{"id": "1", "title": "Só SP"}], "s1"))
+    assert news["id"].tolist() == ["1", "sp:1"] and table_version(news) == "g1+sp:s1"
+    settings = merge_site("settings", "sp",
+                          _frame([{"key": "theme_gap", "value": "12px"}, {"key": "theme_bg", "value": "#000"}], "g2"),
+                          _frame([{"key": "theme_bg", "value": "#123"}], "s2"))
+    assert dict(zip(settings["key"], settings["value"])) == {"theme_gap": "12px", "theme_bg": "#123"}
+    glob = _frame([{"id": "1"}], "g3")
+    assert merge_site("videos", "sp", glob, pd.DataFrame(columns=["id"])) is glob  # site sem linhas: a global
+
+def test_site_screen_reads_only_global_and_its_site_in_parallel(monkeypatch):
+    monkeypatch.setattr(sites, "site_sources", lambda: {"sp": Source("sp", "planilha-sp"), "rj": Source("rj", "planilha-rj")})
+    both_started = threading.Barrier(2, timeout=5)  # só passa se global e site estiverem lendo ao mesmo tempo
+    reads = []
+
+    def fake_read(names, columns=None, rows=None, source=None):
+        reads.append((source.key if source else "global", tuple(names)))
+        both_started.wait()
+        tag = source.key if source else "g"
+        return {n: _frame([{"id": f"{tag}{n}", "title": tag}], f"{tag}-{n}") for n in names}
+
+    monkeypatch.setattr(sites, "read_tables", fake_read)
+    out = read_site_tables("sp", ["news", "users"])
+    assert sorted(reads) == [("global", ("news", "users")), ("sp", ("news",))]  # nada do rj, users só global
+    assert out["news"]["title"].tolist() == ["g", "sp"] and out["users"]["title"].tolist() == ["g"]
+
+def test_site_settings_override_screen_config(monkeypatch):
+    monkeypatch.setattr(sites, "site_sources", lambda: {"sp": Source("sp", "planilha-sp")})
+
+    def fake_read(names, columns=None, rows=None, source=None):
+        rows_by = {None: [{"key": "news_rotation_seconds", "value": "20"}, {"key": "feed_ttl_seconds", "value": "30"}],
+                   "sp": [{"key": "news_rotation_seconds", "value": "45"}]}[source.key if source else None]
+        return {"settings": _frame(rows_by, "sp-s" if source else "g-s")}
+
+    monkeypatch.setattr(sites, "read_tables", fake_read)
+    cfg = runtime_config("sp")
+    assert cfg.news_rotation_seconds == 45 and cfg.feed_ttl_seconds == 30
@@ -0,0 +1,22 @@
+import pandas as pd
+
+from app.utils.snapshots import SnapshotReader, SnapshotWriter
+
+def test_writer_publishes_versions_atomically(tmp_path):
+    df = pd.DataFrame({"title": ["A", "B"], "active": ["TRUE", "FALSE"]})
+    w = SnapshotWriter(str(tmp_path))
+    assert w.write_table("news", df, "v1") and w.write_data("rates", {"USD": 5.0}, "r1")
+    reader = SnapshotReader(str(tmp_path))
+    assert reader.manifest() is None  # nada visível antes do commit
+    w.commit()
+    got = reader.table("news")
+    assert got.to_dict("records") == df.to_dict("records") and got.attrs["version"] == "v1"
+    assert reader.data("rates") == {"USD": 5.0} and reader.fresh()
+
+    w2 = SnapshotWriter(str(tmp_path))
+    assert not w2.write_table("news", df, "v1")  # mesma versão: nada a gravar
+    for v in ("v2", "v3", "v4", "v5"):
+        w2.write_table("news", df.assign(title=v), v)
+        w2.commit()
+    assert reader.table("news")["title"].tolist() == ["v5", "v5"]
+    assert len(list((tmp_path / "tables").glob("news.*.arrow"))) == 3  # KEEP_VERSIONS
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from app.utils.store import ConflictError, DuplicateKeyError, merge_rows
+
+BASE = pd.DataFrame([
+    {"id": "1", "title": "A", "active": "TRUE"},
+    {"id": "2", "title": "B", "active": "TRUE"},
+])
+
+def test_merge_disjoint_edits():
+    mine = BASE.copy(); mine.loc[0, "title"] = "A2"
+    mine = pd.concat([mine, pd.DataFrame([{"id": "3", "title": "C", "active": True}])], ignore_index=True)
+    theirs = BASE.copy(); theirs.loc[1, "active"] = "FALSE"
+    out = merge_rows(BASE, mine, theirs, "id")
+    assert out["id"].tolist() == ["1", "2", "3"]
+    assert out["title"].tolist() == ["A2", "B", "C"]
+    assert [str(v).lower() for v in out["active"]] == ["true", "false", "true"]
+
+def test_merge_same_row_conflicts():
+    mine = BASE.copy(); mine.loc[0, "title"] = "Minha"
+    theirs = BASE.copy(); theirs.loc[0, "title"] = "Deles"
+    with pytest.raises(ConflictError) as e:
+        merge_rows(BASE, mine, theirs, "id")
+    assert e.value.keys == ["1"]
+
+def test_merge_ignores_bool_spelling():
+    mine = BASE.copy(); mine["active"] = True  # editor devolve bool, Sheets devolve "TRUE"
+    theirs = BASE.copy(); theirs.loc[1, "title"] = "B2"
+    assert merge_rows(BASE, mine, theirs, "id")["title"].tolist() == ["A", "B2"]
+
+def test_merge_rejects_duplicate_keys():
+    base = pd.DataFrame([{"id": "1", "title": "A"}, {"id": "1", "title": "A (cópia)"}, {"id": "2", "title": "B"}])
+    mine = base.copy(); mine.loc[2, "title"] = "B2"
+    with pytest.raises(DuplicateKeyError) as e:
+        merge_rows(base, mine, base, "id")
+    assert e.value.keys == ["1"]
+
+def test_merge_blank_keys_follow_content_not_position():
+    base = pd.DataFrame([{"id": "1", "title": "A"}, {"id": "", "title": "sem id"}])
+    mine = pd.concat([base.iloc[1:], pd.DataFrame([{"id": "", "title": "minha"}])], ignore_index=True)  # exclui "1"
+    theirs = pd.concat([base, pd.DataFrame([{"id": "", "title": "deles"}])], ignore_index=True)
+    out = merge_rows(base, mine, theirs, "id")
+    assert sorted(out["title"]) == ["deles", "minha", "sem id"]
+    both_append = merge_rows(base.iloc[:1], pd.DataFrame([{"id": "1", "title": "A"}, {"id": "", "title": "minha"}]),
+                             pd.DataFrame([{"id": "1", "title": "A"}, {"id": "", "title": "deles"}]), "id")
+    assert both_append["title"].tolist() == ["A", "deles", "minha"]  # mesma posição, sem conflito falso
+    assert merge_rows(base, base.iloc[1:], base.iloc[:1], "id").empty  # cada lado excluiu uma: nenhuma volta
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from app.utils.records import WeatherReading
+from app.utils.ui import (TICKER_PAGE_PX, TICKER_SPEED, TICKER_VIEWPORT_PX, theme_overrides_css, ticker_at,
+                          ticker_pages, weather_ticker_html)
+
+def test_theme_overrides_only_known_and_safe_values():
+    settings = pd.DataFrame([
+        {"key": "theme_avatar_size", "value": "160px"},
+        {"key": "theme_ticker_h", "value": "80px;}</style><script>"},
+        {"key": "currency_refresh_minutes", "value": "5"},
+    ])
+    css = theme_overrides_css(settings)
+    assert "--avatar-size:160px;" in css
+    assert "script" not in css and "--ticker-h" not in css
+    assert theme_overrides_css(pd.DataFrame(columns=["key", "value"])) == ""
+
+def test_ticker_pages_keep_speed_constant_for_many_units():
+    readings = tuple(WeatherReading(f"Unidade {i:03d}", 20.0 + i % 10, 12.0, i % 4) for i in range(300))
+    pages = ticker_pages(readings)
+    assert len(pages) > 5 and ticker_pages(readings) is pages  # cache por conjunto de leituras
+    assert sum(p.html.count("tick-item") for p in pages) == 300
+    assert all(p.seconds <= (TICKER_PAGE_PX + TICKER_VIEWPORT_PX) / TICKER_SPEED for p in pages)
+    few = ticker_pages(readings[:3])
+    assert len(few) == 1 and few[0].seconds < pages[0].seconds  # menos conteúdo, passada mais curta
+
+    page, offset = ticker_at(pages, pages[0].seconds + 1.5)
+    assert page is pages[1] and offset == 1.5
+    assert "animation-duration" in weather_ticker_html(readings[:3]) and "Sem dados" in weather_ticker_html(())
+
+def test_ticker_and_feed_share_one_emoji_table():
+    from app.utils import data, ui
+    assert ui.weather_emoji is data.weather_emoji and ui.EMOJI_BY_CODE is data.EMOJI_BY_CODE
+    assert data.weather_emoji(3) == "⛅" and data.weather_emoji("x") == data.weather_emoji(150) == "🌡️"
@@ -0,0 +1,39 @@
+import json
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from bench.fakes import FakeUpstreams, make_tabs
+
+APP = Path(__file__).resolve().parent.parent / "app"
+
+WARM_SCRIPT = f"""
+import sys
+sys.path.insert(0, {str(APP)!r})  # mesmos módulos (e chaves de cache) que o tv.py importa
+import streamlit as st
+from utils.warmup import warm_up
+st.json(warm_up())
+"""
+
+def _app(at: AppTest) -> AppTest:
+    at.secrets["gsheets"] = {"spreadsheet_id": "bench"}
+    return at
+
+def test_first_tv_render_after_warm_up_makes_no_external_calls(monkeypatch):
+    with FakeUpstreams(make_tabs(units=3, rows=20)) as up:
+        for k, v in up.env().items():
+            monkeypatch.setenv(k, v)
+        monkeypatch.delenv("LUKMA_SNAPSHOT_DIR", raising=False)
+        warm = _app(AppTest.from_string(WARM_SCRIPT, default_timeout=60))
+        warm.run()
+        assert not warm.exception
+        timings = json.loads(warm.json[0].value)
+        assert set(timings) >= {"sheets_client", "read_tables", "indexes", "weather", "rates"}
+        assert all(v is not None for v in timings.values()), timings
+        assert up.stats().get("open_meteo") and up.stats().get("sheets")
+
+        up.reset_stats()
+        tv = _app(AppTest.from_file(str(APP / "tv.py"), default_timeout=60))
+        tv.run()
+        assert not tv.exception
+        assert up.stats() == {}